@@ -15,6 +15,8 @@ from langchain_openai import ChatOpenAI
 from pydantic import BaseModel
 from browser_use import ActionResult, Agent, Browser, Controller
 from .company_tracker import HighVolumeApplicationManager
+from modules.browser_pool import close_browser_pools, get_browser_pool
+from modules.dom_compactor import dom_compaction, system_message_note
 
 load_dotenv()
 
@@ -443,9 +445,15 @@ async def run_job_search_and_apply():
     """
     
     model = ChatOpenAI(model='gpt-4o')
-    agent = Agent(task=task, llm=model, controller=controller)
-    
-    await agent.run()
+    try:
+        async with get_browser_pool(entry_point="liengine").session() as browser_session:
+            agent = Agent(task=task, llm=model, controller=controller, browser_session=browser_session,
+                          extend_system_message=system_message_note())
+            with dom_compaction():
+                await agent.run()
+    finally:
+        # Leaves the persistent browser running (python -m modules.browser_launcher --stop)
+        await close_browser_pools()
 
 def setup_configuration():
     """Display current configuration from test_config_25.json"""
@@ -517,11 +525,17 @@ async def run_test_mode_25():
     """
     
     model = ChatOpenAI(model='gpt-4o')
-    agent = Agent(task=task, llm=model, controller=controller)
     
     try:
-        await agent.run()
+        async with get_browser_pool(entry_point="liengine").session() as browser_session:
+            agent = Agent(task=task, llm=model, controller=controller, browser_session=browser_session,
+                          extend_system_message=system_message_note())
+            with dom_compaction():
+                await agent.run()
     finally:
+        # Leaves the persistent browser running (python -m modules.browser_launcher --stop)
+        await close_browser_pools()
+        
         # Final summary
         print("\n" + "="*60)
         print("🏁 TEST SESSION COMPLETE")
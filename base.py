@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 import threading
-import os
 import warnings
 import time
 import json
@@ -9,11 +8,11 @@ from datetime import datetime
 
 warnings.filterwarnings("ignore", message="FP16 is not supported on CPU")
 
+# Heavy dependencies (torch, whisper, openai, browser_use, pyaudio) are imported
+# by the startup pipeline on background threads once the window is visible
 try:
-    from modules import voice_input as recording
-    from modules.openai_engine import OpenAICodeEngine
     from modules.file_manager import get_file_manager
-    import whisper
+    from modules.startup import StartupPipeline
 except ImportError as e:
     messagebox.showerror("Import Error", f"Required modules not found: {e}\nPlease install dependencies first.")
 
@@ -26,22 +25,28 @@ class VoiceAutomationGUI:
         
         # Initialize variables
         self.is_recording = False
-        self.whisper_model = None
+        self.recording_queued = False
+        self.recording = None
+        self.whisper_engine = None
         self.openai_engine = None
+        self.code_engine = None
         self.current_transcription = ""
         self.generated_code = ""
         
         # Initialize file manager
         self.file_manager = get_file_manager()
         
-        # Load whisper model in background
-        self.load_models()
+        # Readiness of background-loaded components (record button waits on it)
+        self.startup = StartupPipeline()
         
         # Create GUI elements
         self.create_widgets()
         
         # Load settings
         self.load_settings()
+        
+        # Load models in background once the window has been drawn
+        self.root.after_idle(self.load_models)
     
     def create_widgets(self):
         # Title
@@ -139,26 +144,72 @@ class VoiceAutomationGUI:
                                                      wrap=tk.WORD, 
                                                      font=('Consolas', 10))
         self.history_text.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        # Earlier sessions (a tail read, cheap however large history.log is)
+        self.history_text.insert(tk.END, "".join(self.file_manager.get_recent_history(200)))
+        self.history_text.see(tk.END)
     
     def load_models(self):
-        """Load AI models in a separate thread"""
-        def load_in_background():
-            try:
-                self.update_status("Loading Whisper model...")
-                self.progress.start()
-                self.whisper_model = whisper.load_model("base")
-                
-                self.update_status("Initializing OpenAI engine...")
-                self.openai_engine = OpenAICodeEngine()
-                
-                self.progress.stop()
+        """Import heavy modules and load AI models in parallel background workers"""
+        def load_recorder():
+            from modules import voice_input
+            self.recording = voice_input
+            return voice_input
+        
+        def load_whisper():
+            from modules.whisper_engine import WhisperEngine
+            model_size = self.file_manager.load_settings().get("whisper_model", "base")
+            whisper_engine = WhisperEngine(model_size)
+            if not whisper_engine.load_model():
+                raise RuntimeError(f"Could not load Whisper model '{model_size}'")
+            # Dummy inference so the first command does not pay for kernel setup
+            whisper_engine.warm_up()
+            self.whisper_engine = whisper_engine
+            return whisper_engine
+        
+        def load_openai():
+            from modules.engine_router import create_code_engine
+            code_engine = create_code_engine()
+            if code_engine is None:
+                raise RuntimeError("No code generation engine could be initialized")
+            # The settings dialog edits the OpenAI key, wherever that engine sits
+            engines = getattr(code_engine, "engines", [code_engine])
+            self.openai_engine = next((e for e in engines if e.name == "openai"), None)
+            self.code_engine = code_engine
+            return code_engine
+        
+        def preload_browser_use():
+            # Not needed for voice commands, but imported now so browser
+            # automations started later do not pay the import cost
+            import browser_use
+            return browser_use
+        
+        def start_executor():
+            # Workers import pyautogui/selenium/pywinauto while the user is
+            # still speaking, so the first command runs without that delay
+            if not self.file_manager.load_settings().get("executor_enabled", True):
+                return None
+            from modules.executor_pool import get_executor_pool
+            return get_executor_pool()
+        
+        def on_error(name, error):
+            self.update_status(f"Error loading {name}")
+            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to load {name}: {error}"))
+        
+        def on_ready():
+            self.root.after(0, self.progress.stop)
+            if not self.startup.errors:
                 self.update_status("Ready")
-            except Exception as e:
-                self.progress.stop()
-                self.update_status("Error loading models")
-                messagebox.showerror("Error", f"Failed to load models: {e}")
         
-        threading.Thread(target=load_in_background, daemon=True).start()
+        self.startup.add("recorder", load_recorder)
+        self.startup.add("whisper", load_whisper)
+        self.startup.add("openai", load_openai)
+        self.startup.add("browser_use", preload_browser_use, required=False)
+        self.startup.add("executor", start_executor, required=False)
+        
+        self.progress.start()
+        self.update_status("Loading models...")
+        self.startup.start(on_status=self.update_status, on_error=on_error, on_ready=on_ready)
     
     def update_status(self, message):
         """Update status label from any thread"""
@@ -173,8 +224,23 @@ class VoiceAutomationGUI:
     
     def start_recording(self):
         """Start recording audio"""
-        if not self.whisper_model:
-            messagebox.showwarning("Warning", "Models are still loading. Please wait...")
+        if not (self.startup.is_ready("recorder") and self.startup.is_ready("whisper")):
+            if self.startup.state("whisper") == StartupPipeline.ERROR:
+                messagebox.showerror("Error", "Whisper failed to load. Check your installation and restart.")
+                return
+            if self.recording_queued:
+                return
+            # Start as soon as the models are ready instead of rejecting the click
+            self.recording_queued = True
+            self.update_status("Waiting for models to finish loading...")
+            
+            def wait_then_record():
+                ready = self.startup.wait_for("recorder", "whisper")
+                self.recording_queued = False
+                if ready:
+                    self.root.after(0, self.start_recording)
+            
+            threading.Thread(target=wait_then_record, daemon=True).start()
             return
         
         self.is_recording = True
@@ -182,15 +248,30 @@ class VoiceAutomationGUI:
         self.update_status("Recording... Speak now!")
         self.progress.start()
         
+        def transcribe():
+            """Record a command and transcribe it; None if nothing was recorded."""
+            if self.file_manager.load_settings().get("stream_transcription", True):
+                # Decode while the user is still speaking, so only the last
+                # second or so is left to transcribe when they stop
+                result = self.whisper_engine.transcribe_stream(self.recording.stream_audio(), save_to_file=False,
+                                                               on_partial=self.show_partial_transcription)
+            else:
+                # Capture straight into memory; no WAV round-trip before Whisper
+                audio = self.recording.record_audio_array()
+                if len(audio) == 0:
+                    return None
+                self.update_status("Transcribing audio...")
+                result = self.whisper_engine.transcribe_audio(audio, save_to_file=False)
+            if result is None:
+                raise RuntimeError("Transcription failed")
+            return result if result["text"] else None
+
         def record_audio():
             try:
-                filename = "recording.wav"
-                recording.record_audio(filename)
-                
-                if os.path.exists(filename):
-                    self.update_status("Transcribing audio...")
-                    result = self.whisper_model.transcribe(filename)
-                    text = result["text"].strip()
+                result = transcribe()
+
+                if result is not None:
+                    text = result["text"]
                     
                     self.current_transcription = text
                     self.root.after(0, self.display_transcription)
@@ -221,6 +302,13 @@ class VoiceAutomationGUI:
         """Stop recording (handled automatically by voice detection)"""
         pass
     
+    def show_partial_transcription(self, text):
+        """Show the transcription so far while the user is still speaking (from any thread)"""
+        def show():
+            self.transcription_text.delete(1.0, tk.END)
+            self.transcription_text.insert(1.0, text)
+        self.root.after(0, show)
+    
     def display_transcription(self):
         """Display transcription in the text widget"""
         self.transcription_text.delete(1.0, tk.END)
@@ -233,8 +321,8 @@ class VoiceAutomationGUI:
             messagebox.showwarning("Warning", "No transcription available. Please record audio first.")
             return
         
-        if not self.openai_engine:
-            messagebox.showwarning("Warning", "OpenAI engine not initialized. Please wait...")
+        if not self.code_engine:
+            messagebox.showwarning("Warning", "Code engine not initialized. Please wait...")
             return
         
         # Show confirmation dialog
@@ -253,16 +341,43 @@ class VoiceAutomationGUI:
         
         def generate_and_execute():
             try:
-                # Generate code
-                code = self.openai_engine.generate_code()
+                # Generate code, showing it as it streams in when enabled
+                settings = self.file_manager.load_settings()
+                streaming = hasattr(self.code_engine, "generate_code_stream")
+                if streaming and settings.get("stream_code", True):
+                    code = self.stream_generated_code()
+                    # Streamed code bypasses generate_code(), so check it here
+                    code = self.code_engine.ensure_valid_code(self.current_transcription, code)
+                else:
+                    code = self.code_engine.generate_code()
                 if code:
                     self.generated_code = code
                     
                     # Save code to file using file manager
                     self.file_manager.save_automation_code(code)
                     
-                    # Execute immediately
-                    exec(code)
+                    # Parsed and compiled once per distinct script (cached by hash)
+                    compiled = None
+                    if settings.get("code_validation_enabled", True):
+                        from modules.code_validator import get_code_validator
+                        compiled = get_code_validator().validate(code)["code"]
+                    
+                    # Execute immediately, in a warm worker process when enabled
+                    if settings.get("executor_enabled", True):
+                        from modules.executor_pool import get_executor_pool
+                        result = get_executor_pool().run(code, compiled=compiled)
+                        if result["stdout"].strip():
+                            self.add_to_history(f"Output: {result['stdout'].strip()}")
+                        if not result["ok"]:
+                            self.code_engine.reject_code(self.current_transcription)
+                            raise RuntimeError(result["error"])
+                    else:
+                        try:
+                            exec(compiled or code)
+                        except Exception:
+                            self.code_engine.reject_code(self.current_transcription)
+                            raise
+                    self.code_engine.approve_code(self.current_transcription, code)
                     
                     self.root.after(0, lambda: self.display_generated_code())
                     self.add_to_history(f"Executed: {self.current_transcription}")
@@ -278,6 +393,19 @@ class VoiceAutomationGUI:
         
         threading.Thread(target=generate_and_execute, daemon=True).start()
     
+    def stream_generated_code(self):
+        """Stream code into the code tab; returns once the program is complete"""
+        self.root.after(0, lambda: self.code_text.delete(1.0, tk.END))
+        self.root.after(0, lambda: self.notebook.select(1))
+        for piece in self.code_engine.generate_code_stream():
+            self.root.after(0, lambda p=piece: self.code_text.insert(tk.END, p))
+        
+        metrics = self.code_engine.last_metrics
+        if metrics.get("code_ready") is not None:
+            self.update_status(f"Code ready in {metrics['code_ready']:.1f}s "
+                               f"(first token {metrics['ttft']:.1f}s), executing...")
+        return self.code_engine.last_code
+    
     def display_generated_code(self):
         """Display generated code in the text widget"""
         self.code_text.delete(1.0, tk.END)
@@ -309,7 +437,8 @@ class VoiceAutomationGUI:
                 messagebox.showerror("Error", f"Failed to save code: {e}")
     
     def add_to_history(self, entry):
-        """Add entry to history"""
+        """Add entry to history (the tab and history.log)"""
+        self.file_manager.add_to_history(entry)
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         history_entry = f"[{timestamp}] {entry}\n"
         self.history_text.insert(tk.END, history_entry)
@@ -358,7 +487,8 @@ class VoiceAutomationGUI:
         record_frame.pack(fill='x', padx=20, pady=10)
         
         tk.Label(record_frame, text="Silence Timeout (seconds):", bg='#f0f0f0').pack(anchor='w', padx=10, pady=5)
-        timeout_var = tk.StringVar(value="4")
+        current_settings = self.load_settings()
+        timeout_var = tk.StringVar(value=str(current_settings.get("silence_timeout", 0.3)))
         timeout_entry = tk.Entry(record_frame, textvariable=timeout_var)
         timeout_entry.pack(fill='x', padx=10, pady=5)
         
@@ -371,9 +501,17 @@ class VoiceAutomationGUI:
                 from openai import OpenAI
                 self.openai_engine.client = OpenAI(api_key=new_api_key)
             
+            try:
+                silence_timeout = float(timeout_var.get())
+            except ValueError:
+                messagebox.showerror("Error", "Silence timeout must be a number of seconds")
+                return
+            
+            # Merge into the existing settings so other keys are not dropped
             settings = {
+                **current_settings,
                 "openai_api_key": new_api_key,
-                "silence_timeout": timeout_var.get()
+                "silence_timeout": silence_timeout
             }
             if self.save_settings(settings):
                 messagebox.showinfo("Success", "Settings saved!")
@@ -0,0 +1,52 @@
+# Run a batch of browser tasks concurrently (e.g. the nightly browser chores)
+#
+#   python batch_tasks.py tasks.txt [--concurrency 4]
+#
+# tasks.txt holds one task per line (blank lines and lines starting with #
+# are skipped), or a .json file with a list of strings or {"id", "task"} objects.
+#
+# The persistent browser stays up for the next run; stop it with
+#
+#   python -m modules.browser_launcher --stop
+import argparse
+import asyncio
+import json
+from pathlib import Path
+from modules.browser_use_engine import Engine
+from modules.browser_runtime import prepare_browser_runtimes
+
+
+def load_tasks(path):
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run browser tasks concurrently")
+    parser.add_argument("tasks", help="text file with one task per line, or a JSON list")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="tasks run at once (default: browser_task_concurrency setting)")
+    args = parser.parse_args()
+
+    tasks = load_tasks(args.tasks)
+    if not tasks:
+        print("❌ No tasks found")
+        return
+    engine = Engine()
+    try:
+        results = await engine.executeTasks(tasks, concurrency=args.concurrency)
+    finally:
+        await engine.close()
+    for result in results:
+        status = "✅" if result["success"] else f"❌ {result['error']}"
+        print(f"{result['task_id']}: {status} - {result.get('final_result')}")
+
+
+if __name__ == "__main__":
+    # Decide headless/headed/virtual (and start Xvfb) before the event loop runs
+    prepare_browser_runtimes()
+    asyncio.run(main())
@@ -0,0 +1,2 @@
+# Project Evee benchmarks - run from the project root, e.g.
+#   python -m benchmarks.bench_stream_transcription
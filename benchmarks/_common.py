@@ -0,0 +1,72 @@
+"""Shared helpers for the Project Evee benchmark scripts."""
+
+import queue
+import threading
+import time
+import wave
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+
+
+def load_wav(path):
+    """
+    Load a 16-bit PCM WAV file as float32 mono.
+
+    Returns:
+        tuple: (np.ndarray audio in [-1, 1], int sample rate)
+    """
+    import numpy as np
+    with wave.open(str(path), 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    audio = samples.astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return audio, rate
+
+
+def realtime_blocks(audio, rate=16000, block_size=1024, on_finished=None):
+    """
+    Replay ``audio`` as if it were coming from a microphone.
+
+    A producer thread releases one block every block_size / rate seconds, like
+    voice_input.stream_audio(). ``on_finished`` is called with the wall-clock
+    time at which the last block was released (the moment a VAD would stop).
+
+    Yields:
+        np.ndarray: float32 blocks
+    """
+    blocks = queue.Queue()
+    done = object()
+
+    def produce():
+        start = time.perf_counter()
+        for i, offset in enumerate(range(0, len(audio), block_size)):
+            target = start + (i + 1) * block_size / rate
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            blocks.put(audio[offset:offset + block_size])
+        if on_finished:
+            on_finished(time.perf_counter())
+        blocks.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        block = blocks.get()
+        if block is done:
+            break
+        yield block
+
+
+def print_table(headers, rows):
+    """Print rows as a fixed-width table."""
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
@@ -0,0 +1,159 @@
+"""
+Local static site for the browser benchmarks.
+
+Serves a small set of fixed pages from memory on 127.0.0.1 and counts the
+requests and bytes it sends, so browser start-up and navigation can be timed
+without network access and repeatably.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Evee fixture</title></head>
+<body>
+  <h1>Evee fixture site</h1>
+  <form action="/search"><input name="q" placeholder="Search"><button>Go</button></form>
+  <ul>
+    <li><a href="/">Home</a></li>
+    <li><a href="/search?q=videos">Videos</a></li>
+  </ul>
+</body>
+</html>
+"""
+
+# A content page with the usual weight around it. __PORT__ is replaced with
+# the server's port; *.localhost hosts resolve to 127.0.0.1 in Chromium, so
+# the "third-party" trackers are served by this same server.
+ARTICLE_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8"><title>Evee fixture article</title>
+  <link rel="stylesheet" href="/static/site.css">
+  <script src="http://analytics.localhost:__PORT__/analytics.js"></script>
+  <script src="http://ads.localhost:__PORT__/ads/loader.js"></script>
+  <script src="/static/app.js"></script>
+</head>
+<body>
+  <img src="/img/hero.jpg" alt="hero">
+  <h1>Quarterly report</h1>
+  <p>The numbers an agent would actually read are in this paragraph.</p>
+  <a href="/">Home</a> <button id="subscribe">Subscribe</button>
+""" + "".join(f'  <img src="/img/thumb{i}.jpg" alt="thumbnail {i}">\n' for i in range(12)) + """
+  <video src="/media/intro.mp4" preload="auto" muted></video>
+  <img src="http://ads.localhost:__PORT__/ads/banner.gif" alt="ad">
+  <img src="http://analytics.localhost:__PORT__/pixel.gif?event=view" width="1" height="1">
+</body>
+</html>
+"""
+
+
+def _blob(size, header=b""):
+    return header + bytes(size - len(header))
+
+
+ARTICLE_ASSETS = {
+    "/static/site.css": ("text/css", "@font-face { font-family: Body; src: url(/fonts/body.woff2); }\n"
+                                     "body { font-family: Body, sans-serif; }\n" + "p { margin: 0 }\n" * 400),
+    "/static/app.js": ("application/javascript", "document.body && document.body.setAttribute('data-ready', '1');\n"),
+    "/fonts/body.woff2": ("font/woff2", _blob(60_000, b"wOF2")),
+    "/img/hero.jpg": ("image/jpeg", _blob(180_000, b"\xff\xd8\xff")),
+    **{f"/img/thumb{i}.jpg": ("image/jpeg", _blob(25_000, b"\xff\xd8\xff")) for i in range(12)},
+    "/media/intro.mp4": ("video/mp4", _blob(900_000)),
+    "/analytics.js": ("application/javascript", "/* analytics */" + " " * 45_000),
+    "/ads/loader.js": ("application/javascript", "/* ads */" + " " * 70_000),
+    "/ads/banner.gif": ("image/gif", _blob(40_000, b"GIF89a")),
+    "/pixel.gif": ("image/gif", _blob(43, b"GIF89a")),
+}
+
+DEFAULT_PAGES = {
+    "/": ("text/html; charset=utf-8", INDEX_PAGE),
+    "/article": ("text/html; charset=utf-8", ARTICLE_PAGE),
+    **ARTICLE_ASSETS,
+}
+
+
+class FixtureSite:
+    """
+    Threaded static HTTP server.
+
+    Args:
+        pages (dict): Path -> (content type, body as str or bytes); the query
+                      string is ignored when looking a path up
+        latency (float): Seconds to wait before answering each request
+    """
+
+    def __init__(self, pages=None, latency=0.0):
+        self.pages = {path: (content_type, body.encode("utf-8") if isinstance(body, str) else body)
+                      for path, (content_type, body) in (pages or DEFAULT_PAGES).items()}
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+        self.paths = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def _make_handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if site.latency:
+                    time.sleep(site.latency)
+                path = self.path.split("?", 1)[0]
+                content_type, body = site.pages.get(path, ("text/plain", b"not found"))
+                status = 200 if path in site.pages else 404
+                if content_type.startswith("text/html"):
+                    body = body.replace(b"__PORT__", str(site._server.server_address[1]).encode())
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # request aborted by the browser
+                    return
+                with site._lock:
+                    site.requests += 1
+                    site.bytes_sent += len(body)
+                    site.paths.append(path)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        """Zero the counters."""
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.paths = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
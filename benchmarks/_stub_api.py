@@ -0,0 +1,172 @@
+"""
+Local stand-in for an OpenAI-compatible chat-completions endpoint.
+
+Serves POST /v1/chat/completions over HTTP/1.1 keep-alive on 127.0.0.1 and
+counts requests and TCP connections, so the benchmarks can check connection
+reuse, retries and timeouts without network access or an API key. Requests
+with ``"stream": true`` get server-sent events, one token per event.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CODE = "import webbrowser\nwebbrowser.open('https://www.youtube.com')"
+DEFAULT_TRAILER = "\n\nThis script opens YouTube in your default web browser."
+
+
+class StubChatServer:
+    """
+    Threaded chat-completions stub.
+
+    Args:
+        latency (float): Seconds to wait before answering each request
+        fail_first (int): Answer this many requests with ``fail_status`` first
+        fail_status (int): Status used for injected failures (e.g. 429, 503)
+        code (str): Code returned in the completion
+        token_delay (float): Seconds between streamed tokens
+        trailer (str): Prose the model "adds" after the code
+        fenced (bool): Wrap the code in a ```python fence; False answers with
+                       bare code, as the engines' instructions ask for
+    """
+
+    def __init__(self, latency=0.05, fail_first=0, fail_status=503, code=DEFAULT_CODE,
+                 token_delay=0.02, trailer=DEFAULT_TRAILER, fenced=True):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.code = code
+        self.token_delay = token_delay
+        self.trailer = trailer
+        self.fenced = fenced
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    @property
+    def base_url(self):
+        """Base URL for OpenAI-style clients (they append /chat/completions)."""
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def completion_text(self):
+        if not self.fenced:
+            return f"{self.code}{self.trailer}"
+        return f"```python\n{self.code}\n```{self.trailer}"
+
+    def _next_request(self):
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                number = stub._next_request()
+                time.sleep(stub.latency)
+                if number <= stub.fail_first:
+                    self._send_json(stub.fail_status, {"error": {"message": "injected failure"}})
+                    return
+                if payload.get("stream"):
+                    self._stream(number, payload.get("model", "stub"))
+                    return
+                self._send_json(200, {
+                    "id": f"stub-{number}",
+                    "object": "chat.completion",
+                    "model": payload.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": stub.completion_text()},
+                        "finish_reason": "stop",
+                    }],
+                })
+
+            def _write_chunk(self, data):
+                # HTTP/1.1 chunked transfer encoding
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _stream(self, number, model):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                tokens = re.findall(r"\s*\S{1,4}|\s+", stub.completion_text())
+                events = [{"content": token} for token in tokens] + [None]
+                try:
+                    for delta in events:
+                        chunk = {
+                            "id": f"stub-{number}",
+                            "object": "chat.completion.chunk",
+                            "created": int(time.time()),
+                            "model": model,
+                            "choices": [{"index": 0, "delta": delta or {},
+                                         "finish_reason": None if delta else "stop"}],
+                        }
+                        self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+                        if delta:
+                            time.sleep(stub.token_delay)
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self._write_chunk(b"")
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True  # client stopped reading early
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self, **options):
+        """Zero the counters and optionally change latency/failure settings."""
+        with self._lock:
+            self.requests = 0
+            self.connections = 0
+            for name, value in options.items():
+                setattr(self, name, value)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,78 @@
+"""
+Start-up and per-step cost of the browser in each runtime mode and viewport.
+
+For every mode available on this machine (headless always; headed with a
+display; virtual with Xvfb installed) and each viewport, starts a one-context
+BrowserPool, loads the fixture article page, then times what browser-use does
+before every agent step: building the page state (DOM extraction and
+screenshot). Reports the screenshot size too, which is what vision models are
+sent. Needs browser-use and Playwright's Chromium.
+
+    python -m benchmarks.bench_browser_modes [--steps 5]
+"""
+
+import argparse
+import asyncio
+import base64
+import shutil
+import statistics
+import time
+
+from modules.browser_pool import BrowserPool, DEFAULT_LAUNCH_ARGS
+from modules.browser_runtime import BrowserRuntime, has_display
+from benchmarks._common import print_table
+from benchmarks._fixture_site import FixtureSite
+
+VIEWPORTS = [{"width": 1920, "height": 1080}, {"width": 1280, "height": 800}]
+
+
+async def measure(runtime, site, steps):
+    start = time.perf_counter()
+    pool = await BrowserPool(size=1, launch_args=DEFAULT_LAUNCH_ARGS + tuple(runtime.launch_args()),
+                             **runtime.pool_kwargs()).start()
+    try:
+        async with pool.session() as session:
+            await session.start()
+            page = await session.get_current_page()
+            await page.goto(site.url + "article", wait_until="load")
+            startup = time.perf_counter() - start
+            times = []
+            for _ in range(steps):
+                step_start = time.perf_counter()
+                state = await session.get_state_summary(cache_clickable_elements_hashes=True)
+                times.append(time.perf_counter() - step_start)
+            screenshot = len(base64.b64decode(state.screenshot)) if state.screenshot else 0
+    finally:
+        await pool.close()
+    return startup, statistics.median(times), screenshot
+
+
+async def run(args):
+    modes = ["headless"]
+    if has_display():
+        modes.append("headed")
+    if shutil.which("Xvfb"):
+        modes.append("virtual")
+
+    rows = []
+    with FixtureSite() as site:
+        for mode in modes:
+            for viewport in VIEWPORTS:
+                runtime = BrowserRuntime(mode=mode, viewport=viewport, entry_point="benchmark")
+                used = runtime.prepare()
+                startup, step, screenshot = await measure(runtime, site, args.steps)
+                rows.append([used, f"{viewport['width']}x{viewport['height']}", f"{startup * 1000:.0f} ms",
+                             f"{step * 1000:.0f} ms", f"{screenshot / 1024:.0f} KB"])
+
+    print()
+    print_table(["mode", "viewport", "start-up + first page", "per step (median)", "screenshot"], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=5, help="page state builds timed per configuration")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Start-up-to-first-navigation latency: a new BrowserSession per task (what
+every entry point did) vs. a context leased from the warm BrowserPool. Also
+times starting a pool in a fresh event loop (every asyncio.run() of an entry
+point) with its own browser vs. attached to the persistent browser.
+
+Navigates to a local static site, so only browser overhead is measured.
+Needs browser-use and Playwright's Chromium (``playwright install chromium``).
+
+    python -m benchmarks.bench_browser_pool [--runs 5] [--headed]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from modules.browser_launcher import stop_browsers
+from modules.browser_pool import BrowserPool
+from benchmarks._common import print_table
+from benchmarks._fixture_site import FixtureSite
+
+
+async def cold_start(url, headless):
+    from browser_use import BrowserSession
+    start = time.perf_counter()
+    session = BrowserSession(headless=headless, keep_alive=False,
+                             viewport={"width": 1920, "height": 1080})
+    await session.start()
+    page = await session.get_current_page()
+    await page.goto(url)
+    elapsed = time.perf_counter() - start
+    await session.kill()
+    return elapsed
+
+
+async def pooled_start(pool, url):
+    start = time.perf_counter()
+    async with pool.session() as session:
+        await session.start()
+        page = await session.get_current_page()
+        await page.goto(url)
+        elapsed = time.perf_counter() - start
+    return elapsed
+
+
+def pool_start_in_new_loop(headless, persistent=None):
+    """Seconds to start (and close) a one-context pool in its own event loop."""
+    async def start_pool():
+        start = time.perf_counter()
+        pool = await BrowserPool(size=1, headless=headless, persistent=persistent).start()
+        elapsed = time.perf_counter() - start
+        await pool.close()
+        return elapsed
+    return asyncio.run(start_pool())
+
+
+async def run(args):
+    with FixtureSite() as site:
+        cold = [await cold_start(site.url, not args.headed) for _ in range(args.runs)]
+
+        start = time.perf_counter()
+        pool = await BrowserPool(size=1, headless=not args.headed).start()
+        pool_start = time.perf_counter() - start
+        try:
+            warm = [await pooled_start(pool, site.url) for _ in range(args.runs)]
+            stats = pool.stats()
+        finally:
+            await pool.close()
+
+    print()
+    print_table(["browser", "median", "min", "max"], [
+        [label, f"{statistics.median(t) * 1000:.0f} ms", f"{min(t) * 1000:.0f} ms", f"{max(t) * 1000:.0f} ms"]
+        for label, t in (("new BrowserSession per task", cold), ("leased from warm pool", warm))
+    ])
+    print(f"\nPool start-up (once per process): {pool_start * 1000:.0f} ms; "
+          f"{stats['leases']} leases, each returned context replaced by a fresh one")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+    headless = not args.headed
+    own = [pool_start_in_new_loop(headless) for _ in range(args.runs)]
+    try:
+        pool_start_in_new_loop(headless, persistent="benchmark")  # launches it
+        attached = [pool_start_in_new_loop(headless, persistent="benchmark") for _ in range(args.runs)]
+    finally:
+        stop_browsers(["benchmark"])
+    print()
+    print_table(["pool start in a new event loop", "median", "min", "max"], [
+        [label, f"{statistics.median(t) * 1000:.0f} ms", f"{min(t) * 1000:.0f} ms", f"{max(t) * 1000:.0f} ms"]
+        for label, t in (("launching its own browser", own), ("attached to the persistent browser", attached))
+    ])
+
+
+if __name__ == "__main__":
+    main()
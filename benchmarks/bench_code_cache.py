@@ -0,0 +1,76 @@
+"""
+Code cache hit rate and lookup cost on a replay of repeated voice commands.
+
+Generates a stream of commands drawn from a small set of tasks (skewed like
+real usage), with the phrasing and transcription variations Whisper produces,
+and reports how many would skip the LLM and what a lookup costs.
+
+    python -m benchmarks.bench_code_cache [--commands 500] [--entries 200] [--seed 0]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from modules.code_cache import CodeCache
+from benchmarks._common import print_table
+
+TASKS = [
+    ("open youtube", ["Open YouTube.", "open you tube", "Please open YouTube", "Hey Evee, open YouTube!"]),
+    ("open gmail", ["Open Gmail.", "open g mail", "Can you open Gmail?"]),
+    ("close youtube", ["Close YouTube.", "close you tube"]),
+    ("search for cats on youtube", ["Search for cats on YouTube.", "Um, search for cats on YouTube"]),
+    ("open the report 2023", ["Open the report 2023."]),
+    ("open the report 2024", ["Open the report 2024."]),
+    ("take a screenshot", ["Take a screenshot.", "take a screen shot", "Just take a screenshot please"]),
+]
+PROMPT = "benchmark system prompt"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--entries", type=int, default=200, help="unrelated cached commands to search through")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cache = CodeCache(max_entries=args.entries + len(TASKS))
+    # Keep the benchmark away from the real cache file
+    cache_file = Path(tempfile.mkdtemp()) / "code_cache.json"
+    cache.file_manager.files = {**cache.file_manager.files, "code_cache": cache_file}
+    cache.clear()
+    for i in range(args.entries):
+        cache.put(f"unrelated command number {i} about topic {i * 7}", f"print({i})", PROMPT)
+
+    weights = [1 / (rank + 1) for rank in range(len(TASKS))]
+    approved = {}
+    wrong = 0
+    timings = []
+    for _ in range(args.commands):
+        task, phrasings = rng.choices(TASKS, weights)[0]
+        command = rng.choice(phrasings)
+        start = time.perf_counter()
+        code = cache.lookup(command, PROMPT)
+        timings.append(time.perf_counter() - start)
+        if code is None:
+            # Miss: the LLM would be called; the code runs and gets approved
+            code = approved.setdefault(task, f"# code for {task}")
+            cache.put(command, code, PROMPT)
+        elif code != approved.get(task):
+            wrong += 1
+
+    stats = cache.stats()
+    print()
+    print_table(["commands", "distinct tasks", "hit rate", "wrong hits", "median lookup", "p95 lookup"], [[
+        args.commands, len(TASKS), stats["hit_rate"], wrong,
+        f"{statistics.median(timings) * 1000:.2f} ms",
+        f"{sorted(timings)[int(len(timings) * 0.95)] * 1000:.2f} ms",
+    ]])
+
+
+if __name__ == "__main__":
+    main()
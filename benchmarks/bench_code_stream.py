@@ -0,0 +1,69 @@
+"""
+OpenAICodeEngine: blocking generate_code() vs. streaming generate_code_stream().
+
+Runs against a local fake SSE chat-completions server that emits one token per
+event and, like real models often do, appends an explanation after the code
+fence. Reports time-to-first-token and time until runnable code is available.
+
+    python -m benchmarks.bench_code_stream [--runs 5] [--token-delay 0.02]
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks._common import print_table
+from benchmarks._stub_api import StubChatServer, DEFAULT_CODE
+
+COMMAND = "I want to watch some youtube videos"
+LONG_TRAILER = "\n\n" + " ".join(["This line explains the script in more detail."] * 20)
+
+
+def median_ms(values):
+    values = [v for v in values if v is not None]
+    return f"{statistics.median(values) * 1000:.0f} ms" if values else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed tokens")
+    args = parser.parse_args()
+
+    with StubChatServer(latency=0.1, token_delay=args.token_delay) as server:
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        from modules.openai_engine import OpenAICodeEngine
+        engine = OpenAICodeEngine()
+
+        rows = []
+        for label, trailer in (("short trailer", None), ("long trailer", LONG_TRAILER)):
+            if trailer is not None:
+                server.reset(trailer=trailer)
+
+            blocking = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                code = engine.generate_code(COMMAND)
+                blocking.append(time.perf_counter() - start)
+            assert code == DEFAULT_CODE, code
+
+            ttft, ready, total = [], [], []
+            for _ in range(args.runs):
+                for _ in engine.generate_code_stream(COMMAND):
+                    pass
+                assert engine.last_code == DEFAULT_CODE, engine.last_code
+                ttft.append(engine.last_metrics["ttft"])
+                ready.append(engine.last_metrics["code_ready"])
+                total.append(engine.last_metrics["total"])
+
+            rows.append([label, median_ms(blocking), median_ms(ttft), median_ms(ready),
+                         engine.last_metrics["complete"]])
+
+    print()
+    print_table(["completion", "blocking", "stream first token", "stream code ready", "complete"], rows)
+
+
+if __name__ == "__main__":
+    main()
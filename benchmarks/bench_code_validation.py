@@ -0,0 +1,59 @@
+"""
+Cost of validating generated code: first time (parse, import check, compile)
+vs. a repeated command served from the compiled-code cache.
+
+    python -m benchmarks.bench_code_validation [--runs 1000]
+"""
+
+import argparse
+import statistics
+import time
+
+from modules.code_validator import CodeValidator
+from benchmarks._common import print_table
+
+SCRIPT = '''import time
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+driver = webdriver.Chrome()
+driver.get("https://www.youtube.com")
+time.sleep(2)
+search = driver.find_element(By.NAME, "search_query")
+search.send_keys("lofi hip hop")
+search.send_keys(Keys.RETURN)
+time.sleep(3)
+videos = driver.find_elements(By.ID, "video-title")
+if videos:
+    videos[0].click()
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=1000)
+    args = parser.parse_args()
+
+    cold, warm = [], []
+    for i in range(args.runs):
+        validator = CodeValidator()
+        # A comment makes every cold script distinct, like a new command would
+        source = f"# command {i}\n{SCRIPT}"
+        start = time.perf_counter()
+        validator.validate(source)
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        result = validator.validate(source)
+        warm.append(time.perf_counter() - start)
+        assert result["ok"] and result["cached"], result["error"]
+
+    print()
+    print_table(["validation", "median", "p95"], [
+        [label, f"{statistics.median(t) * 1e6:.0f} µs", f"{sorted(t)[int(0.95 * len(t))] * 1e6:.0f} µs"]
+        for label, t in (("parse + check + compile", cold), ("cached code object", warm))
+    ])
+
+
+if __name__ == "__main__":
+    main()
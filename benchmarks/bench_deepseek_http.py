@@ -0,0 +1,96 @@
+"""
+DeepSeekAPIEngine HTTP client: per-call requests.post vs. the pooled session.
+
+Runs against a local stub of the chat-completions endpoint (no network or API
+key needed) and reports latency per command, TCP connections opened, retry
+behaviour on injected 429/503 responses and concurrent async throughput.
+
+    python -m benchmarks.bench_deepseek_http [--calls 20] [--latency 0.05] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import requests
+
+from modules.deepseek_api_engine import DeepSeekAPIEngine
+from benchmarks._common import print_table
+from benchmarks._stub_api import StubChatServer
+
+COMMAND = "I want to watch some youtube videos"
+
+
+def naive_call(engine):
+    """The engine's original request: a new connection for every command."""
+    response = requests.post(engine.api_url, headers=engine.headers,
+                             json=engine._build_payload(COMMAND))
+    response.raise_for_status()
+    return engine._extract_code(response.json())
+
+
+def measure(server, label, call, calls):
+    server.reset()
+    timings = []
+    ok = 0
+    for _ in range(calls):
+        start = time.perf_counter()
+        ok += call() is not None
+        timings.append(time.perf_counter() - start)
+    return [label, f"{statistics.median(timings) * 1000:.1f} ms",
+            server.connections, f"{ok}/{calls}"]
+
+
+async def run_async(engine, calls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await engine.generate_code_async(COMMAND)
+
+    return await asyncio.gather(*(one() for _ in range(calls)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub server latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with StubChatServer(latency=args.latency) as server:
+        engine = DeepSeekAPIEngine()
+        engine.api_url = server.url
+        engine.retry_backoff = 0.05
+
+        rows = [
+            measure(server, "requests.post per call", lambda: naive_call(engine), args.calls),
+            measure(server, "pooled session", lambda: engine.generate_code(COMMAND), args.calls),
+        ]
+
+        for status in (429, 503):
+            server.reset(fail_first=2, fail_status=status)
+            rows.append(measure(server, f"pooled, 2x {status} first", lambda: engine.generate_code(COMMAND), 1))
+        server.reset(fail_first=0)
+
+        start = time.perf_counter()
+        results = asyncio.run(run_async(engine, args.calls, args.concurrency))
+        elapsed = time.perf_counter() - start
+        rows.append([f"async x{args.concurrency}", f"{elapsed / args.calls * 1000:.1f} ms/call",
+                     server.connections, f"{sum(r is not None for r in results)}/{args.calls}"])
+
+        # A stalled server: the call must give up after its retries instead of hanging
+        server.reset(latency=5)
+        engine.timeout = (engine.timeout[0], 0.2)
+        start = time.perf_counter()
+        hung = engine.generate_code(COMMAND)
+        rows.append(["read timeout 0.2s", f"{(time.perf_counter() - start) * 1000:.0f} ms",
+                     server.connections, "gave up" if hung is None else "unexpected reply"])
+
+    print()
+    print_table(["client", "latency", "connections", "ok"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Size of the per-step page listing an agent sends to the LLM, with and without compaction.
+
+Replays a job-board session written in the exact element-listing format
+browser-use puts in each step's prompt (indices, capped attributes, tab
+depth, *[n] for new elements, page text lines): the search results list,
+the list after scrolling loads more jobs, a job's detail pane opened on the
+same page, and the application form on a new page. Each step is compacted
+with the same DomCompactor the agents use. Runs offline, no browser needed.
+
+    python -m benchmarks.bench_dom_compaction [--jobs 25]
+"""
+
+import argparse
+
+from modules.dom_compactor import DomCompactor, approx_tokens
+from benchmarks._common import print_table
+
+COMPANIES = ["Acme Robotics", "Northwind", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Data"]
+TITLES = ["Machine Learning Engineer", "Senior Software Engineer", "Data Scientist", "Backend Engineer (Python)",
+          "ML Platform Engineer", "Applied Scientist"]
+LOCATIONS = ["Remote", "San Francisco, CA (Hybrid)", "New York, NY (On-site)", "Austin, TX (Remote)"]
+
+
+def header():
+    return [
+        "[0]<a aria-label=LinkedIn />",
+        "[1]<input type=text placeholder=Search role=combobox aria-label=Search />",
+        "[2]<a >Home />", "[3]<a >My Network />", "[4]<a >Jobs />", "[5]<a >Messaging />",
+        "[6]<a >Notifications />", "[7]<button aria-label=Me >Me />",
+        "[8]<button aria-label=Date posted filt…>Date posted />",
+        "[9]<button aria-label=Experience level…>Experience level />",
+        "[10]<button aria-label=Remote filter. …>Remote />",
+        "[11]<button aria-label=Easy Apply filte…>Easy Apply />",
+        "Machine Learning Engineer in United States",
+        "1,248 results",
+        "Set alert",
+    ]
+
+
+def job_card(number, index, new=False):
+    """Lines for one search result card; returns (lines, next free index)."""
+    star = "*" if new else ""
+    title = TITLES[number % len(TITLES)]
+    company = COMPANIES[number % len(COMPANIES)]
+    lines = [
+        f"\t{star}[{index}]<div role=button aria-label={title[:15]}… />",
+        f"\t\t{star}[{index + 1}]<a aria-label={title[:15]}… href=/jobs/view/40{number:05d}…>{title} />",
+        f"\t\t\t{company}",
+        f"\t\t\t{LOCATIONS[number % len(LOCATIONS)]}",
+        "\t\t\t$120K/yr - $165K/yr · 401(k) benefit" if number % 3 == 0 else "\t\t\tActively recruiting",
+        "\t\t\tPromoted",
+        "\t\t\t·",
+        "\t\t\tEasy Apply",
+        f"\t\t{star}[{index + 2}]<button aria-label=Dismiss {title[:7]}… type=button />",
+        f"\t\t{star}[{index + 3}]<button aria-label=Save job type=button >Save />",
+    ]
+    return lines, index + 4
+
+
+def results_page(jobs, new_from=None):
+    lines = header()
+    index = 12
+    for number in range(jobs):
+        card, index = job_card(number, index, new=new_from is not None and number >= new_from)
+        lines += card
+    lines += [f"[{index}]<button aria-label=Page 1 />", f"[{index + 1}]<button aria-label=Page 2 />",
+              f"[{index + 2}]<button aria-label=Next >Next />", "About", "Accessibility",
+              "Help Center", "Privacy & Terms", "LinkedIn Corporation © 2025"]
+    return "\n".join(lines)
+
+
+def detail_page(jobs):
+    lines = results_page(jobs).split("\n")
+    index = 12 + jobs * 4 + 3
+    description = ("We are looking for an engineer to build and ship production ML systems, own data "
+                   "pipelines end to end and work closely with product teams. ")
+    lines += [
+        f"*[{index}]<h2 >{TITLES[0]} />",
+        f"*[{index + 1}]<a href=/company/acm…>{COMPANIES[0]} />",
+        "Remote · 2 days ago · Over 100 applicants",
+        f"*[{index + 2}]<button aria-label=Easy Apply to {TITLES[0][:4]}… id=jobs-apply-bu…>Easy Apply />",
+        f"*[{index + 3}]<button aria-label=Save {TITLES[0][:10]}…>Save />",
+        "About the job",
+    ] + [description * 2] * 6 + ["Requirements", "Python, PyTorch, SQL", "Benefits", "Medical, dental, 401(k)"]
+    return "\n".join(lines)
+
+
+def form_page():
+    lines = [
+        "Apply to Acme Robotics",
+        "Contact info",
+        "[0]<button aria-label=Dismiss />",
+        "[1]<input id=single-line-t… type=text aria-label=First name />",
+        "[2]<input id=single-line-t… type=text aria-label=Last name />",
+        "[3]<select id=text-entity-l… aria-label=Phone country co…>United States (+1) />",
+        "[4]<input id=single-line-t… type=text aria-label=Mobile phone num… />",
+        "[5]<input id=single-line-t… type=email aria-label=Email address />",
+        "Resume",
+        "Be sure to include an updated resume",
+        "[6]<input type=file id=jobs-document… />",
+        "DOC, DOCX, PDF (2 MB)",
+        "[7]<button aria-label=Continue to next… >Next />",
+        "Submitting this application won't change your LinkedIn profile.",
+    ]
+    return "\n".join(lines)
+
+
+def session(jobs):
+    return [
+        ("results list", results_page(jobs)),
+        ("scrolled (+10 jobs)", results_page(jobs + 10, new_from=jobs)),
+        ("job detail pane", detail_page(jobs + 10)),
+        ("application form", form_page()),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=25, help="job cards on the first results page")
+    args = parser.parse_args()
+
+    steps = session(args.jobs)
+    configs = [("compact", DomCompactor()), ("compact + diff", DomCompactor(diff=True))]
+    outputs = {name: [compactor.compact(text) for _, text in steps] for name, compactor in configs}
+
+    rows = []
+    for number, (label, text) in enumerate(steps):
+        row = [number + 1, label, f"{len(text.encode()):,} B", f"~{approx_tokens(text):,}"]
+        for name, _ in configs:
+            out = outputs[name][number]
+            row.append(f"{len(out.encode()):,} B ({1 - len(out) / len(text):.0%} less)")
+        rows.append(row)
+
+    total = sum(len(text.encode()) for _, text in steps)
+    totals = ["", "total", f"{total:,} B", f"~{sum(approx_tokens(t) for _, t in steps):,}"]
+    for name, _ in configs:
+        out = sum(len(o.encode()) for o in outputs[name])
+        totals.append(f"{out:,} B (~{sum(approx_tokens(o) for o in outputs[name]):,} tok)")
+    rows.append(totals)
+
+    print()
+    print_table(["step", "page", "browser-use", "tokens", "compacted", "compacted + diff"], rows)
+
+
+if __name__ == "__main__":
+    main()
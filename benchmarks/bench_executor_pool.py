@@ -0,0 +1,78 @@
+"""
+Automation execution: a fresh interpreter per script vs. the warm ExecutorPool.
+
+Each script imports the automation libraries and does a trivial amount of
+work, so the numbers show the per-command start-up cost the pool removes.
+Libraries that are not installed are skipped; pass --imports to measure
+other modules.
+
+    python -m benchmarks.bench_executor_pool [--runs 10] [--imports pyautogui,selenium.webdriver]
+"""
+
+import argparse
+import importlib.util
+import statistics
+import subprocess
+import sys
+import time
+
+from modules.executor_pool import WARM_IMPORTS, ExecutorPool
+from benchmarks._common import print_table
+
+
+def available(names):
+    found = []
+    for name in names:
+        try:
+            if importlib.util.find_spec(name) is not None:
+                found.append(name)
+        except (ImportError, ValueError):
+            pass
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--imports", default=",".join(WARM_IMPORTS),
+                        help="comma-separated modules every script imports")
+    args = parser.parse_args()
+
+    imports = available([name.strip() for name in args.imports.split(",") if name.strip()])
+    if not imports:
+        print("⚠️ None of the requested modules are installed; measuring bare interpreter start-up")
+    script = "".join(f"import {name}\n" for name in imports) + "print(sum(range(1000)))\n"
+
+    cold = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+        cold.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pool = ExecutorPool(size=1, warm_imports=imports).start(wait=True)
+    pool_start = time.perf_counter() - start
+    warm = []
+    try:
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = pool.run(script)
+            warm.append(time.perf_counter() - start)
+            if not result["ok"]:
+                print(f"❌ {result['error']}")
+                return 1
+    finally:
+        pool.close()
+
+    print()
+    print(f"Imports: {', '.join(imports) or '(none)'}")
+    print_table(["execution", "median", "min", "max"], [
+        [label, f"{statistics.median(t) * 1000:.1f} ms", f"{min(t) * 1000:.1f} ms", f"{max(t) * 1000:.1f} ms"]
+        for label, t in (("new interpreter per script", cold), ("warm executor pool", warm))
+    ])
+    print(f"\nPool start-up (once per session, in the background): {pool_start * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
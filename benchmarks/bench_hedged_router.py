@@ -0,0 +1,111 @@
+"""
+Tail latency of code generation: single provider vs. HedgedEngineRouter.
+
+Uses fake providers with injected latency (a log-normal body plus rare long
+stalls, like a congested API) and failures, so it runs offline in seconds.
+Reports p50/p95/p99 per command and how many extra provider calls hedging cost.
+
+    python -m benchmarks.bench_hedged_router [--commands 300] [--stall-rate 0.03] [--seed 0]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from modules.engine_router import HedgedEngineRouter
+from benchmarks._common import print_table
+
+
+class FakeEngine:
+    """Code generator that sleeps for a sampled latency and may fail."""
+
+    def __init__(self, name, median, sigma=0.3, stall_rate=0.0, stall=2.0, failure_rate=0.0, seed=0):
+        self.name = name
+        self.median = median
+        self.sigma = sigma
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_code(self, user_request=None):
+        with self._lock:
+            self.calls += 1
+            latency = self._rng.lognormvariate(0, self.sigma) * self.median
+            if self._rng.random() < self.stall_rate:
+                latency += self.stall
+            failed = self._rng.random() < self.failure_rate
+        time.sleep(latency)
+        return None if failed else f"print('{self.name}')"
+
+    def approve_code(self, user_request, code):
+        return True
+
+    def reject_code(self, user_request):
+        return True
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(generator, commands):
+    timings = []
+    failures = 0
+    for _ in range(commands):
+        start = time.perf_counter()
+        if generator.generate_code("open youtube") is None:
+            failures += 1
+        timings.append(time.perf_counter() - start)
+    return timings, failures
+
+
+def make_engines(args, seed):
+    primary = FakeEngine("primary", args.median, stall_rate=args.stall_rate, stall=args.stall,
+                         failure_rate=args.failure_rate, seed=seed)
+    backup = FakeEngine("backup", args.median * 1.5, stall_rate=args.stall_rate, stall=args.stall,
+                        failure_rate=args.failure_rate, seed=seed + 1)
+    return primary, backup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=300)
+    parser.add_argument("--median", type=float, default=0.05, help="primary median latency in seconds")
+    parser.add_argument("--stall-rate", type=float, default=0.03, help="share of calls that stall")
+    parser.add_argument("--stall", type=float, default=1.0, help="extra seconds for a stalled call")
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    primary, _ = make_engines(args, args.seed)
+    timings, failures = run(primary, args.commands)
+    rows.append(["primary only", timings, failures, primary.calls])
+
+    primary, backup = make_engines(args, args.seed)
+    router = HedgedEngineRouter([primary, backup], default_deadline=args.median * 4, min_deadline=0.0)
+    timings, failures = run(router, args.commands)
+    rows.append(["hedged (p95 deadline)", timings, failures, primary.calls + backup.calls])
+    stats = router.stats()
+    router.close()
+
+    print()
+    print_table(["setup", "p50", "p95", "p99", "failed", "provider calls"], [[
+        label,
+        f"{percentile(t, 0.50) * 1000:.0f} ms",
+        f"{percentile(t, 0.95) * 1000:.0f} ms",
+        f"{percentile(t, 0.99) * 1000:.0f} ms",
+        failed,
+        f"{calls} ({calls / args.commands:.2f}/command)",
+    ] for label, t, failed, calls in rows])
+    print(f"\nHedged {stats['hedged']} of {stats['requests']} commands; "
+          f"primary deadline {stats['engines']['primary']['deadline'] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Reading recent history and time ranges from a large history log: the old
+readlines() of the whole file vs. HistoryLog's backwards tail read and
+sparse-index range query.
+
+Writes a --mb sized history.log (one entry a second, some multi-line) to a
+temporary directory first.
+
+    python -m benchmarks.bench_history_log [--mb 200]
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from modules.history_log import HistoryLog
+from benchmarks._common import print_table
+
+
+def write_log(path, megabytes):
+    start = datetime(2025, 1, 1)
+    target = megabytes * 1024 ** 2
+    written = entries = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            lines = []
+            for _ in range(10_000):
+                stamp = (start + timedelta(seconds=entries)).strftime("%Y-%m-%d %H:%M:%S")
+                entry = f"Executed: open the weather for city {entries % 977}"
+                if entries % 11 == 0:
+                    entry = f"Output: line one of {entries}\nline two\nline three"
+                lines.append(f"[{stamp}] {entry}\n")
+                entries += 1
+            chunk = "".join(lines)
+            f.write(chunk)
+            written += len(chunk)
+    return start, entries
+
+
+def timed(function, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=200, help="size of the generated history log")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "history.log"
+        start, entries = write_log(path, args.mb)
+        log = HistoryLog(path, max_bytes=None)
+        range_start = (start + timedelta(seconds=entries // 2)).strftime("%Y-%m-%d %H:%M:%S")
+        range_end = (start + timedelta(seconds=entries // 2 + 600)).strftime("%Y-%m-%d %H:%M:%S")
+
+        def readlines_tail():
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.readlines()[-50:]
+
+        def readlines_range():
+            with open(path, 'r', encoding='utf-8') as f:
+                return HistoryLog._filter(f, range_start, range_end)
+
+        index_time, _ = timed(lambda: log.between(range_start, range_start), repeat=1)
+        rows = []
+        for label, old, new in (
+            ("last 50 lines", readlines_tail, lambda: log.tail(50)),
+            ("10 minutes from the middle", readlines_range, lambda: log.between(range_start, range_end)),
+        ):
+            old_time, old_result = timed(old, repeat=2)
+            new_time, new_result = timed(new)
+            assert old_result == new_result, label
+            rows.append([label, f"{old_time * 1000:.0f} ms", f"{new_time * 1000:.2f} ms",
+                         f"{old_time / new_time:.0f}x"])
+
+    print()
+    print_table(["query", f"readlines() ({args.mb} MB)", "HistoryLog", "speed-up"], rows)
+    print(f"\nSparse index build (first range query): {index_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Local inference server: per-command model loading vs. a resident server, and
+sequential vs. concurrent (continuously batched) generation.
+
+Defaults to the random tiny model so it runs on CPU in CI; pass --model
+codellama/CodeLlama-7b-hf (with HF_TOKEN set) for real numbers.
+
+    python -m benchmarks.bench_inference_server [--model tiny] [--requests 8] [--tokens 64]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from modules.inference_server import InferenceClient, ensure_server, load_model
+from benchmarks._common import print_table
+
+PROMPT = "### User Command:\nopen youtube\n\n### Assistant Response (Python Code): \n"
+
+
+def run_requests(address, count, tokens, concurrent):
+    results = [None] * count
+
+    def one(i):
+        client = InferenceClient(address)
+        results[i] = client.generate(PROMPT, max_new_tokens=tokens, temperature=0)
+        client.close()
+
+    start = time.perf_counter()
+    if concurrent:
+        threads = [threading.Thread(target=one, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        for i in range(count):
+            one(i)
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--tokens", type=int, default=64, help="new tokens per request")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    load_model(args.model, token=os.getenv("HF_TOKEN"))
+    in_process_load = time.perf_counter() - start
+
+    # A private socket so an already running server is not reused or disturbed
+    address = os.path.join(tempfile.mkdtemp(), "bench-codegen.sock")
+    start = time.perf_counter()
+    client = ensure_server(args.model, address=address, max_batch=args.requests)
+    if client is None:
+        return 1
+    server_start = time.perf_counter() - start
+
+    try:
+        start = time.perf_counter()
+        client.generate(PROMPT, max_new_tokens=1, temperature=0)
+        warm_round_trip = time.perf_counter() - start
+
+        rows = [["in-process load (old CodeEngine)", f"{in_process_load:.2f} s", "-"],
+                ["server start (once per boot)", f"{server_start:.2f} s", "-"],
+                ["request to running server, 1 token", f"{warm_round_trip * 1000:.0f} ms", "-"]]
+        for concurrent in (False, True):
+            steps_before = client.ping()["steps"]
+            elapsed, results = run_requests(address, args.requests, args.tokens, concurrent)
+            steps = client.ping()["steps"] - steps_before
+            tokens = sum(r.get("new_tokens", 0) for r in results if r and r.get("ok"))
+            rows.append([f"{args.requests} requests, {'concurrent' if concurrent else 'sequential'}",
+                         f"{elapsed:.2f} s ({tokens / elapsed:.0f} tok/s)",
+                         f"{tokens / max(steps, 1):.1f} tokens/step"])
+    finally:
+        client.shutdown()
+
+    print()
+    print_table(["measurement", "time", "batching"], rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""
+Per-command latency with Whisper language auto-detection vs. a pinned language.
+
+Transcribes audio.wav and recording.wav with language=None (detection pass)
+and with the language pinned, bypassing the transcription cache and the
+language prior so both paths really run.
+
+    python -m benchmarks.bench_language_pin [--model base] [--language en] [--repeats 5] [files ...]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from modules.whisper_engine import WhisperEngine
+from benchmarks._common import PROJECT_ROOT, load_wav, print_table
+
+DEFAULT_FILES = [PROJECT_ROOT / "audio.wav", PROJECT_ROOT / "recording.wav"]
+
+
+def time_transcription(engine, audio, language, repeats):
+    timings = []
+    text = ""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = engine.transcribe_audio(audio, language=language, save_to_file=False)
+        timings.append(time.perf_counter() - start)
+        text = result["text"] if result else ""
+    return statistics.median(timings), text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", default=DEFAULT_FILES)
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--language", default="en", help="language to pin")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = WhisperEngine(args.model)
+    if not engine.load_model():
+        return
+    engine.use_cache = False
+    engine.use_language_prior = False
+    engine.language_setting = None
+    engine.warm_up()
+
+    rows = []
+    for path in args.files:
+        audio, rate = load_wav(path)
+        if rate != 16000:
+            print(f"⚠️ Skipping {path}: expected 16 kHz audio, got {rate} Hz")
+            continue
+        auto, auto_text = time_transcription(engine, audio, None, args.repeats)
+        pinned, pinned_text = time_transcription(engine, audio, args.language, args.repeats)
+        rows.append([
+            Path(path).name,
+            f"{len(audio) / rate:.1f}s",
+            f"{auto * 1000:.0f} ms",
+            f"{pinned * 1000:.0f} ms",
+            f"{(auto - pinned) * 1000:.0f} ms",
+            "yes" if auto_text.strip().lower() == pinned_text.strip().lower() else "no",
+        ])
+
+    print()
+    print_table(["file", "audio", "auto-detect", f"pinned '{args.language}'", "saved", "same text"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Requests, bytes and load time of a page under each network policy.
+
+Loads the fixture article page (images, a web font, a video, a stylesheet and
+"third-party" analytics/ad scripts on *.localhost hosts) in a pooled browser
+context per policy and reports what the local server actually sent. The
+fixture's tracker hosts are added to each policy's blocked domains, as a
+site-specific entry in the network_policies setting would.
+Needs browser-use and Playwright's Chromium.
+
+    python -m benchmarks.bench_network_policy [--runs 5] [--headed]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from modules.browser_pool import BrowserPool
+from modules.network_policy import POLICY_PRESETS, NetworkPolicy
+from benchmarks._common import print_table
+from benchmarks._fixture_site import FixtureSite
+
+FIXTURE_TRACKERS = ["ads.localhost", "analytics.localhost"]
+
+
+def fixture_policy(name):
+    config = dict(POLICY_PRESETS[name])
+    if config:
+        config["block_domains"] = config.get("block_domains", []) + FIXTURE_TRACKERS
+    return NetworkPolicy.from_config(config, name=name)
+
+
+async def load_page(pool, site, policy):
+    site.reset()
+    async with pool.session(network_policy=policy) as session:
+        await session.start()
+        page = await session.get_current_page()
+        start = time.perf_counter()
+        await page.goto(site.url + "article", wait_until="load")
+        elapsed = time.perf_counter() - start
+        stats = pool.network_stats(session)
+    return elapsed, site.requests, site.bytes_sent, stats
+
+
+async def run(args):
+    rows = []
+    with FixtureSite() as site:
+        pool = await BrowserPool(size=1, headless=not args.headed).start()
+        try:
+            for name in ("off", "lean", "text"):
+                policy = fixture_policy(name)
+                runs = [await load_page(pool, site, policy) for _ in range(args.runs)]
+                stats = runs[-1][3] or {}
+                rows.append([
+                    name,
+                    runs[-1][1],
+                    f"{runs[-1][2] / 1024:.0f} KB",
+                    f"{statistics.median(r[0] for r in runs) * 1000:.0f} ms",
+                    stats.get("blocked", 0),
+                    f"{stats.get('bytes_saved_estimate', 0) / 1024:.0f} KB",
+                ])
+        finally:
+            await pool.close()
+
+    print()
+    print_table(["policy", "requests served", "bytes served", "median load", "blocked", "saved (estimate)"],
+                rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Time-to-first-token with and without reuse of the instruction's KV cache.
+
+Runs CodeEngine's prompt through the BatchingGenerator in-process, once with
+the instruction sent as part of every prompt and once as a shared prefix.
+Defaults to the random tiny model (CPU, no download); pass
+--model codellama/CodeLlama-7b-hf with HF_TOKEN set for real numbers.
+
+    python -m benchmarks.bench_prefix_cache [--model tiny] [--runs 10]
+"""
+
+import argparse
+import os
+import statistics
+
+from modules.engine import CodeEngine
+from modules.inference_server import BatchingGenerator, load_model
+from benchmarks._common import print_table
+
+COMMANDS = ["open youtube", "open gmail and check my inbox", "take a screenshot",
+            "search for cats on youtube", "open notepad and type hello"]
+
+
+def prompt_for(command):
+    return "### User Command:\n" + command + "\n\n### Assistant Response (Python Code): \n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    model, tokenizer = load_model(args.model, token=os.getenv("HF_TOKEN"))
+    generator = BatchingGenerator(model, tokenizer).start()
+    instruction = CodeEngine.INSTRUCTION
+
+    def ttft(use_prefix):
+        timings = []
+        for i in range(args.runs):
+            command = COMMANDS[i % len(COMMANDS)]
+            if use_prefix:
+                reply = generator.submit(prompt_for(command), max_new_tokens=1, temperature=0, prefix=instruction)
+            else:
+                reply = generator.submit(instruction + prompt_for(command), max_new_tokens=1, temperature=0)
+            result = reply.get()
+            timings.append(result["ttft_seconds"])
+        return timings, result
+
+    ttft(False)  # warm-up
+    full, full_result = ttft(False)
+    first = generator.submit(prompt_for(COMMANDS[0]), max_new_tokens=1, temperature=0, prefix=instruction).get()
+    reused, reused_result = ttft(True)
+    generator.stop()
+
+    print()
+    print_table(["prompt", "tokens encoded per call", "median TTFT", "min TTFT"], [
+        ["full prompt every call", full_result["prompt_tokens"],
+         f"{statistics.median(full) * 1000:.1f} ms", f"{min(full) * 1000:.1f} ms"],
+        ["prefix, first call (encodes prefix)", first["prefix_tokens"] + first["prompt_tokens"],
+         f"{first['ttft_seconds'] * 1000:.1f} ms", "-"],
+        ["prefix KV cache reused", reused_result["prompt_tokens"],
+         f"{statistics.median(reused) * 1000:.1f} ms", f"{min(reused) * 1000:.1f} ms"],
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Cost of saving and querying execution results: rewriting one JSON file that
+holds every run vs. appending to the indexed results log.
+
+Fills both stores with --runs typical browser results, then times one more
+save, loading the latest run, the last 20 runs and a one-hour time range, and
+opening the log (index build). Works in a temporary directory.
+
+    python -m benchmarks.bench_results_log [--runs 5000]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from modules.results_log import ResultsLog
+from benchmarks._common import print_table
+
+
+def sample_results(number):
+    return {
+        "success": True,
+        "urls_visited": ["about:blank", f"https://example.com/search?q=item+{number}"],
+        "extracted_content": [f"🔗 Navigated to https://example.com/search?q=item+{number}",
+                              "Found 3 results. " * 20],
+        "final_result": f"Opened result {number}.",
+        "replayed": number % 3 == 0,
+    }
+
+
+def timed(function, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "results.json"
+        start_time = time.time() - args.runs * 60  # one run a minute
+        runs = [{"timestamp": start_time + i * 60, "results": sample_results(i)} for i in range(args.runs)]
+        json_path.write_text(json.dumps(runs), encoding="utf-8")
+
+        log = ResultsLog(Path(tmp) / "results.jsonl", max_runs=None)
+        for run in runs:
+            log.append(run["results"], timestamp=run["timestamp"])
+
+        def json_save():
+            data = json.loads(json_path.read_text(encoding="utf-8"))
+            data.append({"timestamp": time.time(), "results": sample_results(len(data))})
+            json_path.write_text(json.dumps(data), encoding="utf-8")
+
+        def json_query(select):
+            return select(json.loads(json_path.read_text(encoding="utf-8")))
+
+        hour_start, hour_end = start_time + 1000 * 60, start_time + 1060 * 60
+        rows = []
+        for label, json_fn, log_fn in (
+            ("save one run", json_save, lambda: log.append(sample_results(0))),
+            ("latest run", lambda: json_query(lambda d: d[-1]), log.latest),
+            ("last 20 runs", lambda: json_query(lambda d: d[-20:]), lambda: log.tail(20)),
+            ("one hour of runs", lambda: json_query(lambda d: [r for r in d if hour_start <= r["timestamp"] <= hour_end]),
+             lambda: log.between(hour_start, hour_end)),
+        ):
+            json_time, _ = timed(json_fn)
+            log_time, _ = timed(log_fn)
+            rows.append([label, f"{json_time * 1000:.2f} ms", f"{log_time * 1000:.3f} ms",
+                         f"{json_time / log_time:.0f}x"])
+
+        open_time, _ = timed(lambda: ResultsLog(log.path, max_runs=None), repeat=3)
+        size = log.path.stat().st_size
+
+    print()
+    print_table(["operation", f"JSON file ({args.runs} runs)", "results log", "speed-up"], rows)
+    print(f"\nOpening the log (index build over {size / 1024 ** 2:.1f} MB): {open_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
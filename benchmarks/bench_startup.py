@@ -0,0 +1,140 @@
+"""
+GUI startup benchmark: import time and time-to-interactive of base.py.
+
+Each measurement runs in a fresh interpreter so imports are cold. Without a
+display (or with --mock-tk) tkinter is replaced by a mock, so this runs on
+headless CI; under Xvfb (xvfb-run python -m benchmarks.bench_startup) the real
+Tk window is created instead.
+
+    python -m benchmarks.bench_startup [--runs 3] [--mock-tk]
+
+Reported per run:
+    import        seconds to import base.py
+    window        seconds until the window is built and drawn
+    interactive   seconds until the record button can record (recorder + Whisper warm)
+    all ready     seconds until every required startup task has finished
+"""
+
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import time
+
+from benchmarks._common import PROJECT_ROOT, print_table
+
+
+class _FakeRoot:
+    """Minimal stand-in for tk.Tk that runs after() callbacks from a queue."""
+
+    def __init__(self):
+        from unittest.mock import MagicMock
+        self._mock = MagicMock()
+        self.callbacks = queue.Queue()
+
+    def after(self, ms, func=None, *args):
+        if func is not None:
+            self.callbacks.put((func, args))
+
+    def after_idle(self, func, *args):
+        self.callbacks.put((func, args))
+
+    def update(self):
+        while True:
+            try:
+                func, args = self.callbacks.get_nowait()
+            except queue.Empty:
+                return
+            func(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._mock, name)
+
+
+def _install_fake_tk():
+    from unittest.mock import MagicMock
+    fake = MagicMock()
+    fake.Tk = _FakeRoot
+    sys.modules["tkinter"] = fake
+    for sub in ("ttk", "messagebox", "scrolledtext", "filedialog"):
+        sys.modules[f"tkinter.{sub}"] = getattr(fake, sub)
+
+
+def child(mock_tk, timeout):
+    """Measure one cold start and print the timings as JSON."""
+    if mock_tk:
+        _install_fake_tk()
+    sys.path.insert(0, str(PROJECT_ROOT))
+    os.chdir(PROJECT_ROOT)
+
+    t0 = time.perf_counter()
+    import base
+    t_import = time.perf_counter() - t0
+
+    root = base.tk.Tk()
+    app = base.VoiceAutomationGUI(root)
+    root.update()
+    t_window = time.perf_counter() - t0
+
+    t_interactive = None
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        root.update()
+        if t_interactive is None and app.startup.is_ready("recorder") and app.startup.is_ready("whisper"):
+            t_interactive = time.perf_counter() - t0
+        if app.startup.ready.is_set():
+            break
+        time.sleep(0.01)
+    t_ready = time.perf_counter() - t0 if app.startup.ready.is_set() else None
+
+    print(json.dumps({
+        "import": t_import,
+        "window": t_window,
+        "interactive": t_interactive,
+        "ready": t_ready,
+        "tasks": app.startup.timings(),
+        "errors": {k: str(v) for k, v in app.startup.errors.items()},
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--mock-tk", action="store_true", help="mock tkinter even if a display is available")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    mock_tk = args.mock_tk or (sys.platform != "win32" and not os.environ.get("DISPLAY"))
+    if args.child:
+        child(mock_tk, args.timeout)
+        return
+
+    print(f"Running {args.runs} cold starts ({'mocked Tk' if mock_tk else 'real Tk'})...")
+    rows = []
+    for run in range(args.runs):
+        cmd = [sys.executable, "-m", "benchmarks.bench_startup", "--child", "--timeout", str(args.timeout)]
+        if mock_tk:
+            cmd.append("--mock-tk")
+        proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"❌ Run {run + 1} failed:\n{proc.stderr[-2000:]}")
+            continue
+        data = json.loads(lines[-1])
+        fmt = lambda v: "-" if v is None else f"{v:.2f}s"
+        rows.append([run + 1, fmt(data["import"]), fmt(data["window"]),
+                     fmt(data["interactive"]), fmt(data["ready"]),
+                     ", ".join(f"{k}={v:.2f}s" for k, v in data["tasks"].items() if k != "total")])
+        for name, error in data["errors"].items():
+            print(f"⚠️ Run {run + 1}: {name} failed to load: {error}")
+
+    if rows:
+        print()
+        print_table(["run", "import", "window", "interactive", "all ready", "tasks"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Time-to-final-text: streaming vs. record-then-transcribe.
+
+Replays audio.wav and recording.wav in real time and measures how long after
+the last audio block the final transcription is available.
+
+    python -m benchmarks.bench_stream_transcription [--model base] [files ...]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from modules.whisper_engine import WhisperEngine
+from benchmarks._common import PROJECT_ROOT, load_wav, realtime_blocks, print_table
+
+DEFAULT_FILES = [PROJECT_ROOT / "audio.wav", PROJECT_ROOT / "recording.wav"]
+
+
+def run_batch(engine, audio, rate):
+    finished = {}
+    # Consume the replay the way record_audio_array() does: wait for all of it
+    collected = list(realtime_blocks(audio, rate, on_finished=lambda t: finished.setdefault("t", t)))
+    result = engine.transcribe_audio(np.concatenate(collected), save_to_file=False)
+    return time.perf_counter() - finished["t"], result["text"] if result else ""
+
+
+def run_stream(engine, audio, rate, step_seconds):
+    finished = {}
+    blocks = realtime_blocks(audio, rate, on_finished=lambda t: finished.setdefault("t", t))
+    result = engine.transcribe_stream(blocks, save_to_file=False, step_seconds=step_seconds)
+    return time.perf_counter() - finished["t"], result["text"] if result else "", result.get("partials", 0) if result else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", default=DEFAULT_FILES)
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--step", type=float, default=1.0, help="seconds of new audio between decodes")
+    args = parser.parse_args()
+
+    engine = WhisperEngine(args.model)
+    if not engine.load_model():
+        return
+
+    rows = []
+    for path in args.files:
+        audio, rate = load_wav(path)
+        if rate != 16000:
+            print(f"⚠️ Skipping {path}: expected 16 kHz audio, got {rate} Hz")
+            continue
+        batch_latency, batch_text = run_batch(engine, audio, rate)
+        stream_latency, stream_text, partials = run_stream(engine, audio, rate, args.step)
+        rows.append([
+            Path(path).name,
+            f"{len(audio) / rate:.1f}s",
+            f"{batch_latency * 1000:.0f} ms",
+            f"{stream_latency * 1000:.0f} ms",
+            partials,
+            "yes" if batch_text.strip().lower() == stream_text.strip().lower() else "no",
+        ])
+
+    print()
+    print_table(["file", "audio", "batch final", "stream final", "partials", "same text"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,10 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from conTracker import conTracker
 
+# Run from gmail/; the shared modules live in the project root
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+from modules.browser_runtime import load_browser_runtime
+
 load_dotenv()
 
     
@@ -31,12 +35,18 @@ class requestsMain:
             temperature=0.0
         )
 
-        #Configure the browserSession
-        self.browser_session = BrowserSession(
-            headless=False,
-            window_size={"width": 1920, "height": 1080},
-            viewport_size={"width": 1920, "height": 1080}
-        )
+        # The browser session is only built when something uses it; mode and
+        # viewport come from settings (browser_entry_points["requests_main"])
+        self._browser_session = None
+
+    @property
+    def browser_session(self):
+        """Browser session configured for this entry point, created on first use."""
+        if self._browser_session is None:
+            runtime = load_browser_runtime("requests_main")
+            self._browser_session = BrowserSession(**runtime.session_kwargs())
+        return self._browser_session
+
     def priceCalculator(self, width: int, height: int, paper_type: str):
         """Calculate the price of the request"""
         if paper_type == "glossy":
@@ -72,7 +72,7 @@ async def linkedin_login_session():
         print("🔧 Initializing LinkedIn automation engine...")
         
         # Use proper browser-use imports (same as modules/browser_use_engine.py)
-        from browser_use import Agent, BrowserSession
+        from browser_use import Agent
         from browser_use.llm import ChatOpenAI
         import os
         
@@ -92,12 +92,10 @@ async def linkedin_login_session():
             temperature=0.0
         )
         
-        # Configure browser session
-        browser_session = BrowserSession(
-            headless=False,
-            window_size={"width": 1920, "height": 1080},
-            viewport={"width": 1920, "height": 1080}
-        )
+        # Lease a warm browser context from the shared pool; it is not
+        # released, so the logged-in page stays open until the session ends
+        from modules.browser_pool import get_browser_pool
+        browser_session = await get_browser_pool(entry_point="limain").acquire()
         
         # Create agent using proper browser-use pattern
         agent = Agent(
@@ -127,10 +125,24 @@ async def linkedin_login_session():
         print("1. Make sure you have an OpenAI API key set")
         print("2. Check: pip install browser-use langchain-openai")
         print("3. Try: playwright install")
+    finally:
+        # The persistent browser keeps running; only this loop's pool closes
+        # (stop it with: python -m modules.browser_launcher --stop)
+        try:
+            from modules.browser_pool import close_browser_pools
+            await close_browser_pools()
+        except ImportError:
+            pass
 
 def main():
     """Main function"""
     print("🎯 Starting LinkedIn Login with liengine automation...")
+    try:
+        # Decide headless/headed/virtual (and start Xvfb) before the event loop runs
+        from modules.browser_runtime import prepare_browser_runtimes
+        prepare_browser_runtimes()
+    except ImportError:
+        pass
     asyncio.run(linkedin_login_session())
     print("👋 Session complete!")
 
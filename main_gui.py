@@ -5,6 +5,7 @@ import time
 import asyncio
 from modules.whisper_engine import WhisperEngine
 from modules.browser_use_engine import Engine
+from modules.browser_runtime import prepare_browser_runtimes
 from modules import voice_input as recording
 from modules.file_manager import get_file_manager
 
@@ -14,7 +15,7 @@ async def main():
     # Initialize file manager
     file_manager = get_file_manager()
     
-    whisper_obj = WhisperEngine("base")
+    whisper_obj = WhisperEngine(file_manager.load_settings().get("whisper_model", "base"))
     whisper_obj.load_model()
     engine_obj = Engine()
     print("What would you like me to do?")
@@ -24,35 +25,41 @@ async def main():
     print("Press 'q' to quit")
     print("--------------------------------")
 
-    while True:
-        user_input = input("Enter your command:")
-        if user_input == "y":
-            print("Recording...")
-            recording.record_audio("audio.wav")
-            result = whisper_obj.transcribe_file("audio.wav")
-            print("Recording stopped")
-            if result:
-                print(f"You asked the following: {result['text']}")
-                file_manager.save_transcription(result['text'])
-        elif user_input == "e":
-            print("Stopping recording...")
-            print("--------------------------------")
-            print("Executing command...")
-            print("--------------------------------")
-            browser_result = await engine_obj.executeCommand()
-            print("Saving results...")
-            engine_obj.save_results(browser_result)
-            print("--------------------------------")
-            print("Command executed")
-            print("--------------------------------")
-            print("Final result:")
-            print(browser_result.get('final_result', 'No final result available'))
-            break
-        elif user_input == "q":
-            print("Quitting...")
-            break
+    try:
+        while True:
+            user_input = input("Enter your command:")
+            if user_input == "y":
+                print("Recording...")
+                recording.record_audio("audio.wav")
+                result = whisper_obj.transcribe_file("audio.wav")
+                print("Recording stopped")
+                if result:
+                    print(f"You asked the following: {result['text']}")
+                    file_manager.save_transcription(result['text'])
+            elif user_input == "e":
+                print("Stopping recording...")
+                print("--------------------------------")
+                print("Executing command...")
+                print("--------------------------------")
+                browser_result = await engine_obj.executeCommand()
+                print("Saving results...")
+                engine_obj.save_results(browser_result)
+                print("--------------------------------")
+                print("Command executed")
+                print("--------------------------------")
+                print("Final result:")
+                print(browser_result.get('final_result', 'No final result available'))
+                break
+            elif user_input == "q":
+                print("Quitting...")
+                break
+    finally:
+        # Disconnect from the persistent browser before the event loop ends; the
+        # browser itself keeps running (stop it with: python -m modules.browser_launcher --stop)
+        await engine_obj.close()
 
-    
 
 if __name__ == "__main__":
+    # Decide headless/headed/virtual (and start Xvfb) before the event loop runs
+    prepare_browser_runtimes()
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Project Evee - Browser Action Traces
+Records the actions of browser-use agent runs that succeeded and replays them
+for the same task (the same command after normalization, by default) without
+asking the LLM to plan each step again. Near-duplicates are not replayed:
+"buy a usb cable" and "buy a usb charger" differ only in what gets typed, and
+a replay would type the recorded value.
+
+Before each replayed step the target element is looked up again in the live
+page by its recorded XPath, attributes and parent path (by browser-use's own
+history matching), so a changed page makes the replay stop and the task falls
+back to the LLM instead of clicking the wrong thing.
+
+Traces are stored in plain text (cache/action_traces.json), so runs that type
+into a password or other sensitive field (login forms, card numbers, one-time
+codes) are not recorded at all.
+"""
+
+import json
+import re
+import threading
+from .code_cache import CodeCache
+from .file_manager import get_file_manager
+
+TRACE_NAMESPACE = "browser_use"
+TRACE_VERSION = 1
+
+# Large, per-run state that a replay does not need
+_DROPPED_STATE_KEYS = ("screenshot", "screenshot_path")
+
+# Fields whose typed values must not end up on disk
+_SENSITIVE_TYPES = {"password"}
+_SENSITIVE_AUTOCOMPLETE = re.compile(r"password|one-time-code|cc-")
+_SENSITIVE_NAME = re.compile(r"pass|pwd|\bpin\b|otp|cvv|cvc|card|ssn|secret|token|security", re.IGNORECASE)
+
+
+def _is_sensitive(element):
+    """Whether an interacted element (DOMHistoryElement dict) takes secrets."""
+    if not element:
+        return False
+    attributes = element.get("attributes") or {}
+    if attributes.get("type", "").lower() in _SENSITIVE_TYPES:
+        return True
+    if _SENSITIVE_AUTOCOMPLETE.search(attributes.get("autocomplete", "").lower()):
+        return True
+    names = " ".join(attributes.get(key, "") for key in ("name", "id", "aria-label", "placeholder"))
+    return bool(_SENSITIVE_NAME.search(names))
+
+
+def _types_secrets(steps):
+    """Whether any recorded input_text action went to a sensitive field."""
+    for step in steps:
+        output = step.get("model_output") or {}
+        elements = (step.get("state") or {}).get("interacted_element") or []
+        for action, element in zip(output.get("action") or [], elements):
+            if "input_text" in action and _is_sensitive(element):
+                return True
+    return False
+
+
+def trace_from_history(task, history):
+    """
+    Turn a finished agent history into a replayable trace.
+
+    Args:
+        task (str): The task the agent ran
+        history (AgentHistoryList): Result of ``Agent.run()``
+
+    Returns:
+        dict: The trace, or None if the run did not succeed, took no actions
+              or typed into a sensitive field
+    """
+    if not history.is_done() or history.is_successful() is False or history.has_errors():
+        return None
+    data = history.model_dump()
+    for step in data["history"]:
+        for key in _DROPPED_STATE_KEYS:
+            step["state"].pop(key, None)
+    if not any(step["model_output"] and step["model_output"].get("action") for step in data["history"]):
+        return None
+    if _types_secrets(data["history"]):
+        # The typed value is also in the step's result text and the model's memory
+        print("⚠️ Not recording browser actions: the task typed into a sensitive field")
+        return None
+    return {"version": TRACE_VERSION, "task": task, "final_result": history.final_result(),
+            "history": data["history"]}
+
+
+def _replay_steps(trace):
+    """
+    Steps to replay: the recorded ones minus the final "done" action.
+
+    "done" carries the text the model wrote at recording time; a replay
+    reports what its own extraction steps returned instead.
+    """
+    steps = []
+    for step in trace["history"]:
+        output = step.get("model_output")
+        if not output or not output.get("action"):
+            continue
+        elements = step["state"].get("interacted_element") or [None] * len(output["action"])
+        kept = [(action, element) for action, element in zip(output["action"], elements)
+                if "done" not in action]
+        if not kept:
+            continue
+        steps.append({**step,
+                      "model_output": {**output, "action": [action for action, _ in kept]},
+                      "state": {**step["state"], "interacted_element": [element for _, element in kept]}})
+    return steps
+
+
+async def replay_trace(agent, trace, max_retries=1, delay_between_actions=0.5):
+    """
+    Replay a recorded trace with an agent (and its browser session).
+
+    Args:
+        agent (Agent): Agent for the task; its browser session is used
+        trace (dict): Trace from trace_from_history()
+        max_retries (int): Attempts per step before the replay is abandoned
+        delay_between_actions (float): Seconds to wait after each step
+
+    Returns:
+        dict: success, urls_visited, extracted_content, final_result (the last
+              extraction of this replay, None if it extracted nothing) and
+              replayed_steps
+
+    Raises:
+        RuntimeError: A step's element was not found on the page or an action failed
+    """
+    from browser_use.agent.views import AgentHistoryList
+
+    extracted = []
+    extraction_results = []
+    steps = _replay_steps(trace)
+    for number, step in enumerate(steps, 1):
+        step["model_output"] = agent.AgentOutput.model_validate(step["model_output"])
+        names = [name for action in step["model_output"].action
+                 for name in action.model_dump(exclude_none=True)]
+        # One step at a time, so a step that fails verification is reported
+        # as such and results line up with the step's actions
+        history = AgentHistoryList.model_validate({"history": [step]})
+        try:
+            results = await agent.rerun_history(history, max_retries=max_retries, skip_failures=False,
+                                                delay_between_actions=delay_between_actions)
+        except Exception as e:
+            raise RuntimeError(f"step {number}/{len(steps)} ({', '.join(names)}): {e}") from e
+        for name, result in zip(names, results):
+            if result.error:
+                raise RuntimeError(f"step {number}/{len(steps)} ({name}): {result.error}")
+            if result.extracted_content:
+                extracted.append(result.extracted_content)
+                if name.startswith("extract_"):
+                    extraction_results.append(result.extracted_content)
+
+    page = await agent.browser_session.get_current_page()
+    return {
+        'success': True,
+        'urls_visited': [page.url],
+        'extracted_content': extracted,
+        # Only fresh data: the recorded answer describes the page as it was
+        # then (prices, counts, messages) and would be reported as current
+        'final_result': extraction_results[-1] if extraction_results else None,
+        'replayed_steps': len(steps),
+    }
+
+
+def trace_cache_prompt(model):
+    """Identity of the agent setup a trace was recorded with; traces from another model are dropped."""
+    return f"browser-use trace v{TRACE_VERSION} {model}"
+
+
+def load_trace(text):
+    """Parse a stored trace; returns None if it is unreadable or from another version."""
+    try:
+        trace = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    return trace if isinstance(trace, dict) and trace.get("version") == TRACE_VERSION else None
+
+
+# Global action trace cache instance
+_trace_cache = None
+_trace_cache_lock = threading.Lock()
+
+def get_action_trace_cache() -> CodeCache:
+    """Get the global cache of recorded action traces, configured from settings."""
+    global _trace_cache
+    with _trace_cache_lock:
+        if _trace_cache is None:
+            settings = get_file_manager().load_settings()
+            _trace_cache = CodeCache(
+                ttl_seconds=float(settings.get("action_trace_ttl_hours", 168)) * 3600,
+                max_entries=int(settings.get("action_trace_max_entries", 100)),
+                fuzzy=bool(settings.get("action_trace_fuzzy", False)),
+                file_type='action_traces',
+                label='browser actions'
+            )
+    return _trace_cache
@@ -0,0 +1,270 @@
+"""
+Project Evee - Batch Transcription
+Re-transcribes archives of recorded commands with batched Whisper decoding,
+optionally fanned out across a process pool on CPU.
+
+    python -m modules.batch_transcribe recordings/ --model small --output transcripts.jsonl
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".flac", ".m4a", ".ogg", ".webm"}
+SAMPLE_RATE = 16000
+MAX_BATCH_SECONDS = 30  # Whisper's context; longer files fall back to transcribe()
+
+# Per-process model, set by _init_worker in pool workers
+_worker_model = None
+_worker_options = {}
+
+
+def _decode_group(model, paths, language=None):
+    """
+    Transcribe a group of files, batching the mel spectrograms of short clips.
+
+    Returns:
+        list: One result dict per path (with an 'error' key on failure)
+    """
+    import torch
+    import whisper
+
+    results = []
+    short = []
+    for path in paths:
+        try:
+            audio = whisper.load_audio(str(path))
+        except Exception as e:
+            results.append({"path": str(path), "error": f"load failed: {e}"})
+            continue
+        duration = len(audio) / SAMPLE_RATE
+        if duration <= MAX_BATCH_SECONDS:
+            short.append((path, audio, duration))
+        else:
+            try:
+                options = {"language": language} if language else {}
+                result = model.transcribe(audio, fp16=model.device.type != "cpu", **options)
+                results.append({"path": str(path), "text": result["text"].strip(),
+                                "language": result.get("language"), "duration": round(duration, 2)})
+            except Exception as e:
+                results.append({"path": str(path), "error": str(e)})
+
+    if short:
+        try:
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+                for _, audio, _ in short
+            ]).to(model.device)
+            options = whisper.DecodingOptions(language=language, without_timestamps=True,
+                                              fp16=model.device.type != "cpu")
+            decoded = model.decode(mels, options)
+            for (path, _, duration), result in zip(short, decoded):
+                results.append({"path": str(path), "text": result.text.strip(),
+                                "language": result.language, "duration": round(duration, 2)})
+        except Exception as e:
+            results.extend({"path": str(path), "error": str(e)} for path, _, _ in short)
+    return results
+
+
+def _init_worker(model_size, backend, device, dtype, language, threads):
+    """Load the model once per pool worker."""
+    global _worker_model, _worker_options
+    import torch
+    from .whisper_backends import get_backend
+    torch.set_num_threads(threads)
+    _worker_model = get_backend(backend, device=device, dtype=dtype).load(model_size)
+    _worker_options = {"language": language}
+
+
+def _worker_decode(paths):
+    return _decode_group(_worker_model, paths, **_worker_options)
+
+
+def collect_audio_files(inputs):
+    """Expand files and directories into a sorted list of audio file paths."""
+    paths = []
+    for item in inputs:
+        item = Path(item)
+        if item.is_dir():
+            paths.extend(p for p in item.rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS)
+        elif item.exists():
+            paths.append(item)
+        else:
+            print(f"⚠️ Skipping missing path: {item}")
+    return sorted(set(paths))
+
+
+def _completed_paths(output_path, model_size, backend="reference", language=None):
+    """
+    Paths already transcribed successfully with the same model size, backend
+    and requested language in an existing JSONL output. Other results do not
+    count, so re-running an archive with a larger model, another backend or a
+    pinned language transcribes it again.
+    """
+    key = {"model": model_size, "backend": backend, "requested_language": language}
+    done = set()
+    if output_path and Path(output_path).exists():
+        with open(output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a partially written last line from a crash
+                if "error" not in record and all(record.get(name) == value for name, value in key.items()):
+                    done.add(record["path"])
+    return done
+
+
+def _drop_torn_line(output_path):
+    """Cut a partially written last line (crash mid-write) so appends start on a new line."""
+    path = Path(output_path)
+    if not path.exists():
+        return
+    with open(path, "r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Scan back block by block for the last complete line
+        position = size
+        while position > 0:
+            block = min(64 * 1024, position)
+            position -= block
+            f.seek(position)
+            newline = f.read(block).rfind(b"\n")
+            if newline >= 0:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
+def transcribe_batch(paths, output_path=None, model_size="base", language=None,
+                     batch_size=8, workers=None, device=None, backend="reference",
+                     dtype=None, resume=True, model=None):
+    """
+    Transcribe many audio files, writing JSONL results as each batch finishes.
+
+    Args:
+        paths (list): Audio file paths
+        output_path (str, optional): JSONL file that results are appended to
+        model_size (str): Whisper model size
+        language (str, optional): Language code; auto-detected per file if None
+        batch_size (int): Files decoded together in one batched forward pass
+        workers (int, optional): Process pool size on CPU; defaults to
+                                 cpu_count // 2. Ignored on GPU (always 1).
+        device (str, optional): "cpu" or "cuda"; auto-detected if None
+        backend (str): Whisper backend name ("reference" or "int8")
+        dtype (str, optional): Weight precision for the reference backend
+        resume (bool): Skip files already transcribed with the same model_size,
+                       backend and language in output_path
+        model (optional): Already-loaded model to use in-process (workers=1)
+
+    Returns:
+        dict: Summary with 'files', 'succeeded', 'failed', 'skipped',
+              'seconds' and 'files_per_second'
+    """
+    from .model_registry import default_device
+    from .whisper_backends import get_backend
+
+    paths = [str(p) for p in paths]
+    skipped = 0
+    if resume and output_path:
+        done = _completed_paths(output_path, model_size, backend, language)
+        skipped = sum(1 for p in paths if p in done)
+        paths = [p for p in paths if p not in done]
+
+    if backend == "int8":
+        device = "cpu"
+    device = device or (model.device.type if model is not None else default_device())
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 2) // 2)
+    if device != "cpu" or len(paths) <= batch_size:
+        workers = 1
+
+    groups = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    summary = {"files": len(paths), "succeeded": 0, "failed": 0, "skipped": skipped}
+    print(f"🔄 Transcribing {len(paths)} files ({skipped} already done) "
+          f"with '{model_size}' on {device}, batch={batch_size}, workers={workers}")
+
+    if output_path:
+        _drop_torn_line(output_path)
+    out = open(output_path, "a", encoding="utf-8") if output_path else None
+    start = time.perf_counter()
+
+    def record(results):
+        for result in results:
+            result.update(model=model_size, backend=backend, requested_language=language)
+            if "error" in result:
+                summary["failed"] += 1
+                print(f"❌ {result['path']}: {result['error']}")
+            else:
+                summary["succeeded"] += 1
+            if out:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        if out:
+            # Flush per batch so a crash never loses finished work
+            out.flush()
+            os.fsync(out.fileno())
+        processed = summary["succeeded"] + summary["failed"]
+        elapsed = time.perf_counter() - start
+        print(f"   📊 {processed}/{len(paths)} files, {processed / elapsed:.2f} files/s")
+
+    try:
+        if workers == 1:
+            model = model or get_backend(backend, device=device, dtype=dtype).load(model_size)
+            for group in groups:
+                record(_decode_group(model, group, language=language))
+        else:
+            threads = max(1, (os.cpu_count() or workers) // workers)
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker,
+                                     initargs=(model_size, backend, device, dtype, language, threads)) as pool:
+                futures = [pool.submit(_worker_decode, group) for group in groups]
+                for future in as_completed(futures):
+                    record(future.result())
+    finally:
+        if out:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = round(elapsed, 2)
+    summary["files_per_second"] = round(len(paths) / elapsed, 2) if elapsed > 0 else 0.0
+    print(f"✅ Batch complete: {summary['succeeded']} ok, {summary['failed']} failed, "
+          f"{summary['files_per_second']} files/s")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-transcribe recorded commands with Whisper")
+    parser.add_argument("inputs", nargs="+", help="audio files or directories")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--output", default="transcripts.jsonl", help="JSONL output file")
+    parser.add_argument("--language", default=None, help="language code (default: auto-detect)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None, help="CPU worker processes")
+    parser.add_argument("--device", default=None, help="cpu or cuda")
+    parser.add_argument("--backend", default="reference", help="reference or int8")
+    parser.add_argument("--no-resume", action="store_true", help="re-transcribe files already in --output")
+    args = parser.parse_args()
+
+    paths = collect_audio_files(args.inputs)
+    if not paths:
+        print("❌ No audio files found")
+        return 1
+    summary = transcribe_batch(paths, output_path=args.output, model_size=args.model,
+                               language=args.language, batch_size=args.batch_size,
+                               workers=args.workers, device=args.device,
+                               backend=args.backend, resume=not args.no_resume)
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
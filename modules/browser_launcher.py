@@ -0,0 +1,256 @@
+"""
+Project Evee - Persistent Browser Launcher
+Starts Chromium as a detached process with remote debugging enabled and
+leaves it running, so browser pools in later event loops and later processes
+attach to it over CDP instead of cold-starting a browser each time (every
+asyncio.run() of an entry point used to launch its own Chromium).
+
+One browser runs per name (the browser runtime: mode and window size). Its
+port, pid and start time are kept in cache/browsers/<name>.json; a browser
+that no longer answers is replaced on the next ensure_browser(), and so is
+one older than ``max_age`` or using more than ``max_memory_mb`` (the browser
+and its renderer processes; needs psutil). Browser pools check those limits
+every few leases too (see BrowserPool), so a long session does not keep an
+ever-growing browser.
+
+The browsers keep running after the programs that use them exit:
+
+    python -m modules.browser_launcher --list
+    python -m modules.browser_launcher --stop      # stop every persistent browser
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from .file_manager import get_file_manager, interprocess_lock
+
+# Flags for a browser that only serves CDP clients
+_BASE_ARGS = (
+    "--remote-debugging-address=127.0.0.1",
+    "--remote-debugging-port=0",         # the port chosen is written to DevToolsActivePort
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-background-networking",
+)
+
+
+def _browsers_dir():
+    return get_file_manager().get_project_root() / "cache" / "browsers"
+
+
+def cdp_version(cdp_url, timeout=1.0):
+    """The browser's /json/version info, or None if nothing answers at ``cdp_url``."""
+    try:
+        with urllib.request.urlopen(f"{cdp_url}/json/version", timeout=timeout) as response:
+            return json.loads(response.read())
+    except Exception:
+        return None
+
+
+def _read_state(name):
+    try:
+        with open(_browsers_dir() / f"{name}.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _launch(name, executable, headless, launch_args, wait):
+    """Start a detached Chromium and return its state dict, or None."""
+    profile = _browsers_dir() / name
+    profile.mkdir(parents=True, exist_ok=True)
+    port_file = profile / "DevToolsActivePort"
+    if port_file.exists():
+        port_file.unlink()
+
+    command = [str(executable), f"--user-data-dir={profile}", *_BASE_ARGS, *launch_args]
+    if headless:
+        command.append("--headless=new")
+    command.append("about:blank")
+    options = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    if sys.platform == "win32":
+        options["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options["start_new_session"] = True  # survives the Python process and its Ctrl+C
+    process = subprocess.Popen(command, **options)
+
+    deadline = time.perf_counter() + wait
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            print(f"❌ Browser '{name}' exited on start (code {process.returncode})")
+            return None
+        try:
+            port = int(port_file.read_text().split()[0])
+        except (OSError, ValueError, IndexError):
+            time.sleep(0.05)
+            continue
+        state = {"pid": process.pid, "cdp_url": f"http://127.0.0.1:{port}", "args": command[1:],
+                 "started": time.time()}
+        if cdp_version(state["cdp_url"]):
+            return state
+        time.sleep(0.05)
+    print(f"❌ Browser '{name}' did not start within {wait}s")
+    process.kill()
+    return None
+
+
+def _memory_mb(pid):
+    """Resident memory of a browser and its child processes in MB, or None without psutil."""
+    try:
+        import psutil
+        process = psutil.Process(pid)
+        total = 0
+        for proc in [process] + process.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / 1024 ** 2
+    except Exception:
+        return None
+
+
+def _recycle_reason(state, max_age=None, max_memory_mb=None):
+    """Why a running browser should be restarted, or None."""
+    age = time.time() - state.get("started", time.time())
+    if max_age and age > max_age:
+        return f"running for {age / 3600:.1f}h"
+    if max_memory_mb:
+        memory = _memory_mb(state["pid"])
+        if memory is not None and memory > max_memory_mb:
+            return f"using {memory:.0f} MB"
+    return None
+
+
+def _terminate(state, wait=5.0):
+    """Stop a browser process and wait up to ``wait`` seconds for it to stop answering."""
+    try:
+        os.kill(state["pid"], signal.SIGTERM)
+    except OSError:
+        return False
+    deadline = time.perf_counter() + wait
+    while time.perf_counter() < deadline and cdp_version(state["cdp_url"], timeout=0.2):
+        time.sleep(0.05)
+    return True
+
+
+def needs_recycle(name, max_age=None, max_memory_mb=None):
+    """
+    Check a running persistent browser against its limits.
+
+    Returns:
+        str: Why it should be restarted, or None (also when it is not running)
+    """
+    state = _read_state(name)
+    if not state or not (max_age or max_memory_mb) or not cdp_version(state["cdp_url"]):
+        return None
+    return _recycle_reason(state, max_age, max_memory_mb)
+
+
+def ensure_browser(name, executable, headless=True, launch_args=(), wait=30, max_age=None, max_memory_mb=None):
+    """
+    Get the CDP URL of the persistent browser ``name``, starting it if needed.
+
+    Blocks while a browser starts; call it from a thread in async code. Safe
+    to call from several processes at once: only one of them launches. A
+    running browser past ``max_age`` or ``max_memory_mb`` is restarted, which
+    disconnects any other process attached to it.
+
+    Args:
+        name (str): Browser name (see BrowserRuntime.key)
+        executable (str): Chromium binary (Playwright's chromium.executable_path)
+        headless (bool): Start without windows
+        launch_args (tuple): Extra Chromium flags
+        wait (float): Seconds allowed for start-up
+        max_age (float, optional): Seconds a browser may run before it is restarted
+        max_memory_mb (float, optional): Memory above which it is restarted
+
+    Returns:
+        str: CDP URL (http://127.0.0.1:<port>), or None if the browser did not start
+    """
+    directory = _browsers_dir()
+    with interprocess_lock(directory / f"{name}.lock"):
+        state = _read_state(name)
+        if state and cdp_version(state["cdp_url"]):
+            reason = _recycle_reason(state, max_age, max_memory_mb)
+            if reason is None:
+                return state["cdp_url"]
+            print(f"🔄 Restarting persistent browser '{name}' ({reason})")
+            _terminate(state)
+
+        start = time.perf_counter()
+        state = _launch(name, executable, headless, list(launch_args), wait)
+        if state is None:
+            return None
+        tmp_path = directory / f"{name}.json.tmp"
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, directory / f"{name}.json")
+        print(f"✅ Persistent browser '{name}' started in {time.perf_counter() - start:.1f}s "
+              f"(pid {state['pid']}, {state['cdp_url']})")
+        return state["cdp_url"]
+
+
+def list_browsers():
+    """
+    Get the persistent browsers known on this machine.
+
+    Returns:
+        dict: name -> state dict (pid, cdp_url, args) plus 'running'
+    """
+    browsers = {}
+    directory = _browsers_dir()
+    if directory.exists():
+        for path in sorted(directory.glob("*.json")):
+            state = _read_state(path.stem)
+            if state:
+                state["running"] = cdp_version(state["cdp_url"]) is not None
+                browsers[path.stem] = state
+    return browsers
+
+
+def stop_browsers(names=None):
+    """
+    Stop persistent browsers.
+
+    Args:
+        names (list, optional): Browsers to stop; all of them by default
+
+    Returns:
+        int: Browsers stopped
+    """
+    stopped = 0
+    for name, state in list_browsers().items():
+        if names is not None and name not in names:
+            continue
+        with interprocess_lock(_browsers_dir() / f"{name}.lock"):
+            # Only signal the pid while it still serves the recorded port
+            if state["running"]:
+                if _terminate(state, wait=0):
+                    stopped += 1
+            try:
+                (_browsers_dir() / f"{name}.json").unlink()
+            except OSError:
+                pass
+    return stopped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project Evee persistent browsers")
+    parser.add_argument("--list", action="store_true", help="show the persistent browsers")
+    parser.add_argument("--stop", nargs="*", metavar="NAME", help="stop the named browsers (default: all)")
+    args = parser.parse_args()
+    if args.stop is not None:
+        print(f"✅ Stopped {stop_browsers(args.stop or None)} browser(s)")
+    else:
+        for name, state in list_browsers().items():
+            print(f"{'✅' if state['running'] else '❌'} {name}: pid {state['pid']}, {state['cdp_url']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
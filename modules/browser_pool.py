@@ -0,0 +1,368 @@
+"""
+Project Evee - Browser Pool
+Keeps one Chromium process and a few browser contexts warm and leases them
+to browser-use agents, so a task starts on an open page instead of paying a
+full browser cold start. The browser itself outlives the pool: by default it
+is a persistent Chromium (see browser_launcher.py) that pools of later event
+loops and processes attach to over CDP, restarted when it gets too old or
+too big. Each lease is isolated: a context
+that comes back is closed, with everything the task left in it, and a fresh
+one takes its place.
+"""
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from .file_manager import get_file_manager
+from .network_policy import NetworkInterceptor, load_network_policy
+from .browser_runtime import DEFAULT_VIEWPORT, load_browser_runtime
+from .browser_launcher import ensure_browser, needs_recycle
+
+# Images, fonts, media and trackers are blocked per context by the network
+# policy (see network_policy.py) rather than with Chromium switches
+DEFAULT_LAUNCH_ARGS = (
+    '--disable-plugins',          # Disable plugins
+    '--disable-extensions',       # Disable extensions
+    '--no-sandbox',               # Faster startup
+    '--disable-dev-shm-usage',    # Better performance
+)
+
+_pools = weakref.WeakKeyDictionary()  # event loop -> {BrowserRuntime.key: BrowserPool}
+
+
+class _PooledContext:
+    """A warm browser context."""
+
+    def __init__(self, context):
+        self.context = context
+        self.created = time.monotonic()
+
+
+class BrowserPool:
+    """
+    Pool of warm browser contexts in one shared Chromium.
+
+    ``acquire()`` returns a BrowserSession attached to an idle context (and
+    waits if all ``size`` contexts are leased); ``release()`` gives it back.
+    Prefer the ``session()`` context manager:
+
+        async with get_browser_pool().session() as browser_session:
+            agent = Agent(task=..., llm=..., browser_session=browser_session)
+            await agent.run()
+
+    Sessions from the pool are keep-alive, so an agent closing its session
+    leaves the browser running for the next task. ``close()`` closes the
+    pool's contexts and Playwright; a persistent browser keeps running.
+    """
+
+    def __init__(self, size=2, headless=False, viewport=None, launch_args=DEFAULT_LAUNCH_ARGS,
+                 cdp_url=None, persistent=None, network_policy=None, device_scale_factor=1,
+                 max_browser_age=None, max_browser_memory_mb=None, recycle_check_every=20):
+        """
+        Args:
+            size (int): Number of contexts kept warm (= tasks that can run at once)
+            headless (bool): Launch Chromium without a window
+            viewport (dict): Page size for every context
+            launch_args (tuple): Extra Chromium command-line flags
+            cdp_url (str, optional): Attach to an already running Chromium
+                                     (started with --remote-debugging-port)
+                                     instead of launching one
+            persistent (str, optional): Name of the persistent browser to
+                                        attach to, started on first use
+                                        (browser_launcher.ensure_browser);
+                                        None launches a browser owned by the pool
+            network_policy (NetworkPolicy, optional): Requests to block in
+                                                      leased contexts unless
+                                                      acquire() gets another
+            device_scale_factor (float): Device pixels per CSS pixel in every context
+            max_browser_age (float, optional): Seconds after which a persistent
+                                               browser is restarted
+            max_browser_memory_mb (float, optional): Memory of a persistent
+                                                     browser above which it is
+                                                     restarted (needs psutil)
+            recycle_check_every (int): Leases between checks of those limits;
+                                       a restart waits until no context is leased
+        """
+        self.size = size
+        self.headless = headless
+        self.viewport = dict(viewport or DEFAULT_VIEWPORT)
+        self.launch_args = list(launch_args)
+        self.cdp_url = cdp_url
+        self.persistent = persistent
+        self.network_policy = network_policy
+        self.device_scale_factor = device_scale_factor
+        self.max_browser_age = max_browser_age
+        self.max_browser_memory_mb = max_browser_memory_mb
+        self.recycle_check_every = recycle_check_every
+        self._since_check = 0
+        self.playwright = None
+        self.browser = None
+        self._idle = None
+        self._contexts = set()
+        self._start_lock = asyncio.Lock()
+        self._leases = {}  # id(BrowserSession) -> (_PooledContext, NetworkInterceptor or None)
+        self.stats_counters = {"leases": 0, "wait_seconds": 0.0, "browser_restarts": 0,
+                               "requests_blocked": 0, "bytes_saved_estimate": 0}
+
+    @property
+    def started(self):
+        return self.browser is not None and self.browser.is_connected()
+
+    async def start(self):
+        """
+        Attach to (or launch) Chromium and open the warm contexts.
+
+        Returns:
+            BrowserPool: self
+        """
+        async with self._start_lock:
+            if self.started:
+                return self
+            from playwright.async_api import async_playwright
+            start = time.perf_counter()
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+            cdp_url = self.cdp_url
+            if not cdp_url and self.persistent:
+                cdp_url = await asyncio.to_thread(ensure_browser, self.persistent,
+                                                  self.playwright.chromium.executable_path,
+                                                  self.headless, self.launch_args,
+                                                  max_age=self.max_browser_age,
+                                                  max_memory_mb=self.max_browser_memory_mb)
+                if not cdp_url:
+                    print("⚠️ Persistent browser unavailable, launching one for this pool")
+            if cdp_url:
+                self.browser = await self.playwright.chromium.connect_over_cdp(cdp_url)
+            else:
+                self.browser = await self.playwright.chromium.launch(headless=self.headless,
+                                                                     args=self.launch_args)
+            # Keep the queue (acquire() may be waiting on it); drop contexts of a lost browser
+            if self._idle is None:
+                self._idle = asyncio.Queue()
+            while not self._idle.empty():
+                self._idle.get_nowait()
+            self._contexts.clear()
+            contexts = await asyncio.gather(*(self._new_context() for _ in range(self.size)))
+            for pooled in contexts:
+                self._idle.put_nowait(pooled)
+            print(f"✅ Browser pool ready: {self.size} contexts in {time.perf_counter() - start:.1f}s")
+        return self
+
+    async def _new_context(self):
+        """Open a context with one blank page, so the first navigation has a tab to use."""
+        context = await self.browser.new_context(viewport=self.viewport,
+                                                 device_scale_factor=self.device_scale_factor)
+        await context.new_page()
+        pooled = _PooledContext(context)
+        self._contexts.add(pooled)
+        return pooled
+
+    async def _close_context(self, pooled):
+        self._contexts.discard(pooled)
+        try:
+            await pooled.context.close()
+        except Exception:
+            pass  # browser already gone
+
+    async def acquire(self, timeout=None, network_policy=None):
+        """
+        Lease a warm context.
+
+        Args:
+            timeout (float, optional): Seconds to wait for a free context
+            network_policy (NetworkPolicy, optional): Requests to block for
+                                                      this lease; defaults to
+                                                      the pool's policy
+
+        Returns:
+            BrowserSession: A keep-alive session on the leased context
+        """
+        from browser_use import BrowserSession
+        if not self.started:
+            await self.start()
+        waited = time.perf_counter()
+        pooled = await asyncio.wait_for(self._idle.get(), timeout)
+        self.stats_counters["wait_seconds"] += time.perf_counter() - waited
+        self.stats_counters["leases"] += 1
+
+        context = pooled.context
+        policy = network_policy or self.network_policy
+        interceptor = None
+        if policy is not None and policy.blocks_anything:
+            interceptor = NetworkInterceptor(policy)
+            await interceptor.attach(context)
+        page = context.pages[0] if context.pages else await context.new_page()
+        session = BrowserSession(
+            playwright=self.playwright,
+            browser=self.browser,
+            browser_context=context,
+            page=page,
+            keep_alive=True,
+            headless=self.headless,
+            viewport=self.viewport,
+            device_scale_factor=self.device_scale_factor,
+        )
+        self._leases[id(session)] = (pooled, interceptor)
+        return session
+
+    async def release(self, session):
+        """
+        Return a leased session's context to the pool.
+
+        The context is closed and a fresh one takes its place. Closing drops
+        everything the task left behind (cookies, storage of every origin,
+        service workers, permissions, tabs, and the listeners and init
+        scripts browser-use added), and a new context in a running browser
+        costs only milliseconds.
+
+        Args:
+            session (BrowserSession): Session returned by acquire()
+        """
+        pooled, interceptor = self._leases.pop(id(session), (None, None))
+        if pooled is None:
+            return
+        if interceptor is not None:
+            await interceptor.detach()
+            self.stats_counters["requests_blocked"] += interceptor.blocked
+            self.stats_counters["bytes_saved_estimate"] += interceptor.bytes_saved_estimate
+
+        await self._close_context(pooled)
+        if not self.started:
+            return
+        if await self._browser_due_for_restart():
+            await self._restart_browser()
+            return
+        self._idle.put_nowait(await self._new_context())
+
+    async def _browser_due_for_restart(self):
+        """Every ``recycle_check_every`` leases, check a persistent browser against its limits."""
+        if not (self.persistent and self.recycle_check_every and (self.max_browser_age or self.max_browser_memory_mb)):
+            return False
+        self._since_check += 1
+        if self._since_check < self.recycle_check_every or self._leases:
+            return False
+        self._since_check = 0
+        return await asyncio.to_thread(needs_recycle, self.persistent, self.max_browser_age,
+                                       self.max_browser_memory_mb) is not None
+
+    async def _restart_browser(self):
+        """Disconnect and reopen the contexts; start() has ensure_browser() restart the browser."""
+        async with self._start_lock:
+            while not self._idle.empty():
+                await self._close_context(self._idle.get_nowait())
+            try:
+                await self.browser.close()  # only disconnects from a persistent browser
+            except Exception:
+                pass
+            self.browser = None
+        self.stats_counters["browser_restarts"] += 1
+        await self.start()
+
+    def network_stats(self, session):
+        """Interception statistics of a leased session (None if nothing is blocked)."""
+        _, interceptor = self._leases.get(id(session), (None, None))
+        return interceptor.stats() if interceptor is not None else None
+
+    @asynccontextmanager
+    async def session(self, timeout=None, network_policy=None):
+        """Lease a session for the duration of an ``async with`` block."""
+        browser_session = await self.acquire(timeout, network_policy)
+        try:
+            yield browser_session
+        finally:
+            await self.release(browser_session)
+
+    def stats(self):
+        """
+        Get pool statistics.
+
+        Returns:
+            dict: contexts, idle contexts, leases, time spent waiting, browser
+                  restarts, and requests blocked / bytes saved by network policies
+        """
+        return {"contexts": len(self._contexts), "idle": self._idle.qsize() if self._idle else 0,
+                "leased": len(self._leases), **self.stats_counters}
+
+    async def close(self):
+        """
+        Close all contexts, the browser and Playwright. A browser attached
+        over CDP is only disconnected from and keeps running.
+        """
+        for pooled in list(self._contexts):
+            await self._close_context(pooled)
+        self._leases.clear()
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+
+def get_browser_pool(min_size=1, entry_point=None) -> BrowserPool:
+    """
+    Get the browser pool for the running event loop, configured from settings.
+
+    Playwright objects belong to the loop that created them, so pools are
+    kept per loop, and per browser runtime: entry points configured with the
+    same mode and viewport share one browser. The browser is attached to (or
+    launched) on the first acquire(). Unless browser_persistent is off, it
+    is a persistent Chromium that stays up between event loops and
+    processes, so a new pool only has to connect and open its contexts.
+    Callers close their pools with close_browser_pools() before their event
+    loop ends. The runtime's mode is resolved once per process; entry points
+    resolve it before their loop starts (prepare_browser_runtimes()), so a
+    virtual display is not started from inside the loop.
+
+    Args:
+        min_size (int): Contexts the caller wants to use at once; the pool
+                        gets at least this many unless its browser is
+                        already running
+        entry_point (str, optional): Entry point whose browser_entry_points
+                                     settings apply (see browser_runtime.py)
+    """
+    loop = asyncio.get_running_loop()
+    runtime = load_browser_runtime(entry_point)
+    pools = _pools.setdefault(loop, {})
+    pool = pools.get(runtime.key)
+    if pool is None:
+        settings = get_file_manager().load_settings()
+        # A persistent browser on a virtual display would lose its display
+        # when the process that started Xvfb exits
+        persistent = None
+        if settings.get("browser_persistent", True) and runtime.prepare() != "virtual":
+            persistent = "{}-{}x{}".format(*runtime.key[:3])
+        pool = BrowserPool(
+            size=max(int(settings.get("browser_pool_size", 2)), min_size),
+            launch_args=DEFAULT_LAUNCH_ARGS + tuple(runtime.launch_args()),
+            cdp_url=settings.get("browser_cdp_url") or None,
+            persistent=persistent,
+            network_policy=load_network_policy(),
+            max_browser_age=float(settings.get("browser_max_age_hours", 24)) * 3600 or None,
+            max_browser_memory_mb=float(settings.get("browser_max_memory_mb", 2048)) or None,
+            recycle_check_every=int(settings.get("browser_recycle_check_every", 20)),
+            **runtime.pool_kwargs(),
+        )
+        pools[runtime.key] = pool
+    elif pool.size < min_size and not pool.started:
+        pool.size = min_size
+    return pool
+
+
+async def close_browser_pools():
+    """
+    Close the browser pools of the running event loop.
+
+    Call it before leaving ``asyncio.run()``; a persistent browser keeps
+    running for the next caller.
+    """
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        try:
+            await pool.close()
+        except Exception as e:
+            print(f"⚠️ Error closing browser pool: {e}")
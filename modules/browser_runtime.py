@@ -0,0 +1,273 @@
+"""
+Project Evee - Browser Runtime Configuration
+Decides how each entry point runs its browser: headless, in a visible window,
+or in a window on a virtual X display (Xvfb), and at what viewport size.
+Configured in settings.json, with per-entry-point overrides, so the voice
+engine can stay headed on a desktop while LinkedIn and Gmail automations run
+headless on a server:
+
+    "browser_mode": "auto",
+    "browser_viewport": {"width": 1280, "height": 800},
+    "browser_entry_points": {"requests_main": {"mode": "headless"}}
+
+Modes: "headless"; "headed" (a window; falls back to a virtual display, then
+headless, when there is no display); "virtual" (a window on Xvfb, for sites
+that behave differently headless); "auto" (headed if there is a display,
+otherwise virtual if Xvfb is installed, otherwise headless).
+
+Each configured mode is resolved once per process, against the display the
+process started with: starting Xvfb changes DISPLAY, and a later "auto"
+runtime must not then resolve to something else and get a browser of its
+own. Entry points call prepare_browser_runtimes() at start-up, before their
+event loop runs, since starting Xvfb blocks for up to a few seconds.
+"""
+
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from .file_manager import get_file_manager
+
+BROWSER_MODES = ("auto", "headless", "headed", "virtual")
+
+# A smaller viewport than a 1920x1080 desktop means less layout, paint and
+# screenshot work per step, while staying wide enough for desktop layouts
+DEFAULT_VIEWPORT = {"width": 1280, "height": 800}
+# Window height taken by the tab strip and toolbar in headed Chromium
+_WINDOW_CHROME_HEIGHT = 85
+
+
+def has_display():
+    """Whether windows can be shown (always on Windows and macOS)."""
+    if sys.platform in ("win32", "darwin"):
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+_host_display = None  # has_display() before any virtual display was started
+_resolved_modes = {}  # configured mode -> mode used in this process
+_resolve_lock = threading.Lock()
+
+
+def host_has_display():
+    """Whether the process started with a display (a virtual display started since does not count)."""
+    global _host_display
+    if _host_display is None:
+        _host_display = has_display()
+    return _host_display
+
+
+class VirtualDisplay:
+    """An Xvfb server that browser windows can be opened on without a screen."""
+
+    def __init__(self, width, height, depth=24):
+        self.width = width
+        self.height = height
+        self.depth = depth
+        self.process = None
+        self.display = None
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self, timeout=5.0):
+        """
+        Start Xvfb on a free display number and point DISPLAY at it.
+
+        Returns:
+            bool: True if the display is running, False if Xvfb is missing or failed
+        """
+        if self.running:
+            return True
+        xvfb = shutil.which("Xvfb")
+        if not xvfb:
+            return False
+        number = next((n for n in range(99, 200) if not os.path.exists(f"/tmp/.X{n}-lock")), None)
+        if number is None:
+            return False
+        self.process = subprocess.Popen(
+            [xvfb, f":{number}", "-screen", "0", f"{self.width}x{self.height}x{self.depth}", "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + timeout
+        while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.stop()
+                return False
+            time.sleep(0.05)
+        self.display = f":{number}"
+        os.environ["DISPLAY"] = self.display
+        atexit.register(self.stop)
+        print(f"✅ Virtual display {self.display} ({self.width}x{self.height}) started")
+        return True
+
+    def stop(self):
+        """Stop Xvfb and unset DISPLAY if it still points at it."""
+        if self.process is None:
+            return
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        if self.display and os.environ.get("DISPLAY") == self.display:
+            del os.environ["DISPLAY"]
+        self.display = None
+
+
+# Global virtual display, shared by every browser in the process
+_virtual_display = None
+_virtual_display_lock = threading.Lock()
+
+def get_virtual_display(width=1920, height=1080) -> VirtualDisplay:
+    """Get the process-wide virtual display (not started until start() is called)."""
+    global _virtual_display
+    with _virtual_display_lock:
+        if _virtual_display is None:
+            _virtual_display = VirtualDisplay(width, height)
+    return _virtual_display
+
+
+class BrowserRuntime:
+    """
+    How one entry point runs its browser.
+
+    ``prepare()`` turns the configured mode into the one actually used on
+    this machine (starting a virtual display if needed, once per process);
+    the other methods give the matching BrowserPool / BrowserSession
+    arguments.
+    """
+
+    def __init__(self, mode="auto", viewport=None, device_scale_factor=1, entry_point="default"):
+        """
+        Args:
+            mode (str): "auto", "headless", "headed" or "virtual"
+            viewport (dict): Page size in CSS pixels
+            device_scale_factor (float): Device pixels per CSS pixel; 1 keeps
+                                         screenshots at viewport size
+            entry_point (str): Name the settings were looked up under
+        """
+        if mode not in BROWSER_MODES:
+            print(f"⚠️ Unknown browser mode '{mode}', using auto")
+            mode = "auto"
+        self.mode = mode
+        self.viewport = dict(viewport or DEFAULT_VIEWPORT)
+        self.device_scale_factor = device_scale_factor
+        self.entry_point = entry_point
+        self.resolved_mode = None
+
+    @property
+    def window_size(self):
+        return {"width": self.viewport["width"], "height": self.viewport["height"] + _WINDOW_CHROME_HEIGHT}
+
+    def _start_virtual_display(self):
+        size = self.window_size
+        display = get_virtual_display(max(size["width"], 1920), max(size["height"], 1080))
+        return display.start()
+
+    def prepare(self):
+        """
+        Resolve the mode for this machine.
+
+        The first runtime with a given mode resolves it (starting Xvfb may
+        block for up to 5 seconds; see prepare_browser_runtimes()); every
+        later one in the process gets the same answer.
+
+        Returns:
+            str: "headless", "headed" or "virtual"
+        """
+        if self.resolved_mode is None:
+            with _resolve_lock:
+                if self.mode not in _resolved_modes:
+                    _resolved_modes[self.mode] = self._resolve()
+                self.resolved_mode = _resolved_modes[self.mode]
+        return self.resolved_mode
+
+    def _resolve(self):
+        mode = self.mode
+        if mode == "virtual" or (mode in ("auto", "headed") and not host_has_display()):
+            if self._start_virtual_display():
+                mode = "virtual"
+            else:
+                if self.mode != "auto":
+                    print(f"⚠️ No display or Xvfb for {self.entry_point}, running the browser headless")
+                mode = "headless"
+        elif mode == "auto":
+            mode = "headed"
+        return mode
+
+    @property
+    def headless(self):
+        return self.prepare() == "headless"
+
+    def launch_args(self):
+        """Extra Chromium flags for this mode."""
+        if self.headless:
+            return []
+        size = self.window_size
+        return [f"--window-size={size['width']},{size['height']}"]
+
+    def pool_kwargs(self):
+        """Arguments for BrowserPool."""
+        return {"headless": self.headless, "viewport": self.viewport,
+                "device_scale_factor": self.device_scale_factor}
+
+    def session_kwargs(self):
+        """Arguments for a standalone browser_use.BrowserSession."""
+        kwargs = {"headless": self.headless, "viewport": self.viewport,
+                  "device_scale_factor": self.device_scale_factor}
+        if not self.headless:
+            kwargs["window_size"] = self.window_size
+        return kwargs
+
+    @property
+    def key(self):
+        """Runtimes with the same key can share a browser."""
+        return (self.prepare(), self.viewport["width"], self.viewport["height"], self.device_scale_factor)
+
+
+def load_browser_runtime(entry_point=None):
+    """
+    Get the browser runtime for an entry point from settings.
+
+    ``browser_mode``, ``browser_viewport`` and ``browser_device_scale_factor``
+    apply everywhere; ``browser_entry_points[entry_point]`` may override any
+    of them (as "mode", "viewport" and "device_scale_factor").
+
+    Args:
+        entry_point (str, optional): e.g. "browser_use_engine", "limain",
+                                     "liengine" or "requests_main"
+
+    Returns:
+        BrowserRuntime: The configured runtime (not prepared yet)
+    """
+    settings = get_file_manager().load_settings()
+    overrides = (settings.get("browser_entry_points") or {}).get(entry_point) or {}
+    return BrowserRuntime(
+        mode=overrides.get("mode", settings.get("browser_mode", "auto")),
+        viewport=overrides.get("viewport", settings.get("browser_viewport")),
+        device_scale_factor=float(overrides.get("device_scale_factor",
+                                                settings.get("browser_device_scale_factor", 1))),
+        entry_point=entry_point or "default",
+    )
+
+
+def prepare_browser_runtimes():
+    """
+    Resolve the browser mode of the default runtime and of every entry point
+    in ``browser_entry_points``.
+
+    Call it at start-up, before the event loop starts, so a virtual display
+    is not started (and waited for) inside the loop by get_browser_pool().
+
+    Returns:
+        dict: entry point ("default" for the global settings) -> resolved mode
+    """
+    settings = get_file_manager().load_settings()
+    entry_points = [None] + list(settings.get("browser_entry_points") or {})
+    return {entry_point or "default": load_browser_runtime(entry_point).prepare() for entry_point in entry_points}
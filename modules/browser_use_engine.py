@@ -2,11 +2,17 @@
 import os
 import json
 import asyncio
+import time
 from dotenv import load_dotenv
 load_dotenv()
-from browser_use import Agent, BrowserSession
+from browser_use import Agent
 from browser_use.llm import ChatOpenAI
 from .file_manager import get_file_manager
+from .browser_pool import close_browser_pools, get_browser_pool
+from .network_policy import load_network_policy
+from .dom_compactor import dom_compaction, system_message_note
+from .action_traces import (TRACE_NAMESPACE, get_action_trace_cache, load_trace, replay_trace,
+                            trace_cache_prompt, trace_from_history)
 
 class Engine:
     def __init__(self):
@@ -20,22 +26,24 @@ class Engine:
            temperature = 0.0,  # Faster responses
            )
        
-       # Configure browser using browser_use's BrowserSession
-       self.browser_session = BrowserSession(
-           headless=False,                    # Run in background (no visible window)
-           window_size={"width": 1920, "height": 1080},  # Window size (browser_use format)
-           viewport={"width": 1920, "height": 1080},     # Viewport size
-           slow_mo=0,                        # No delays for speed
-           # Performance optimizations
-           args=[
-               '--disable-images',           # Don't load images for speed
-               '--disable-javascript',       # Disable JS if not needed
-               '--disable-plugins',          # Disable plugins
-               '--disable-extensions',       # Disable extensions
-               '--no-sandbox',              # Faster startup
-               '--disable-dev-shm-usage'    # Better performance
-           ]
-       )
+       # Browser contexts are leased from the shared warm pool per command
+       # (headless/headed mode and viewport: modules/browser_runtime.py)
+       
+       # Successful runs are recorded and replayed for repeated tasks
+       settings = self.file_manager.load_settings()
+       self.traces = get_action_trace_cache() if settings.get("action_trace_enabled", True) else None
+       self.trace_prompt = trace_cache_prompt(self.llm.model)
+
+       # (results, run id) of the last save, so saving the same results again is a no-op
+       self._last_saved = None
+
+    async def close(self):
+        """
+        Close the browser pools of the running event loop. Call it before
+        the loop ends (e.g. at the end of asyncio.run()); the persistent
+        browser keeps running for the next command.
+        """
+        await close_browser_pools()
 
     async def executeCommand(self):
         # Read from file manager
@@ -43,35 +51,167 @@ class Engine:
         if not text:
             return "error: No transcription available"
 
-        # Create agent with the configured browser session
+        # Lease a warm, freshly cleared browser context for this command
+        pool = get_browser_pool(entry_point="browser_use_engine")
+        async with pool.session() as browser_session:
+            results = await self._run_task(text, browser_session)
+            results['network'] = pool.network_stats(browser_session)
+        
+        # Auto-save results
+        self.save_results(results)
+        return results 
+
+    async def executeTasks(self, tasks, concurrency=None):
+        """
+        Run many browser tasks concurrently, each on its own pooled browser context.
+
+        Tasks are taken from a queue by ``concurrency`` workers. A failing task
+        is recorded and does not stop the others. Each task's results are
+        appended to the results log (kind "batch_task", with the batch_id) as
+        soon as the task finishes, so an interrupted batch keeps what it
+        finished; a "batch" run summarizing the tasks and pointing to their
+        run ids is logged at the end.
+
+        Args:
+            tasks (list): Task strings, or dicts with "task" and optional "id"
+                          and "network_policy" (a policy name; defaults to
+                          the network_policy setting)
+            concurrency (int, optional): Tasks run at once; defaults to the
+                                         browser_task_concurrency setting
+
+        Returns:
+            list: One result dict per task, in input order, with task_id, task,
+                  batch_id, run_id, success, error, seconds and the agent's
+                  urls_visited, extracted_content and final_result
+        """
+        settings = self.file_manager.load_settings()
+        concurrency = max(1, int(concurrency or settings.get("browser_task_concurrency", 2)))
+        pool = get_browser_pool(min_size=concurrency, entry_point="browser_use_engine")
+
+        queue = asyncio.Queue()
+        for index, task in enumerate(tasks):
+            if isinstance(task, str):
+                task = {"task": task}
+            policy = load_network_policy(task["network_policy"]) if task.get("network_policy") else None
+            queue.put_nowait((index, task.get("id") or f"task-{index + 1}", task["task"], policy))
+        results = [None] * queue.qsize()
+        batch_id = self.file_manager.new_batch_id()
+        batch_start = time.perf_counter()
+
+        async def worker():
+            while True:
+                try:
+                    index, task_id, text, policy = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                print(f"🔄 [{task_id}] {text}")
+                try:
+                    async with pool.session(network_policy=policy) as browser_session:
+                        result = await self._run_task(text, browser_session)
+                        result['network'] = pool.network_stats(browser_session)
+                    result['error'] = None
+                    if not result['success']:
+                        result['error'] = (result.get('errors') or [None])[-1] or (
+                            "Agent reported failure" if result.get('done') else "Agent did not finish")
+                except Exception as e:
+                    result = {'success': False, 'error': f"{type(e).__name__}: {e}", 'done': False, 'errors': [],
+                              'urls_visited': [], 'extracted_content': [], 'final_result': None}
+                result.update(task_id=task_id, task=text, batch_id=batch_id,
+                              seconds=round(time.perf_counter() - start, 2))
+                result['run_id'] = self.file_manager.save_results(result, kind="batch_task")
+                results[index] = result
+                print(f"{'✅' if result['success'] else '❌'} [{task_id}] finished in {result['seconds']}s")
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(results)) or 1)))
+
+        succeeded = sum(1 for r in results if r['success'])
+        print(f"📊 {succeeded}/{len(results)} tasks succeeded in "
+              f"{time.perf_counter() - batch_start:.1f}s (concurrency {concurrency})")
+        summary = [{key: result.get(key) for key in ('task_id', 'task', 'run_id', 'success', 'error', 'seconds')}
+                   for result in results]
+        self.file_manager.save_batch_results(summary, batch_id=batch_id)
+        return results
+
+    async def _run_task(self, task, browser_session):
+        """
+        Run one task on a leased browser session and return its results dict.
+
+        A recorded trace for the task is replayed first; the LLM agent only
+        runs when there is none or a replayed step fails verification, and a
+        successful LLM run is recorded for next time.
+        """
         agent = Agent(
-            task=text, 
+            task=task, 
             llm=self.llm, 
-            browser_session=self.browser_session,
+            browser_session=browser_session,
             use_vision=False,                # Disable vision for speed
             max_actions_per_step=5,          # Limit actions for efficiency
+            extend_system_message=system_message_note(),  # How compacted page listings read
             )
 
-        # Run agent
-        history = await agent.run()
+        trace = None
+        if self.traces:
+            trace = load_trace(self.traces.lookup(task, self.trace_prompt, namespace=TRACE_NAMESPACE))
+        if trace:
+            try:
+                results = await replay_trace(agent, trace)
+                print(f"⚡ Replayed {results['replayed_steps']} recorded steps without the LLM")
+                results['replayed'] = True
+                return results
+            except Exception as e:
+                print(f"⚠️ Replay stopped at {e}; continuing with the LLM")
+                # Forget the trace under this task and the one it was recorded for
+                self.traces.invalidate(task, namespace=TRACE_NAMESPACE)
+                self.traces.invalidate(trace.get("task", task), namespace=TRACE_NAMESPACE)
+
+        # Page listings sent to the LLM are compacted and diffed per step
+        with dom_compaction() as compactor:
+            history = await agent.run()
+        results = self._history_results(history)
+        results['replayed'] = False
+        if compactor:
+            results['dom'] = compactor.stats()
+        if self.traces:
+            recorded = trace_from_history(task, history)
+            if recorded:
+                self.traces.put(task, json.dumps(recorded), self.trace_prompt, namespace=TRACE_NAMESPACE)
+        return results
 
-        # Return status (success or failure)
-        results = {
-            'success': True,
+    def _history_results(self, history):
+        """
+        Summarize an agent history as a results dict.
+
+        'success' is True only when the agent finished (called "done") and
+        reported success; running out of steps or giving up is a failure.
+        """
+        done = history.is_done()
+        return {
+            'success': bool(done and history.is_successful()),
+            'done': done,
+            'errors': [error for error in history.errors() if error],
             'urls_visited': history.urls() if hasattr(history, 'urls') else [],
             'extracted_content': history.extracted_content() if hasattr(history, 'extracted_content') else [],
             'final_result': history.final_result() if hasattr(history, 'final_result') else None,
         }
-        
-        # Auto-save results
-        self.save_results(results)
-        return results 
 
     def save_results(self, results):
-        # Log for results
+        """
+        Log a command's results, once: executeCommand() saves them itself, so
+        callers saving the returned results again do not log a second run.
+
+        Returns:
+            str: The run id, or None on failure
+        """
+        if self._last_saved is not None and self._last_saved[0] is results:
+            print(f"Results already saved as run {self._last_saved[1]}")
+            return self._last_saved[1]
         # Save to a file using file manager
-        if self.file_manager.save_results(results):
+        run_id = self.file_manager.save_results(results)
+        if run_id:
+            self._last_saved = (results, run_id)
             print("Results saved successfully")
         else:
-            print("Failed to save results") 
+            print("Failed to save results")
+        return run_id
         
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""
+Project Evee - Generated Code Cache
+Reuses automation code for voice commands that were already run successfully,
+so repeated commands like "open youtube" skip the LLM call entirely.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from difflib import SequenceMatcher
+from .file_manager import get_file_manager
+
+# Politeness and filler that Whisper transcribes but that never changes the task.
+# Words that can name what to click or type ("ok", "okay", "just") are not filler
+FILLER_PHRASES = (
+    "hey evee", "evee", "please", "can you", "could you", "would you",
+    "i want to", "i would like to", "i'd like to", "i wanna", "for me",
+    "um", "uh", "erm",
+)
+_FILLER_PATTERN = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in FILLER_PHRASES) + r")\b")
+
+# Words a near-duplicate command may add, drop or swap without naming another task
+NEUTRAL_WORDS = frozenset({"a", "an", "the", "some", "my", "me", "now"})
+
+
+def normalize_command(text):
+    """
+    Reduce a transcription to the words that define the task.
+
+    Lowercases, drops punctuation and filler phrases, and collapses
+    whitespace, so "Please, open YouTube." and "open youtube" are equal.
+
+    Args:
+        text (str): Transcribed command
+
+    Returns:
+        str: Normalized command
+    """
+    text = text.lower().replace("’", "'")
+    text = re.sub(r"[^\w\s']", " ", text)
+    text = _FILLER_PATTERN.sub(" ", text)
+    return " ".join(text.split())
+
+
+def prompt_hash(prompt):
+    """Short hash of a system prompt; entries made under another prompt are stale."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def commands_match(a, b):
+    """
+    Whether two normalized commands ask for the same thing.
+
+    Commands match when they differ only in word breaks ("you tube" vs.
+    "youtube") or in inserted, dropped or swapped NEUTRAL_WORDS ("open the
+    calculator" vs. "open calculator"). Any other difference counts, however
+    small: a name ("email john" vs. "email joan"), a number, a path or the
+    order of the words ("move a.txt to b" vs. "move b to a.txt"). Those are
+    different tasks, and reusing the code of one for the other is wrong.
+    """
+    if a == b or a.replace(" ", "") == b.replace(" ", ""):
+        return True
+    a_words, b_words = a.split(), b.split()
+    matcher = SequenceMatcher(None, a_words, b_words, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal" and not all(word in NEUTRAL_WORDS for word in a_words[i1:i2] + b_words[j1:j2]):
+            return False
+    return True
+
+
+class CodeCache:
+    """
+    Persistent cache of approved automation code keyed by normalized command.
+
+    Only code that ran successfully is stored (see put()). Lookups try an
+    exact match on the normalized command first and then, if ``fuzzy``, a
+    stored command that commands_match() it. Entries expire after ``ttl_seconds``,
+    the least recently used ones are evicted beyond ``max_entries``, and
+    entries created under a different system prompt are dropped.
+    """
+
+    def __init__(self, ttl_seconds=7 * 24 * 3600, max_entries=200, fuzzy=True,
+                 file_type='code_cache', label='code'):
+        """
+        Args:
+            ttl_seconds (float): Lifetime of an entry since it was stored
+            max_entries (int): Maximum number of cached commands
+            fuzzy (bool): Also reuse entries of near-duplicate commands (see
+                          commands_match()); otherwise exact (normalized) matches only
+            file_type (str): FileManager file the entries are persisted to
+            label (str): What is cached, for log messages
+        """
+        self.file_manager = get_file_manager()
+        self.file_type = file_type
+        self.label = label
+        self.file_manager.get_file_path(file_type).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.fuzzy = fuzzy
+        self._lock = threading.Lock()
+        self._entries = self.file_manager.load_json(file_type, {}) or {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(namespace, normalized):
+        return f"{namespace}|{normalized}"
+
+    def _expire(self, now):
+        """Drop expired entries; caller holds the lock. Returns True if any were removed."""
+        expired = [key for key, entry in self._entries.items()
+                   if now - entry.get("created", 0) > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+        return bool(expired)
+
+    def _save(self):
+        self.file_manager.save_json(self.file_type, self._entries)
+
+    def lookup(self, command, prompt, namespace="default"):
+        """
+        Find stored code for a command.
+
+        Args:
+            command (str): Transcribed command
+            prompt (str): System prompt the calling engine uses
+            namespace (str): Engine name, so engines never share code
+
+        Returns:
+            str: The cached code, or None on a miss
+        """
+        normalized = normalize_command(command)
+        if not normalized:
+            return None
+        current = prompt_hash(prompt)
+        now = time.time()
+
+        with self._lock:
+            changed = self._expire(now)
+            stale = [key for key, entry in self._entries.items()
+                     if entry.get("namespace") == namespace and entry.get("prompt") != current]
+            for key in stale:
+                del self._entries[key]
+            changed = changed or bool(stale)
+
+            entry = self._entries.get(self.make_key(namespace, normalized))
+            if entry is None and self.fuzzy:
+                entry = next((candidate for candidate in self._entries.values()
+                              if candidate.get("namespace") == namespace
+                              and commands_match(normalized, candidate["normalized"])), None)
+
+            if entry is None:
+                self.misses += 1
+                if changed:
+                    self._save()
+                return None
+
+            self.hits += 1
+            entry["last_used"] = now
+            entry["hits"] = entry.get("hits", 0) + 1
+            self._save()
+            print(f"⚡ Reusing cached {self.label} for \"{entry['command']}\"")
+            return entry["code"]
+
+    def put(self, command, code, prompt, namespace="default"):
+        """
+        Store code that was approved and ran successfully.
+
+        Args:
+            command (str): Transcribed command
+            code (str): The code that was executed
+            prompt (str): System prompt the code was generated with
+            namespace (str): Engine name
+
+        Returns:
+            bool: True if stored
+        """
+        normalized = normalize_command(command)
+        if not normalized or not code:
+            return False
+        now = time.time()
+        key = self.make_key(namespace, normalized)
+
+        with self._lock:
+            previous = self._entries.get(key, {})
+            self._entries[key] = {
+                "namespace": namespace,
+                "command": command.strip(),
+                "normalized": normalized,
+                "code": code,
+                "prompt": prompt_hash(prompt),
+                "created": previous.get("created", now) if previous.get("code") == code else now,
+                "last_used": now,
+                "hits": previous.get("hits", 0),
+            }
+            self._expire(now)
+            while len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k].get("last_used", 0))
+                del self._entries[oldest]
+            self._save()
+        return True
+
+    def invalidate(self, command, namespace="default"):
+        """Forget the code for a command (e.g. after it failed). Returns True if it was cached."""
+        key = self.make_key(namespace, normalize_command(command))
+        with self._lock:
+            removed = self._entries.pop(key, None) is not None
+            if removed:
+                self._save()
+        return removed
+
+    def clear(self):
+        """Delete every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: entries, hits, misses and hit_rate for this process
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+# Global code cache instance
+_code_cache = None
+_code_cache_lock = threading.Lock()
+
+def get_code_cache() -> CodeCache:
+    """Get the global code cache, configured from settings."""
+    global _code_cache
+    with _code_cache_lock:
+        if _code_cache is None:
+            settings = get_file_manager().load_settings()
+            _code_cache = CodeCache(
+                ttl_seconds=float(settings.get("code_cache_ttl_hours", 168)) * 3600,
+                max_entries=int(settings.get("code_cache_max_entries", 200)),
+                fuzzy=bool(settings.get("code_cache_fuzzy", True))
+            )
+    return _code_cache
@@ -0,0 +1,175 @@
+"""
+Project Evee - Code Generation Engine Interface
+What every code-generation provider implements, and the shared plumbing
+(prompt, fence cleanup, code cache, saving) they used to duplicate.
+"""
+
+import re
+from typing import Optional, Protocol, runtime_checkable
+from .code_cache import get_code_cache
+from .code_validator import get_code_validator
+from .file_manager import get_file_manager
+
+# Instructions for the model
+INSTRUCTION = """You are a personal in-house POC assistant.
+        Your purpose is to receive text commands (e.g., "I want to watch some youtube videos")
+        and write python code using pyautogui, pywinauto, selenium to complete the task.
+        Return ONLY the Python code, no explanations, no markdown formatting, no comments, no text before or after the code."""
+
+
+@runtime_checkable
+class CodeGenerator(Protocol):
+    """Anything that turns a voice command into automation code."""
+
+    name: str
+
+    def generate_code(self, user_request: Optional[str] = None) -> Optional[str]:
+        """Return code for the command (default: the saved transcription), or None."""
+        ...
+
+    def approve_code(self, user_request: str, code: str) -> bool:
+        """Called after the code ran successfully."""
+        ...
+
+    def reject_code(self, user_request: str) -> bool:
+        """Called after the code failed."""
+        ...
+
+
+class BaseCodeEngine:
+    """
+    Base class for code-generation providers.
+
+    Subclasses set ``name`` (also the code cache namespace), may override
+    ``INSTRUCTION``, and implement ``_generate(user_request)``, which only has
+    to call the model. generate_code() takes care of reading the
+    transcription, of the code cache and of validation: code that does not
+    compile or imports something outside the allowlist is sent back to the
+    model with the error instead of being returned.
+    """
+
+    name = "base"
+    INSTRUCTION = INSTRUCTION
+
+    def __init__(self):
+        """Set up the file manager and, if enabled, the shared code cache."""
+        self.file_manager = get_file_manager()
+        settings = self.file_manager.load_settings()
+        self.code_cache = get_code_cache() if settings.get("code_cache_enabled", True) else None
+        self.validator = get_code_validator() if settings.get("code_validation_enabled", True) else None
+        self.validation_retries = int(settings.get("code_validation_retries", 2))
+
+    def clean_code(self, text):
+        """Clean the response to extract only Python code."""
+        # Remove markdown code block markers
+        text = re.sub(r'```python\s*', '', text)
+        text = re.sub(r'```\s*$', '', text)
+
+        # Remove any leading/trailing whitespace
+        text = text.strip()
+
+        return text
+
+    def _resolve_request(self, user_request=None):
+        """Return the command text, reading the saved transcription if none was given."""
+        # Read the user command from the file manager
+        user_request = user_request or self.file_manager.load_transcription()
+        if not user_request:
+            print("Error: No transcription available. Please record audio first.")
+            return None
+        return user_request
+
+    def cached_code(self, user_request):
+        """Code previously approved for this (or a near-identical) command, if any."""
+        if not self.code_cache:
+            return None
+        return self.code_cache.lookup(user_request, self.INSTRUCTION, namespace=self.name)
+
+    def approve_code(self, user_request, code):
+        """Remember code that ran successfully so the command can skip the model next time."""
+        if not self.code_cache:
+            return False
+        return self.code_cache.put(user_request, code, self.INSTRUCTION, namespace=self.name)
+
+    def reject_code(self, user_request):
+        """Forget cached code for a command whose execution failed."""
+        if not self.code_cache:
+            return False
+        return self.code_cache.invalidate(user_request, namespace=self.name)
+
+    def generate_code(self, user_request=None):
+        """
+        Generate code based on the user's request.
+
+        Args:
+            user_request (str, optional): Command text; defaults to the saved transcription
+
+        Returns:
+            str: The generated code, or None on failure
+        """
+        user_request = self._resolve_request(user_request)
+        if not user_request:
+            return None
+
+        cached = self.cached_code(user_request)
+        if cached:
+            if not self.validator or self.validator.validate(cached)["ok"]:
+                return cached
+            # Approved under an older allowlist; drop it and ask the model again
+            self.reject_code(user_request)
+
+        return self.ensure_valid_code(user_request, self._generate(user_request))
+
+    def ensure_valid_code(self, user_request, code):
+        """
+        Validate code and regenerate it until it passes.
+
+        Each retry repeats the command together with the rejected code and
+        the validation error, so the model can fix it rather than produce the
+        same thing again.
+
+        Args:
+            user_request (str): Command text
+            code (str): Code to check
+
+        Returns:
+            str: Valid code, or None if it is still invalid after the configured retries
+        """
+        if not self.validator or code is None:
+            return code
+        for attempt in range(self.validation_retries + 1):
+            result = self.validator.validate(code)
+            if result["ok"]:
+                return code
+            print(f"⚠️ Generated code rejected: {result['error']}")
+            if attempt == self.validation_retries:
+                break
+            print(f"🔄 Regenerating code (attempt {attempt + 2} of {self.validation_retries + 1})")
+            code = self._generate(self._repair_request(user_request, code, result["error"]))
+            if code is None:
+                return None
+        print("❌ Could not generate valid code for this command")
+        return None
+
+    def _repair_request(self, user_request, code, error):
+        """Command text asking the model to fix code that failed validation."""
+        return (f"{user_request}\n\n"
+                f"Your previous answer was rejected before running it ({error}):\n"
+                f"{code}\n\n"
+                f"Return a corrected version. Only import these modules: "
+                f"{', '.join(sorted(self.validator.allowed_imports or []))}.")
+
+    def _generate(self, user_request):
+        """Ask the model for code; returns the cleaned code or None."""
+        raise NotImplementedError
+
+    def save_code(self, code, filename="automation_code.py"):
+        """Save the generated code to a file."""
+        try:
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(code)
+            print(f"Code saved to {filename}")
+            return True
+        except Exception as e:
+            print(f"Error saving code: {str(e)}")
+            return False
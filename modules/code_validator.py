@@ -0,0 +1,173 @@
+"""
+Project Evee - Generated Code Validation
+Checks automation code before it runs: the source must parse, may only
+import allowed modules, and is compiled once. Results (including the code
+object) are cached by content hash, so a repeated command skips parsing and
+compiling and a broken script is caught before the user waits for it to fail.
+"""
+
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from .file_manager import get_file_manager
+
+# Top-level packages generated automation code may import
+ALLOWED_IMPORTS = frozenset({
+    # Automation libraries named in the prompt
+    "pyautogui", "pywinauto", "selenium", "webdriver_manager",
+    # Standard library modules the model commonly uses for this kind of task
+    "webbrowser", "time", "datetime", "os", "sys", "subprocess", "shutil", "pathlib",
+    "glob", "re", "json", "csv", "math", "random", "string", "urllib", "platform",
+    "getpass", "tempfile", "ctypes", "collections", "itertools", "functools", "logging",
+    # Small helpers often paired with pyautogui
+    "pyperclip", "keyboard", "pygetwindow",
+})
+
+
+def _module_root(name):
+    return name.split(".", 1)[0]
+
+
+def find_imports(tree):
+    """
+    List the modules an AST imports.
+
+    Args:
+        tree (ast.AST): Parsed module
+
+    Returns:
+        list: Imported module names in order of appearance; relative imports
+              keep their leading dots and __import__()/import_module() calls
+              are reported as "__import__"
+    """
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append("." * node.level + (node.module or ""))
+        elif isinstance(node, ast.Call):
+            func = node.func
+            name = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+            if name == "__import__" or (name == "import_module" and isinstance(func, ast.Attribute)):
+                imports.append("__import__")
+    return imports
+
+
+class CodeValidator:
+    """
+    Parses, checks and compiles generated code, caching the outcome by hash.
+
+    validate() returns a dict with:
+
+        ok          whether the code may run
+        error       why not (syntax error with line number, disallowed import)
+        imports     modules the code imports
+        code        the compiled code object (None if not ok)
+        cached      whether the result came from the cache
+    """
+
+    def __init__(self, allowed_imports=ALLOWED_IMPORTS, max_entries=256):
+        """
+        Args:
+            allowed_imports (iterable): Allowed top-level packages; None allows any import
+            max_entries (int): Results kept in the in-memory cache
+        """
+        self.allowed_imports = None if allowed_imports is None else frozenset(allowed_imports)
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def code_hash(source):
+        """Content hash used as the cache key."""
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def _check(self, source, filename):
+        try:
+            tree = ast.parse(source, filename=filename)
+        except SyntaxError as e:
+            return {"ok": False, "error": f"SyntaxError on line {e.lineno}: {e.msg}",
+                    "imports": [], "code": None}
+        except ValueError as e:  # e.g. null bytes
+            return {"ok": False, "error": f"Invalid source: {e}", "imports": [], "code": None}
+
+        imports = find_imports(tree)
+        if self.allowed_imports is not None:
+            rejected = [name for name in imports
+                        if name.startswith(".") or name == "__import__"
+                        or _module_root(name) not in self.allowed_imports]
+            if rejected:
+                return {"ok": False, "imports": imports, "code": None,
+                        "error": f"Imports not allowed: {', '.join(sorted(set(rejected)))}"}
+
+        try:
+            code = compile(tree, filename, "exec")
+        except (SyntaxError, ValueError) as e:
+            # Errors the parser lets through, e.g. 'return' outside a function
+            return {"ok": False, "error": f"{type(e).__name__}: {e}", "imports": imports, "code": None}
+        return {"ok": True, "error": None, "imports": imports, "code": code}
+
+    def validate(self, source, filename="<automation>"):
+        """
+        Validate and compile automation code.
+
+        Args:
+            source (str): Python source code
+            filename (str): Name used in tracebacks of the compiled code
+
+        Returns:
+            dict: ok, error, imports, code and cached (see class docstring)
+        """
+        if not source or not source.strip():
+            return {"ok": False, "error": "No code was generated", "imports": [], "code": None,
+                    "cached": False}
+
+        key = (self.code_hash(source), filename)
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return {**result, "cached": True}
+            self.misses += 1
+
+        result = self._check(source, filename)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return {**result, "cached": False}
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: entries, hits and misses
+        """
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._cache.clear()
+
+
+# Global code validator instance
+_code_validator = None
+_code_validator_lock = threading.Lock()
+
+def get_code_validator() -> CodeValidator:
+    """Get the global code validator, using the import allowlist from settings."""
+    global _code_validator
+    with _code_validator_lock:
+        if _code_validator is None:
+            settings = get_file_manager().load_settings()
+            extra = settings.get("code_allowed_imports", [])
+            _code_validator = CodeValidator(ALLOWED_IMPORTS | frozenset(extra or []))
+    return _code_validator
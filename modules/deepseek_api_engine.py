@@ -1,96 +1,231 @@
-import os
+import asyncio
+import random
+import threading
+import weakref
 import requests
 import json
-import re
-from .file_manager import get_file_manager
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .code_engine import BaseCodeEngine
 
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Connection pools shared by every engine instance in the process
+_session = None
+_session_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+
+
+def get_http_session(max_retries=3, backoff=0.5, pool_size=4):
+    """
+    Get the process-wide keep-alive session used for API calls.
+
+    Retries connection errors and 429/5xx responses with jittered exponential
+    backoff, honouring Retry-After. The session is created on first use;
+    later calls return the same session regardless of their arguments.
+
+    Returns:
+        requests.Session: The shared session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=max_retries,
+                connect=max_retries,
+                read=max_retries,
+                status=max_retries,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=None,  # chat completions are POSTs
+                backoff_factor=backoff,
+                backoff_jitter=backoff,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def get_async_client(pool_size=4):
+    """
+    Get the shared httpx.AsyncClient for the running event loop.
+
+    httpx clients are bound to the loop they were first used on, so one
+    client is kept per loop and dropped together with it.
+
+    Returns:
+        httpx.AsyncClient: The shared async client
+    """
+    import httpx
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        client = httpx.AsyncClient(limits=limits)
+        _async_clients[loop] = client
+    return client
+
+
+class DeepSeekAPIEngine(BaseCodeEngine):
+    name = "deepseek"
 
-class DeepSeekAPIEngine:
     def __init__(self):
         """Initialize the DeepSeek API engine."""
         print("Initializing DeepSeek API engine...")
         
-        # Initialize file manager
-        self.file_manager = get_file_manager()
+        # File manager and code cache
+        super().__init__()
         
         # Load API key from settings
         settings = self.file_manager.load_settings()
         self.api_key = settings.get("api_key", "sk-49d740ae018f48f7812efa9af1bbd981")
         
-        self.api_url = "https://api.deepseek.com/v1/chat/completions"
+        self.api_url = settings.get("deepseek_api_url") or "https://api.deepseek.com/v1/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
-        print("DeepSeek API engine initialized successfully!")
-
-    def clean_code(self, text):
-        """Clean the response to extract only Python code."""
-        # Remove markdown code block markers
-        text = re.sub(r'```python\s*', '', text)
-        text = re.sub(r'```\s*$', '', text)
-        
-        # Remove any leading/trailing whitespace
-        text = text.strip()
         
-        return text
-
-    def generate_code(self):
-        """Generate code based on the user's request."""
-        # Instructions for the model
-        instruction = """You are a personal in-house POC assistant.
-        Your purpose is to receive text commands (e.g., "I want to watch some youtube videos")
-        and write python code using pyautogui, pywinauto, selenium to complete the task.
-        Return ONLY the Python code, no explanations, no markdown formatting, no comments, no text before or after the code."""
-
-        # Read the user command from the file manager
-        user_request = self.file_manager.load_transcription()
-        if not user_request:
-            print("Error: No transcription available. Please record audio first.")
-            return None
+        # (connect, read) timeouts so a stalled connection can never hang a command
+        self.timeout = (float(settings.get("api_connect_timeout", 5)),
+                        float(settings.get("api_read_timeout", 60)))
+        self.max_retries = int(settings.get("api_max_retries", 3))
+        self.retry_backoff = float(settings.get("api_retry_backoff", 0.5))
+        self.session = get_http_session(self.max_retries, self.retry_backoff)
+        print("DeepSeek API engine initialized successfully!")
 
-        # Prepare the API request
-        payload = {
+    def _build_payload(self, user_request):
+        """Build the chat-completions request body for a user command."""
+        return {
             "model": "deepseek-chat",
             "messages": [
-                {"role": "system", "content": instruction},
+                {"role": "system", "content": self.INSTRUCTION},
                 {"role": "user", "content": user_request}
             ],
             "temperature": 0.1,
             "max_tokens": 1000
         }
 
+    def _extract_code(self, result):
+        """Pull the cleaned code out of a parsed chat-completions response."""
+        code = result['choices'][0]['message']['content'].strip()
+        return self.clean_code(code)
+
+    def _generate(self, user_request):
+        """Ask the DeepSeek chat-completions API for code."""
+        payload = self._build_payload(user_request)
+
         try:
-            # Make the API request
-            response = requests.post(
+            # Pooled keep-alive session; retries 429/5xx with jittered backoff
+            response = self.session.post(
                 self.api_url,
                 headers=self.headers,
-                json=payload
+                json=payload,
+                timeout=self.timeout
             )
             response.raise_for_status()  # Raise an exception for bad status codes
             
-            # Parse the response
-            result = response.json()
-            code = result['choices'][0]['message']['content'].strip()
-            
-            # Clean the code
-            code = self.clean_code(code)
-            return code
+            # Parse the response and clean the code
+            return self._extract_code(response.json())
             
         except requests.exceptions.RequestException as e:
             print(f"Error making API request: {str(e)}")
             return None
-        except (KeyError, json.JSONDecodeError) as e:
+        except (KeyError, IndexError, json.JSONDecodeError) as e:
             print(f"Error parsing API response: {str(e)}")
             return None
 
-    def save_code(self, code, filename="automation_code.py"):
-        """Save the generated code to a file."""
-        try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(code)
-            print(f"Code saved to {filename}")
-            return True
-        except Exception as e:
-            print(f"Error saving code: {str(e)}")
-            return False 
\ No newline at end of file
+    async def generate_code_async(self, user_request=None):
+        """
+        Asynchronous version of generate_code() on the shared httpx client.
+
+        Applies the same timeouts and jittered retries on connection errors
+        and 429/5xx responses, and the same validation (regenerating rejected
+        code), so several commands can be in flight at once.
+
+        Args:
+            user_request (str, optional): Command text; defaults to the saved transcription
+
+        Returns:
+            str: The generated code, or None on failure
+        """
+        user_request = self._resolve_request(user_request)
+        if not user_request:
+            return None
+
+        cached = self.cached_code(user_request)
+        if cached:
+            if not self.validator or self.validator.validate(cached)["ok"]:
+                return cached
+            # Approved under an older allowlist; drop it and ask the model again
+            self.reject_code(user_request)
+
+        code = await self._generate_async(user_request)
+        return await self.ensure_valid_code_async(user_request, code)
+
+    async def ensure_valid_code_async(self, user_request, code):
+        """
+        ensure_valid_code() with the repair requests made on the async client.
+
+        Returns:
+            str: Valid code, or None if it is still invalid after the configured retries
+        """
+        if not self.validator or code is None:
+            return code
+        for attempt in range(self.validation_retries + 1):
+            result = self.validator.validate(code)
+            if result["ok"]:
+                return code
+            print(f"⚠️ Generated code rejected: {result['error']}")
+            if attempt == self.validation_retries:
+                break
+            print(f"🔄 Regenerating code (attempt {attempt + 2} of {self.validation_retries + 1})")
+            code = await self._generate_async(self._repair_request(user_request, code, result["error"]))
+            if code is None:
+                return None
+        print("❌ Could not generate valid code for this command")
+        return None
+
+    async def _generate_async(self, user_request):
+        """Ask the DeepSeek chat-completions API for code on the shared async client."""
+        import httpx
+
+        payload = self._build_payload(user_request)
+        connect_timeout, read_timeout = self.timeout
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        client = get_async_client()
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = await client.post(self.api_url, headers=self.headers,
+                                             json=payload, timeout=timeout)
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    retry_after = response.headers.get("Retry-After")
+                    print(f"⚠️ API returned {response.status_code}, retrying...")
+                else:
+                    response.raise_for_status()
+                    return self._extract_code(response.json())
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                if attempt >= self.max_retries:
+                    print(f"Error making API request: {str(e)}")
+                    return None
+                print(f"⚠️ API request failed ({e}), retrying...")
+            except httpx.HTTPError as e:
+                print(f"Error making API request: {str(e)}")
+                return None
+            except (KeyError, IndexError, json.JSONDecodeError) as e:
+                print(f"Error parsing API response: {str(e)}")
+                return None
+
+            # Same schedule as the sync session: exponential backoff plus jitter
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = self.retry_backoff * (2 ** attempt) + random.uniform(0, self.retry_backoff)
+            await asyncio.sleep(delay)
+        return None
@@ -0,0 +1,241 @@
+"""
+Project Evee - DOM Compaction for Browser Agents
+Shrinks the page description a browser-use agent sends to the LLM each step.
+browser-use lists every interactive element with its attributes plus all
+visible text; on job boards and feeds that is thousands of lines, mostly
+repeated. The compactor rewrites that listing:
+
+- text that is empty, punctuation only, or already shown is dropped, and long
+  text and deep indentation are capped
+- an element identical to an earlier one on the page (the tenth "Save"
+  button) is written as a reference to the first, e.g. ``[57]=[12]``
+- optionally (dom_compaction_diff, off by default), on later steps of the
+  same page, elements unchanged since the previous step lose their
+  attributes (unless they have no text) and unchanged text is left out, so
+  mostly the difference is spelled out in full. The model has to remember
+  what it saw earlier, which it may not (history is trimmed), so this trades
+  information for tokens
+
+Every element index is kept, so the agent can still act on anything. The
+notation is explained to the agent through its system message (see
+system_message_note()).
+"""
+
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .file_manager import get_file_manager
+
+_ELEMENT_LINE = re.compile(r"^(\t*)(\*?)\[(\d+)\]<(\S+)(.*)$")
+_REFERENCE_NOTE = ("In the interactive elements list, an entry written as [57]=[12] is element 57, "
+                   "identical to element 12 (same tag, attributes and text); it can be used like any other "
+                   "element.")
+_DIFF_NOTE = ("A list starting with \"(same page as the last step: ...)\" only spells out what changed: "
+              "elements unchanged since the previous step are shown as [index]<tag>text without their "
+              "attributes, and text lines already shown in the previous step are left out.")
+_current = ContextVar("evee_dom_compactor", default=None)
+_installed = False
+
+
+def approx_tokens(text):
+    """Rough token count (about 4 characters per token for English and markup)."""
+    return (len(text) + 3) // 4
+
+
+class DomCompactor:
+    """
+    Compacts successive element listings of one agent run.
+
+    Keep one instance per agent task: it remembers the previous step's
+    snapshot to find what changed.
+    """
+
+    def __init__(self, max_text_chars=160, max_depth=6, diff=False, min_overlap=0.3):
+        """
+        Args:
+            max_text_chars (int): Longest text kept per line
+            max_depth (int): Indentation levels kept
+            diff (bool): Shorten what is unchanged since the previous step
+            min_overlap (float): Share of the previous step's elements that
+                                 must still be present to treat the listing
+                                 as the same page (otherwise it is sent in full)
+        """
+        self.max_text_chars = max_text_chars
+        self.max_depth = max_depth
+        self.diff = diff
+        self.min_overlap = min_overlap
+        self._previous_elements = set()
+        self._previous_text = set()
+        self.steps = 0
+        self.chars_in = 0
+        self.chars_out = 0
+
+    def _cap(self, text):
+        text = " ".join(text.split())
+        if len(text) > self.max_text_chars:
+            text = text[:self.max_text_chars - 1] + "…"
+        return text
+
+    def _short_form(self, tag, rest):
+        """Element without attributes: tag and (capped) text, or None if it has no text."""
+        text = rest.split(">", 1)[1] if ">" in rest else ""
+        text = text[:-2].strip() if text.endswith("/>") else text.strip()
+        if not text:
+            return None  # the attributes are all that describes it
+        text = text[:40] + "…" if len(text) > 40 else text
+        return f"<{tag}>{text}"
+
+    def compact(self, elements_text):
+        """
+        Compact one step's element listing.
+
+        Args:
+            elements_text (str): Output of browser-use's clickable_elements_to_string()
+
+        Returns:
+            str: The compacted listing
+        """
+        lines = elements_text.split("\n")
+        parsed = []
+        for line in lines:
+            match = _ELEMENT_LINE.match(line)
+            if match:
+                indent, new, index, tag, rest = match.groups()
+                parsed.append(("element", len(indent), new, index, tag, rest))
+            else:
+                text = line.strip()
+                if text:
+                    parsed.append(("text", len(line) - len(line.lstrip("\t")), text))
+
+        elements = {item[4] + item[5] for item in parsed if item[0] == "element"}
+        same_page = (self.diff and self._previous_elements and
+                     len(elements & self._previous_elements) >= self.min_overlap * len(self._previous_elements))
+
+        output = []
+        first_index = {}  # element signature -> index of its first occurrence this step
+        seen_text = set()
+        unchanged_elements = omitted_text = 0
+        for item in parsed:
+            depth = min(item[1], self.max_depth)
+            if item[0] == "text":
+                text = self._cap(item[2])
+                if not any(ch.isalnum() for ch in text) or text in seen_text:
+                    continue
+                seen_text.add(text)
+                if same_page and text in self._previous_text:
+                    omitted_text += 1
+                    continue
+                output.append("\t" * depth + text)
+                continue
+
+            _, _, new, index, tag, rest = item
+            signature = tag + rest
+            if signature in first_index:
+                line = f"{new}[{index}]=[{first_index[signature]}]"
+            else:
+                first_index[signature] = index
+                short = None
+                if same_page and signature in self._previous_elements:
+                    short = self._short_form(tag, rest)
+                if short:
+                    unchanged_elements += 1
+                    line = f"{new}[{index}]{short}"
+                else:
+                    # Keep the space browser-use puts between tag and attributes
+                    line = f"{new}[{index}]<{tag}{' ' if rest.startswith(' ') else ''}{self._cap(rest)}"
+            output.append("\t" * depth + line)
+
+        if same_page and (unchanged_elements or omitted_text):
+            output.insert(0, f"(same page as the last step: {unchanged_elements} unchanged elements "
+                             f"shown without attributes, {omitted_text} unchanged text lines omitted)")
+
+        self._previous_elements = elements
+        self._previous_text = {self._cap(item[2]) for item in parsed if item[0] == "text"}
+        compacted = "\n".join(output)
+        self.steps += 1
+        self.chars_in += len(elements_text)
+        self.chars_out += len(compacted)
+        return compacted
+
+    def stats(self):
+        """
+        Get compaction statistics.
+
+        Returns:
+            dict: steps, chars_in, chars_out and the saved share
+        """
+        return {"steps": self.steps, "chars_in": self.chars_in, "chars_out": self.chars_out,
+                "saved": round(1 - self.chars_out / self.chars_in, 3) if self.chars_in else None}
+
+
+def install():
+    """
+    Route browser-use's element listing through the active compactor.
+
+    Patches DOMElementNode.clickable_elements_to_string once. The patched
+    method only compacts while a compactor is active in the current context
+    (see compacting()), so other agents and tasks are unaffected.
+    """
+    global _installed
+    if _installed:
+        return
+    from browser_use.dom.views import DOMElementNode
+    original = DOMElementNode.clickable_elements_to_string
+
+    def clickable_elements_to_string(self, include_attributes=None):
+        text = original(self, include_attributes=include_attributes)
+        compactor = _current.get()
+        return compactor.compact(text) if compactor is not None else text
+
+    DOMElementNode.clickable_elements_to_string = clickable_elements_to_string
+    _installed = True
+
+
+@contextmanager
+def compacting(compactor):
+    """Compact element listings produced in this context (e.g. by one agent.run())."""
+    install()
+    token = _current.set(compactor)
+    try:
+        yield compactor
+    finally:
+        _current.reset(token)
+
+
+def system_message_note():
+    """
+    Explain the compacted listing notation to the agent, as configured in settings.
+
+    Pass it as ``extend_system_message`` to agents run under dom_compaction().
+
+    Returns:
+        str: The note, or None if dom_compaction_enabled is off
+    """
+    settings = get_file_manager().load_settings()
+    if not settings.get("dom_compaction_enabled", True):
+        return None
+    if settings.get("dom_compaction_diff", False):
+        return _REFERENCE_NOTE + " " + _DIFF_NOTE
+    return _REFERENCE_NOTE
+
+
+@contextmanager
+def dom_compaction():
+    """
+    Compact the element listings of agent runs in this context, as configured in settings.
+
+    Yields:
+        DomCompactor: The active compactor, or None if dom_compaction_enabled is off
+    """
+    settings = get_file_manager().load_settings()
+    if not settings.get("dom_compaction_enabled", True):
+        yield None
+        return
+    compactor = DomCompactor(max_text_chars=int(settings.get("dom_compaction_max_text_chars", 160)),
+                             diff=bool(settings.get("dom_compaction_diff", False)))
+    with compacting(compactor):
+        yield compactor
+    stats = compactor.stats()
+    if stats["steps"]:
+        print(f"📊 Page listings compacted {stats['chars_in']:,} → {stats['chars_out']:,} chars "
+              f"over {stats['steps']} steps")
@@ -1,78 +1,71 @@
-from transformers import AutoModelForCausalLM, AutoTokenizer
-import torch
 import os
-from .file_manager import get_file_manager
+from .code_engine import BaseCodeEngine
+from .inference_server import BatchingGenerator, ensure_server, load_model
 
 
-class CodeEngine:
+class CodeEngine(BaseCodeEngine):
+    name = "codellama"
+
+    # Instructions for the model
+    INSTRUCTION = """
+        [/INST]You are a personal in-house POC assistant.
+        Your purpose is to receive text text commands (e.g., "I want to watch some youtube videos")
+        and write python code using pyautogui, pywinauto, selenium to complete the task[/INST]
+
+
+        """
+
     def __init__(self):
         """Initialize the code generation engine."""
         print("Loading model...")
         
-        # Initialize file manager
-        self.file_manager = get_file_manager()
+        # File manager and code cache
+        super().__init__()
+        settings = self.file_manager.load_settings()
         
-        self.model_name = "codellama/CodeLlama-7b-hf"
+        self.model_name = os.getenv('EVEE_CODEGEN_MODEL') or settings.get("codellama_model", "codellama/CodeLlama-7b-hf")
         # Get token from environment variable instead of hardcoding
         self.token = os.getenv('HF_TOKEN')
-        if not self.token:
+        if not self.token and self.model_name != "tiny":
             raise ValueError("Please set your Hugging Face token as an environment variable named 'HF_TOKEN'")
+        
+        # Prefer the resident inference server: the model is loaded once per
+        # boot there instead of on every construction
+        self.client = None
+        self.generator = None
+        if settings.get("codellama_server", True):
+            self.client = ensure_server(self.model_name, max_batch=int(settings.get("codellama_max_batch", 8)))
+            if self.client:
+                print("Using the local inference server")
+                return
+            print("⚠️ Inference server unavailable, loading the model in-process")
             
-        self.tok = AutoTokenizer.from_pretrained(self.model_name, token=self.token)
-        self.model = AutoModelForCausalLM.from_pretrained(
-            self.model_name,
-            torch_dtype=torch.float16,
-            device_map="auto",
-            load_in_4bit=True,
-            token=self.token
-        )
+        # Same 4-bit loading as before, behind the batching generator so the
+        # instruction's KV cache is reused here too
+        self.model, self.tok = load_model(self.model_name, token=self.token)
+        self.generator = BatchingGenerator(self.model, self.tok).start()
         print("Model loaded successfully!")
-        
-
-    def generate_code(self):
 
-        # Instructions for the model
-        instruction = """
-        [/INST]You are a personal in-house POC assistant.
-        Your purpose is to receive text text commands (e.g., "I want to watch some youtube videos")
-        and write python code using pyautogui, pywinauto, selenium to complete the task[/INST]
-
-
-        """
-        # Read the user command from the file manager
-        user_request = self.file_manager.load_transcription()
-        if not user_request:
-            print("Error: No transcription available. Please record audio first.")
-            return None
-
-        #creation of the prompt
-        prompt = instruction+ "### User Command:\n" + user_request + "\n\n### Assistant Response (Python Code): \n"
+    def _generate(self, user_request):
+        """Generate code with the local CodeLlama model."""
+        #creation of the prompt; the instruction is sent as a fixed prefix so
+        #its tokens and KV cache are computed once and only the command is encoded
+        prompt = "### User Command:\n" + user_request + "\n\n### Assistant Response (Python Code): \n"
         
         try:
-            # Tokenize and generate
-            inputs = self.tok(prompt, return_tensors="pt").to(self.model.device)
-            out = self.model.generate(
-                **inputs, 
-                max_new_tokens=256, 
-                temperature=0.1
-            )
-            code = self.tok.decode(out[0], skip_special_tokens=True)
+            if self.client:
+                result = self.client.generate(prompt, max_new_tokens=256, temperature=0.1,
+                                              prefix=self.INSTRUCTION)
+            else:
+                result = self.generator.submit(prompt, max_new_tokens=256, temperature=0.1,
+                                               prefix=self.INSTRUCTION).get()
+            if not result.get("ok"):
+                raise RuntimeError(result.get("error", "inference server error"))
             
             # Extract only the code part after the instruction
-            code = code.split("[/INST]")[-1].strip()
+            code = result["text"].split("[/INST]")[-1].strip()
             return code
             
         except Exception as e:
             print(f"Error generating code: {str(e)}")
             return None
-
-    def save_code(self, code, filename="automation_code.py"):
-        """Save the generated code to a file."""
-        try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(code)
-            print(f"Code saved to {filename}")
-            return True
-        except Exception as e:
-            print(f"Error saving code: {str(e)}")
-            return False 
\ No newline at end of file
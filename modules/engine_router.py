@@ -0,0 +1,239 @@
+"""
+Project Evee - Hedged Engine Router
+Sends a command to the primary code-generation provider and, if it has not
+answered by its usual p95 latency, to a backup as well; the first usable
+answer wins. Cuts the tail latency that a single slow provider causes.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from .file_manager import get_file_manager
+
+
+class HedgedEngineRouter:
+    """
+    Code generator that hedges requests across several providers.
+
+    Engines are tried in order. The first one gets the request alone; each
+    further engine is started when the request has been outstanding for the
+    current engine's deadline (the ``percentile`` of its recent successful
+    latencies, ``default_deadline`` until ``min_samples`` are known) or as soon
+    as every running engine has failed. The first non-empty answer is
+    returned; slower requests finish in the background and only update the
+    latency statistics.
+
+    Implements the same interface as the engines (code_engine.CodeGenerator),
+    so callers do not need to know whether they talk to a router. Approval
+    and rejection go to the engine that answered that command; the router
+    remembers it per command, so overlapping commands do not mix them up.
+    """
+
+    name = "router"
+
+    def __init__(self, engines, percentile=0.95, default_deadline=5.0, min_deadline=0.5,
+                 min_samples=10, window=200):
+        """
+        Args:
+            engines (list): Code generators, primary first
+            percentile (float): Latency percentile used as hedging deadline
+            default_deadline (float): Deadline in seconds while there are too few samples
+            min_deadline (float): Lower bound for the deadline in seconds
+            min_samples (int): Latencies needed before the percentile is trusted
+            window (int): Number of recent latencies kept per engine
+        """
+        if not engines:
+            raise ValueError("HedgedEngineRouter needs at least one engine")
+        self.engines = list(engines)
+        self.file_manager = get_file_manager()
+        self.percentile = percentile
+        self.default_deadline = default_deadline
+        self.min_deadline = min_deadline
+        self.min_samples = min_samples
+        self._latencies = {engine.name: deque(maxlen=window) for engine in self.engines}
+        self._counters = {engine.name: {"calls": 0, "wins": 0, "failures": 0} for engine in self.engines}
+        self.hedged = 0
+        self.requests = 0
+        self._winners = OrderedDict()  # user_request -> engine whose code was returned
+        self._max_winners = 64
+        self._lock = threading.Lock()
+        # Enough threads for every engine of two overlapping commands
+        self._executor = ThreadPoolExecutor(max_workers=2 * len(self.engines),
+                                            thread_name_prefix="evee-engine")
+
+    def deadline(self, engine):
+        """
+        Seconds to wait for ``engine`` before starting the next one.
+
+        Args:
+            engine: One of self.engines
+
+        Returns:
+            float: The hedging deadline
+        """
+        with self._lock:
+            samples = sorted(self._latencies[engine.name])
+        if len(samples) < self.min_samples:
+            return self.default_deadline
+        index = min(len(samples) - 1, int(self.percentile * len(samples)))
+        return max(self.min_deadline, samples[index])
+
+    def _call(self, engine, user_request):
+        """Run one engine and record its latency and outcome."""
+        start = time.perf_counter()
+        try:
+            code = engine.generate_code(user_request)
+        except Exception as e:
+            print(f"⚠️ Engine '{engine.name}' failed: {e}")
+            code = None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._counters[engine.name]["calls"] += 1
+            if code:
+                self._latencies[engine.name].append(elapsed)
+            else:
+                self._counters[engine.name]["failures"] += 1
+        return code
+
+    def generate_code(self, user_request=None):
+        """
+        Generate code, hedging across engines.
+
+        Args:
+            user_request (str, optional): Command text; defaults to the saved transcription
+
+        Returns:
+            str: Code from the fastest engine that answered, or None if all failed
+        """
+        user_request = user_request or self.file_manager.load_transcription()
+        if not user_request:
+            print("Error: No transcription available. Please record audio first.")
+            return None
+
+        with self._lock:
+            self.requests += 1
+        waiting = list(self.engines)
+        running = {}
+        while waiting or running:
+            if waiting and (not running or self._deadline_passed(running)):
+                engine = waiting.pop(0)
+                if running:
+                    with self._lock:
+                        self.hedged += 1
+                    print(f"⏱️ No answer yet, also asking '{engine.name}'")
+                running[self._executor.submit(self._call, engine, user_request)] = (engine, time.perf_counter())
+
+            timeout = self._time_left(running) if waiting else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                engine, _ = running.pop(future)
+                code = future.result()
+                if code:
+                    with self._lock:
+                        self._counters[engine.name]["wins"] += 1
+                        self._winners[user_request] = engine
+                        self._winners.move_to_end(user_request)
+                        while len(self._winners) > self._max_winners:
+                            self._winners.popitem(last=False)
+                    return code
+        return None
+
+    def _time_left(self, running):
+        """Seconds until the most recently started engine reaches its deadline."""
+        engine, started = list(running.values())[-1]
+        return max(0.0, started + self.deadline(engine) - time.perf_counter())
+
+    def _deadline_passed(self, running):
+        return self._time_left(running) <= 0
+
+    def winner(self, user_request):
+        """The engine that answered ``user_request`` last, or None."""
+        with self._lock:
+            return self._winners.get(user_request)
+
+    def approve_code(self, user_request, code):
+        """Pass approval to the engine whose code was used for this command."""
+        with self._lock:
+            engine = self._winners.pop(user_request, None)
+        if engine is None:
+            return False
+        return engine.approve_code(user_request, code)
+
+    def reject_code(self, user_request):
+        """Pass rejection to the engine whose code was used for this command."""
+        with self._lock:
+            engine = self._winners.pop(user_request, None)
+        if engine is None:
+            return False
+        return engine.reject_code(user_request)
+
+    def stats(self):
+        """
+        Get routing statistics.
+
+        Returns:
+            dict: requests, hedged count and, per engine, calls, wins,
+                  failures, p50/p95 latency and current deadline
+        """
+        engines = {}
+        for engine in self.engines:
+            with self._lock:
+                samples = sorted(self._latencies[engine.name])
+                counters = dict(self._counters[engine.name])
+            if samples:
+                counters["p50"] = round(samples[len(samples) // 2], 3)
+                counters["p95"] = round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 3)
+            counters["deadline"] = round(self.deadline(engine), 3)
+            engines[engine.name] = counters
+        return {"requests": self.requests, "hedged": self.hedged, "engines": engines}
+
+    def close(self):
+        """Stop the worker threads (outstanding requests are abandoned)."""
+        self._executor.shutdown(wait=False)
+
+
+# Provider name -> (module, class); imported lazily so unused providers'
+# dependencies (transformers, openai, ...) are never loaded
+ENGINES = {
+    "openai": (".openai_engine", "OpenAICodeEngine"),
+    "deepseek": (".deepseek_api_engine", "DeepSeekAPIEngine"),
+    "codellama": (".engine", "CodeEngine"),
+}
+
+
+def create_code_engine(names=None):
+    """
+    Build the code generator configured in settings.
+
+    Args:
+        names (list, optional): Provider names, primary first; defaults to the
+                                code_engines setting
+
+    Returns:
+        A single engine, or a HedgedEngineRouter when several providers could
+        be initialized; None if none could
+    """
+    import importlib
+    settings = get_file_manager().load_settings()
+    names = names or settings.get("code_engines") or ["openai"]
+    engines = []
+    for name in names:
+        if name not in ENGINES:
+            print(f"⚠️ Unknown code engine '{name}'. Available: {', '.join(ENGINES)}")
+            continue
+        module_name, class_name = ENGINES[name]
+        try:
+            engine_class = getattr(importlib.import_module(module_name, __package__), class_name)
+            engines.append(engine_class())
+        except Exception as e:
+            print(f"⚠️ Could not initialize code engine '{name}': {e}")
+    if not engines:
+        return None
+    if len(engines) == 1:
+        return engines[0]
+    return HedgedEngineRouter(
+        engines,
+        percentile=float(settings.get("hedge_percentile", 0.95)),
+        default_deadline=float(settings.get("hedge_default_deadline", 5.0))
+    )
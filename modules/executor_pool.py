@@ -0,0 +1,389 @@
+"""
+Project Evee - Automation Executor Pool
+Runs generated automation code in a pool of pre-started worker processes
+instead of exec() inside the GUI process. Workers import pyautogui, selenium
+and pywinauto once when they start, so commands do not pay that import
+time, and every script runs under a wall-clock timeout and a memory limit
+with its output captured.
+"""
+
+import io
+import marshal
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from .file_manager import get_file_manager
+
+# Libraries generated code uses; imported by each worker before it is ready
+WARM_IMPORTS = ("pyautogui", "selenium.webdriver", "pywinauto")
+MAX_OUTPUT_CHARS = 64 * 1024
+
+
+def _truncate(text):
+    if len(text) <= MAX_OUTPUT_CHARS:
+        return text
+    return text[:MAX_OUTPUT_CHARS] + f"\n... [{len(text) - MAX_OUTPUT_CHARS} more characters truncated]"
+
+
+def _worker_main(conn, warm_imports):
+    """Entry point of a worker process: warm imports, then run jobs until told to stop."""
+    import importlib
+    start = time.perf_counter()
+    imported = {}
+    for name in warm_imports:
+        try:
+            importlib.import_module(name)
+            imported[name] = True
+        except Exception as e:
+            # e.g. pywinauto on Linux, or no display for pyautogui
+            imported[name] = f"{type(e).__name__}: {e}"
+    conn.send({"ready": True, "pid": os.getpid(), "imports": imported,
+               "import_seconds": round(time.perf_counter() - start, 3)})
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        stdout, stderr = io.StringIO(), io.StringIO()
+        result = {"ok": True, "error": None, "traceback": None}
+        started = time.perf_counter()
+        try:
+            if job.get("code") is not None:
+                # Compiled by the parent (CodeValidator); same interpreter, so marshal is safe
+                code = marshal.loads(job["code"])
+            else:
+                code = compile(job["source"], job.get("filename", "<automation>"), "exec")
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                # Fresh globals per script; imported modules stay warm in sys.modules
+                exec(code, {"__name__": "__main__", "__builtins__": __builtins__})
+        except BaseException as e:
+            result.update(ok=False, error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+            if isinstance(e, KeyboardInterrupt):
+                raise
+        result.update(stdout=_truncate(stdout.getvalue()), stderr=_truncate(stderr.getvalue()),
+                      seconds=round(time.perf_counter() - started, 3))
+        try:
+            conn.send(result)
+        except (EOFError, OSError):
+            return
+
+
+class _Worker:
+    """Parent-side handle of a worker process."""
+
+    def __init__(self, context, warm_imports):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, warm_imports),
+                                       name="evee-executor", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.info = {}
+        self.jobs = 0
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def wait_ready(self, timeout):
+        if not self.conn.poll(timeout):
+            return False
+        try:
+            self.info = self.conn.recv()
+        except (EOFError, OSError):
+            return False
+        return bool(self.info.get("ready"))
+
+    def kill(self):
+        """
+        Kill the worker and every process the script started (browsers,
+        chromedriver, subprocesses). The children are looked up first: once
+        the worker is gone they are reparented and can no longer be found.
+        """
+        children = []
+        try:
+            import psutil
+            children = psutil.Process(self.pid).children(recursive=True)
+        except Exception:
+            pass  # psutil missing or the worker already gone
+        for child in children:
+            try:
+                child.kill()
+            except Exception:
+                pass
+        try:
+            self.process.kill()
+            self.process.join(timeout=5)
+        except Exception:
+            pass
+        if children:
+            import psutil
+            psutil.wait_procs(children, timeout=5)
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=2)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.kill()
+
+
+class ExecutorPool:
+    """
+    Pool of warm worker processes that execute automation scripts.
+
+    Workers are spawned (not forked, so the pool behaves the same on Windows
+    and never inherits Whisper or Tk state) when the pool starts and import
+    ``warm_imports`` right away. A script is sent to an idle worker. If it
+    runs past ``timeout`` or its process tree grows past ``memory_limit_mb``,
+    the worker is killed and a fresh one is started in the background.
+    Workers are also recycled after ``max_jobs`` scripts so state leaked by
+    one script cannot pile up.
+    """
+
+    def __init__(self, size=2, timeout=120, memory_limit_mb=1024, max_jobs=20,
+                 warm_imports=WARM_IMPORTS, start_timeout=120):
+        """
+        Args:
+            size (int): Number of worker processes
+            timeout (float): Default wall-clock limit per script in seconds
+            memory_limit_mb (float): RSS limit for a worker and its children
+                                     (e.g. chromedriver); None to disable
+            max_jobs (int): Scripts a worker runs before it is replaced
+            warm_imports (tuple): Modules imported by every worker at startup
+            start_timeout (float): Seconds allowed for a worker's warm imports
+        """
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs = max_jobs
+        self.warm_imports = tuple(warm_imports)
+        self.start_timeout = start_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._starting = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats_counters = {"runs": 0, "failures": 0, "timeouts": 0,
+                               "memory_kills": 0, "restarts": 0}
+        self._warned_no_psutil = False
+
+    def start(self, wait=False):
+        """
+        Spawn the workers.
+
+        Args:
+            wait (bool): Block until every worker has finished its warm imports
+
+        Returns:
+            ExecutorPool: self
+        """
+        if self.memory_limit_mb and not self._warned_no_psutil:
+            try:
+                import psutil  # noqa: F401
+            except ImportError:
+                self._warned_no_psutil = True
+                print(f"⚠️ psutil is not installed: the executor memory limit of "
+                      f"{self.memory_limit_mb} MB is not enforced")
+        with self._lock:
+            self._starting += self.size
+        threads = [threading.Thread(target=self._spawn, daemon=True) for _ in range(self.size)]
+        for thread in threads:
+            thread.start()
+        if wait:
+            for thread in threads:
+                thread.join()
+        return self
+
+    def _spawn(self):
+        """Start one worker and add it to the idle queue once it is warm."""
+        if self._closed:
+            with self._lock:
+                self._starting -= 1
+            return
+        worker = _Worker(self._context, self.warm_imports)
+        with self._lock:
+            self._workers.add(worker)
+            self._starting -= 1
+        if worker.wait_ready(self.start_timeout):
+            if self._closed:
+                worker.stop()
+                return
+            failed = [name for name, ok in worker.info.get("imports", {}).items() if ok is not True]
+            print(f"✅ Executor worker {worker.pid} ready in {worker.info.get('import_seconds')}s"
+                  + (f" (not available: {', '.join(failed)})" if failed else ""))
+            self._idle.put(worker)
+        else:
+            if not self._closed:
+                print(f"❌ Executor worker {worker.pid} failed to start")
+            self._retire(worker)
+
+    def _count(self, *names):
+        """Increment stats counters (run() is called from several threads)."""
+        with self._lock:
+            for name in names:
+                self.stats_counters[name] += 1
+
+    def _retire(self, worker, replace=False):
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+        if replace and not self._closed:
+            with self._lock:
+                self.stats_counters["restarts"] += 1
+                self._starting += 1
+            threading.Thread(target=self._spawn, daemon=True).start()
+
+    def _tree_rss_mb(self, worker):
+        """Resident memory of a worker and its child processes, in MB."""
+        try:
+            import psutil
+            process = psutil.Process(worker.pid)
+            processes = [process] + process.children(recursive=True)
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total / 1024 ** 2
+        except Exception:
+            return None
+
+    def run(self, source, timeout=None, filename="<automation>", compiled=None):
+        """
+        Execute a script in a warm worker.
+
+        Args:
+            source (str): Python source code
+            timeout (float, optional): Wall-clock limit; defaults to the pool's
+            filename (str): Name shown in tracebacks
+            compiled (code, optional): ``source`` already compiled, so the
+                                       worker does not parse it again
+
+        Returns:
+            dict: ok, stdout, stderr, error, traceback, seconds, timed_out,
+                  memory_exceeded, peak_memory_mb and worker_pid
+        """
+        if self._closed:
+            raise RuntimeError("Executor pool is closed")
+        timeout = timeout or self.timeout
+        waited = time.perf_counter()
+        with self._lock:
+            alive = bool(self._workers) or self._starting > 0
+        if not alive:
+            # Every worker was lost; start over instead of waiting forever
+            self.start()
+        try:
+            worker = self._idle.get(timeout=self.start_timeout)
+        except queue.Empty:
+            return {"ok": False, "error": "No executor worker became available", "stdout": "",
+                    "stderr": "", "traceback": None, "timed_out": False, "memory_exceeded": False,
+                    "seconds": 0.0, "peak_memory_mb": None, "worker_pid": None}
+        queue_seconds = time.perf_counter() - waited
+
+        result = None
+        timed_out = memory_exceeded = False
+        peak = None
+        start = time.perf_counter()
+        try:
+            worker.conn.send({"source": source, "filename": filename,
+                              "code": None if compiled is None else marshal.dumps(compiled)})
+            while True:
+                if worker.conn.poll(0.1):
+                    result = worker.conn.recv()
+                    break
+                if not worker.process.is_alive():
+                    break
+                if time.perf_counter() - start > timeout:
+                    timed_out = True
+                    break
+                if self.memory_limit_mb:
+                    rss = self._tree_rss_mb(worker)
+                    if rss is not None:
+                        peak = max(peak or 0.0, rss)
+                        if rss > self.memory_limit_mb:
+                            memory_exceeded = True
+                            break
+        except (EOFError, OSError):
+            # The worker died mid-script (os._exit, segfault in a native library)
+            result = None
+
+        self._count("runs")
+        worker.jobs += 1
+        if result is None:
+            if timed_out:
+                error = f"Timed out after {timeout}s"
+                self._count("timeouts")
+            elif memory_exceeded:
+                error = f"Exceeded memory limit of {self.memory_limit_mb} MB"
+                self._count("memory_kills")
+            else:
+                error = f"Worker process died (exit code {worker.process.exitcode})"
+            result = {"ok": False, "error": error, "stdout": "", "stderr": "", "traceback": None,
+                      "seconds": round(time.perf_counter() - start, 3)}
+            self._retire(worker, replace=True)
+        elif worker.jobs >= self.max_jobs:
+            self._retire(worker, replace=True)
+        else:
+            self._idle.put(worker)
+
+        if not result["ok"]:
+            self._count("failures")
+        result.update(timed_out=timed_out, memory_exceeded=memory_exceeded,
+                      peak_memory_mb=None if peak is None else round(peak, 1),
+                      queue_seconds=round(queue_seconds, 3), worker_pid=worker.pid)
+        return result
+
+    def stats(self):
+        """
+        Get pool statistics.
+
+        Returns:
+            dict: workers, idle workers and run/failure/timeout/restart counters
+        """
+        with self._lock:
+            workers = len(self._workers)
+            counters = dict(self.stats_counters)
+        return {"workers": workers, "idle": self._idle.qsize(), **counters}
+
+    def close(self):
+        """Stop all workers."""
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+
+# Global executor pool instance
+_executor_pool = None
+_executor_pool_lock = threading.Lock()
+
+def get_executor_pool() -> ExecutorPool:
+    """Get the global executor pool, sized from settings and started on first use."""
+    global _executor_pool
+    with _executor_pool_lock:
+        if _executor_pool is None:
+            settings = get_file_manager().load_settings()
+            memory_limit = settings.get("executor_memory_mb", 1024)
+            _executor_pool = ExecutorPool(
+                size=int(settings.get("executor_workers", 2)),
+                timeout=float(settings.get("executor_timeout", 120)),
+                memory_limit_mb=float(memory_limit) if memory_limit else None
+            ).start()
+    return _executor_pool
@@ -7,6 +7,7 @@ Handles all file operations with absolute paths and proper error handling.
 import os
 import json
 import threading
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, Dict, Any
 
@@ -25,13 +26,22 @@ class FileManager:
             'audio_recording': self.project_root / 'recording.wav',
             'automation_code': self.project_root / 'automation_code.py',
             'settings': self.project_root / 'settings.json',
-            'results': self.project_root / 'results.json',
-            'history': self.project_root / 'history.log'
+            'results': self.project_root / 'results.json',  # single-run file before the results log
+            'results_log': self.project_root / 'results.jsonl',
+            'history': self.project_root / 'history.log',
+            'whisper_speeds': self.project_root / 'whisper_speeds.json',
+            'language_prior': self.project_root / 'cache' / 'language_prior.json',
+            'code_cache': self.project_root / 'cache' / 'code_cache.json',
+            'action_traces': self.project_root / 'cache' / 'action_traces.json'
         }
         
         # Thread lock for file operations
         self._lock = threading.Lock()
         
+        # Append-only results log and rotating history log, opened on first use
+        self._results_log = None
+        self._history_log = None
+        
         # Ensure project directory exists
         self.project_root.mkdir(exist_ok=True)
         
@@ -49,8 +59,62 @@ class FileManager:
             if not self.files['settings'].exists():
                 self.save_settings({
                     "api_key": "",
-                    "silence_timeout": 4,
+                    "silence_timeout": 0.3,
                     "whisper_model": "base",
+                    "model_cache_mb": 1536,
+                    "whisper_backend": "reference",
+                    "transcription_cache_enabled": True,
+                    "transcription_cache_mb": 20,
+                    "whisper_language": None,
+                    "language_prior_enabled": True,
+                    "language_prior_min_samples": 5,
+                    "language_prior_confidence": 0.9,
+                    "api_connect_timeout": 5,
+                    "api_read_timeout": 60,
+                    "api_max_retries": 3,
+                    "stream_code": True,
+                    "stream_transcription": True,
+                    "code_cache_enabled": True,
+                    "code_cache_ttl_hours": 168,
+                    "code_cache_max_entries": 200,
+                    "code_cache_fuzzy": True,
+                    "code_engines": ["openai"],
+                    "hedge_percentile": 0.95,
+                    "hedge_default_deadline": 5.0,
+                    "codellama_model": "codellama/CodeLlama-7b-hf",
+                    "codellama_server": True,
+                    "codellama_max_batch": 8,
+                    "executor_enabled": True,
+                    "executor_workers": 2,
+                    "executor_timeout": 120,
+                    "executor_memory_mb": 1024,
+                    "code_validation_enabled": True,
+                    "code_validation_retries": 2,
+                    "code_allowed_imports": [],
+                    "browser_pool_size": 2,
+                    "browser_persistent": True,
+                    "browser_max_age_hours": 24,
+                    "browser_max_memory_mb": 2048,
+                    "browser_recycle_check_every": 20,
+                    "browser_cdp_url": None,
+                    "browser_task_concurrency": 2,
+                    "action_trace_enabled": True,
+                    "action_trace_ttl_hours": 168,
+                    "action_trace_max_entries": 100,
+                    "action_trace_fuzzy": False,
+                    "network_policy": "lean",
+                    "network_policies": {},
+                    "dom_compaction_enabled": True,
+                    "dom_compaction_diff": False,
+                    "dom_compaction_max_text_chars": 160,
+                    "browser_mode": "auto",
+                    "browser_viewport": {"width": 1280, "height": 800},
+                    "browser_device_scale_factor": 1,
+                    "browser_entry_points": {},
+                    "results_log_max_runs": 1000,
+                    "results_log_compact_every": 100,
+                    "history_max_mb": 50,
+                    "history_backups": 5,
                     "auto_execute": True
                 })
                 
@@ -184,8 +248,62 @@ class FileManager:
         """
         default_settings = {
             "api_key": "",
-            "silence_timeout": 4,
+            "silence_timeout": 0.3,
             "whisper_model": "base",
+            "model_cache_mb": 1536,
+            "whisper_backend": "reference",
+            "transcription_cache_enabled": True,
+            "transcription_cache_mb": 20,
+            "whisper_language": None,
+            "language_prior_enabled": True,
+            "language_prior_min_samples": 5,
+            "language_prior_confidence": 0.9,
+            "api_connect_timeout": 5,
+            "api_read_timeout": 60,
+            "api_max_retries": 3,
+            "stream_code": True,
+            "stream_transcription": True,
+            "code_cache_enabled": True,
+            "code_cache_ttl_hours": 168,
+            "code_cache_max_entries": 200,
+            "code_cache_fuzzy": True,
+            "code_engines": ["openai"],
+            "hedge_percentile": 0.95,
+            "hedge_default_deadline": 5.0,
+            "codellama_model": "codellama/CodeLlama-7b-hf",
+            "codellama_server": True,
+            "codellama_max_batch": 8,
+            "executor_enabled": True,
+            "executor_workers": 2,
+            "executor_timeout": 120,
+            "executor_memory_mb": 1024,
+            "code_validation_enabled": True,
+            "code_validation_retries": 2,
+            "code_allowed_imports": [],
+            "browser_pool_size": 2,
+            "browser_persistent": True,
+            "browser_max_age_hours": 24,
+            "browser_max_memory_mb": 2048,
+            "browser_recycle_check_every": 20,
+            "browser_cdp_url": None,
+            "browser_task_concurrency": 2,
+            "action_trace_enabled": True,
+            "action_trace_ttl_hours": 168,
+            "action_trace_max_entries": 100,
+            "action_trace_fuzzy": False,
+            "network_policy": "lean",
+            "network_policies": {},
+            "dom_compaction_enabled": True,
+            "dom_compaction_diff": False,
+            "dom_compaction_max_text_chars": 160,
+            "browser_mode": "auto",
+            "browser_viewport": {"width": 1280, "height": 800},
+            "browser_device_scale_factor": 1,
+            "browser_entry_points": {},
+            "results_log_max_runs": 1000,
+            "results_log_compact_every": 100,
+            "history_max_mb": 50,
+            "history_backups": 5,
             "auto_execute": True
         }
         
@@ -203,42 +321,164 @@ class FileManager:
                 print(f"❌ Error loading settings: {e}")
                 return default_settings
     
-    def save_results(self, results: Dict[str, Any]) -> bool:
+    @property
+    def results_log(self):
+        """The append-only results log (results.jsonl), indexed by run id and time."""
+        if self._results_log is None:
+            from .results_log import ResultsLog
+            settings = self.load_settings()
+            with self._lock:
+                if self._results_log is None:
+                    max_runs = settings.get("results_log_max_runs", 1000)
+                    self._results_log = ResultsLog(
+                        self.files['results_log'],
+                        max_runs=int(max_runs) if max_runs else None,
+                        compact_every=int(settings.get("results_log_compact_every", 100)),
+                        legacy_path=self.files['results']
+                    )
+        return self._results_log
+    
+    def save_results(self, results: Dict[str, Any], kind: str = "command") -> Optional[str]:
+        """
+        Append execution results to the results log as a new run.
+        
+        Args:
+            results: Dictionary of results to save (not modified)
+            kind: Kind of run ("command", "batch", ...)
+            
+        Returns:
+            str: The new run's id, or None on failure
+        """
+        try:
+            run_id = self.results_log.append(results, kind=kind)
+            print("✅ Results saved")
+            return run_id
+        except Exception as e:
+            print(f"❌ Error saving results: {e}")
+            return None
+    
+    def new_batch_id(self) -> str:
+        """Name for a new batch run: the current date and time plus a random suffix."""
+        from .results_log import new_run_id
+        return new_run_id("batch-")
+    
+    def save_batch_results(self, results: list, batch_id: Optional[str] = None) -> Optional[str]:
+        """
+        Log the per-task results of a batch run as one run of kind "batch".
+        
+        Args:
+            results: List of result dictionaries (or per-task summaries), one per task
+            batch_id: Name of the batch (its run id); defaults to new_batch_id()
+            
+        Returns:
+            str: The batch's run id, or None on failure (including a batch_id
+                 that is already logged)
+        """
+        batch_id = batch_id or self.new_batch_id()
+        try:
+            run_id = self.results_log.append({"batch_id": batch_id, "tasks": results}, run_id=batch_id,
+                                             kind="batch")
+            print(f"✅ Batch results saved as run {run_id}")
+            return run_id
+        except Exception as e:
+            print(f"❌ Error saving batch results: {e}")
+            return None
+    
+    def load_results(self, run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load the results of the latest run (or of a given run) from the results log.
+        
+        Args:
+            run_id: Run to load; defaults to the most recent one
+            
+        Returns:
+            dict: The results dictionary or None if not found
+        """
+        try:
+            entry = self.results_log.get(run_id) if run_id else self.results_log.latest()
+            return entry["results"] if entry else None
+        except Exception as e:
+            print(f"❌ Error loading results: {e}")
+            return None
+    
+    def recent_results(self, count: int = 10, kind: Optional[str] = None) -> list:
+        """
+        Get the most recent runs from the results log.
+        
+        Args:
+            count: Number of runs
+            kind: Only runs of this kind ("command", "batch", ...)
+            
+        Returns:
+            list: Log entries (run_id, timestamp, kind, results), oldest first
+        """
+        try:
+            return self.results_log.tail(count, kind=kind)
+        except Exception as e:
+            print(f"❌ Error reading results log: {e}")
+            return []
+    
+    def save_json(self, file_type: str, data: Any) -> bool:
         """
-        Save execution results to JSON file safely.
+        Save data to one of the managed JSON files safely.
         
         Args:
-            results: Dictionary of results to save
+            file_type: Key of the file in self.files
+            data: JSON-serializable data
             
         Returns:
             bool: True if successful, False otherwise
         """
+        path = self.get_file_path(file_type)
         with self._lock:
             try:
-                with open(self.files['results'], 'w', encoding='utf-8') as f:
-                    json.dump(results, f, indent=2, ensure_ascii=False)
-                print("✅ Results saved")
+                # Write to a temp file first so readers never see a half-written file
+                tmp_path = path.with_name(path.name + '.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, path)
                 return True
             except Exception as e:
-                print(f"❌ Error saving results: {e}")
+                print(f"❌ Error saving {file_type}: {e}")
                 return False
     
-    def load_results(self) -> Optional[Dict[str, Any]]:
+    def load_json(self, file_type: str, default: Any = None) -> Any:
         """
-        Load execution results from JSON file safely.
+        Load one of the managed JSON files safely.
         
+        Args:
+            file_type: Key of the file in self.files
+            default: Value returned if the file is missing or unreadable
+            
         Returns:
-            dict: The results dictionary or None if not found
+            The parsed JSON data or default
         """
+        path = self.get_file_path(file_type)
         with self._lock:
             try:
-                if self.files['results'].exists():
-                    with open(self.files['results'], 'r', encoding='utf-8') as f:
+                if path.exists():
+                    with open(path, 'r', encoding='utf-8') as f:
                         return json.load(f)
-                return None
+                return default
             except Exception as e:
-                print(f"❌ Error loading results: {e}")
-                return None
+                print(f"❌ Error loading {file_type}: {e}")
+                return default
+    
+    @property
+    def history_log(self):
+        """The history log (history.log), rotated by size into compressed archives."""
+        if self._history_log is None:
+            from .history_log import HistoryLog
+            settings = self.load_settings()
+            with self._lock:
+                if self._history_log is None:
+                    max_mb = settings.get("history_max_mb", 50)
+                    self._history_log = HistoryLog(
+                        self.files['history'],
+                        max_bytes=int(float(max_mb) * 1024 ** 2) if max_mb else None,
+                        backups=int(settings.get("history_backups", 5))
+                    )
+        return self._history_log
     
     def add_to_history(self, entry: str) -> bool:
         """
@@ -250,23 +490,20 @@ class FileManager:
         Returns:
             bool: True if successful, False otherwise
         """
-        with self._lock:
-            try:
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                log_entry = f"[{timestamp}] {entry}\n"
-                
-                with open(self.files['history'], 'a', encoding='utf-8') as f:
-                    f.write(log_entry)
-                return True
-            except Exception as e:
-                print(f"❌ Error adding to history: {e}")
-                return False
+        try:
+            self.history_log.append(entry)
+            return True
+        except Exception as e:
+            print(f"❌ Error adding to history: {e}")
+            return False
     
     def get_recent_history(self, lines: int = 50) -> list:
         """
         Get recent history entries.
         
+        Reads backwards from the end of the log, so the cost depends on the
+        lines returned, not on the size of the log.
+        
         Args:
             lines: Number of recent lines to return
             
@@ -274,11 +511,24 @@ class FileManager:
             list: List of recent history entries
         """
         try:
-            if self.files['history'].exists():
-                with open(self.files['history'], 'r', encoding='utf-8') as f:
-                    all_lines = f.readlines()
-                return all_lines[-lines:] if len(all_lines) > lines else all_lines
+            return self.history_log.tail(lines)
+        except Exception as e:
+            print(f"❌ Error reading history: {e}")
             return []
+    
+    def get_history_between(self, start=None, end=None) -> list:
+        """
+        Get the history entries logged in a time range (archives included).
+        
+        Args:
+            start: datetime or "YYYY-MM-DD HH:MM:SS"; open-ended if None
+            end: datetime or "YYYY-MM-DD HH:MM:SS"; open-ended if None
+            
+        Returns:
+            list: History lines in time order
+        """
+        try:
+            return self.history_log.between(start, end)
         except Exception as e:
             print(f"❌ Error reading history: {e}")
             return []
@@ -350,6 +600,41 @@ class FileManager:
             return {'error': False}
 
 
+@contextmanager
+def interprocess_lock(path):
+    """
+    Hold an exclusive lock on ``path`` (a lock file, created if missing) for
+    the duration of a ``with`` block, across processes.
+
+    Uses fcntl.flock on POSIX and msvcrt.locking on Windows; blocks until the
+    lock is free.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after ~10 s; keep waiting
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
 # Global file manager instance
 _file_manager = None
 
@@ -0,0 +1,229 @@
+"""
+Project Evee - History Log
+The history log (``[YYYY-MM-DD HH:MM:SS] entry`` lines) grows without bound
+on long-running installs. This keeps reads independent of its size:
+recent lines are read by seeking backwards from the end of the file block by
+block, the file is rotated into gzip-compressed archives once it reaches a
+size limit, and time-range queries jump close to the first matching line
+through a sparse index of (timestamp, byte offset) samples instead of
+scanning from the start.
+"""
+
+import bisect
+import gzip
+import os
+import re
+import shutil
+import threading
+from datetime import datetime
+
+_TIMESTAMP = re.compile(rb"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] ")
+_TIMESTAMP_TEXT = re.compile(_TIMESTAMP.pattern.decode())
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+_BLOCK_SIZE = 64 * 1024
+
+
+def _format_time(value):
+    """datetime or "YYYY-MM-DD HH:MM:SS" string -> string (these compare in time order)."""
+    return value.strftime(_TIMESTAMP_FORMAT) if isinstance(value, datetime) else value
+
+
+class HistoryLog:
+    """
+    Size-rotated history log with tail and time-range reads.
+
+    Archives are named ``<stem>-<rotation time><suffix>.gz`` next to the log
+    (e.g. history-20250101-120000.log.gz), so their names sort in time order
+    and each one ends where the next begins.
+    """
+
+    def __init__(self, path, max_bytes=50 * 1024 ** 2, backups=5, index_every=_BLOCK_SIZE):
+        """
+        Args:
+            path (Path): The log file
+            max_bytes (int): Size at which the log is rotated; None never rotates
+            backups (int): Compressed archives kept
+            index_every (int): Bytes between samples of the sparse index
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.index_every = index_every
+        self._lock = threading.Lock()
+        self._index = None  # [(timestamp, offset)], built on the first range query
+        self._compressing = None
+
+    # ------------------------------------------------------------------ writing
+
+    def append(self, entry, timestamp=None):
+        """
+        Append an entry, rotating the log first if it is full.
+
+        Args:
+            entry (str): Entry text (may span several lines)
+            timestamp (datetime, optional): Defaults to now
+        """
+        stamp = (timestamp or datetime.now()).strftime(_TIMESTAMP_FORMAT)
+        data = f"[{stamp}] {entry}\n".encode('utf-8')
+        with self._lock:
+            if self.max_bytes and self.path.exists() and self.path.stat().st_size + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                f.write(data)
+            if self._index is not None and (not self._index or offset - self._index[-1][1] >= self.index_every):
+                self._index.append((stamp, offset))
+
+    def _rotate(self):
+        """Move the log aside and compress it in the background."""
+        archive = self.path.with_name(f"{self.path.stem}-{datetime.now():%Y%m%d-%H%M%S}{self.path.suffix}")
+        if archive.exists() or archive.with_name(archive.name + ".gz").exists():
+            return  # rotated within this second already
+        os.replace(self.path, archive)
+        self._index = [] if self._index is not None else None
+        if self._compressing is not None:
+            self._compressing.join()
+        self._compressing = threading.Thread(target=self._compress, args=(archive,), daemon=True)
+        self._compressing.start()
+
+    def _compress(self, archive):
+        try:
+            tmp_path = archive.with_name(archive.name + ".gz.tmp")
+            with open(archive, 'rb') as src, gzip.open(tmp_path, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, _BLOCK_SIZE)
+            os.replace(tmp_path, archive.with_name(archive.name + ".gz"))
+            archive.unlink()
+            for old in self.archives()[:-self.backups or None]:
+                old.unlink()
+            print(f"🔄 History log rotated to {archive.name}.gz")
+        except Exception as e:
+            print(f"❌ Error compressing history archive {archive.name}: {e}")
+
+    def archives(self):
+        """Archive files, oldest first (plain files are still being compressed)."""
+        pattern = f"{self.path.stem}-*{self.path.suffix}"
+        files = list(self.path.parent.glob(pattern)) + list(self.path.parent.glob(pattern + ".gz"))
+        return sorted(files, key=lambda p: p.name)
+
+    # ------------------------------------------------------------------ reading
+
+    def _read_archive(self, archive):
+        opener = gzip.open if archive.suffix == ".gz" else open
+        try:
+            with opener(archive, 'rb') as f:
+                return f.read().decode('utf-8', errors='replace').splitlines(keepends=True)
+        except (OSError, EOFError):
+            return []  # removed or still being written by the compressor
+
+    def tail(self, count=50):
+        """
+        Get the last ``count`` lines, reading backwards from the end of the file.
+
+        Only as many 64 KB blocks as hold ``count`` lines are read; archives
+        are read only if the current log has fewer lines.
+
+        Returns:
+            list: Lines (with their newlines), oldest first
+        """
+        if count <= 0:
+            return []
+        with self._lock:
+            chunks = []
+            newlines = 0
+            if self.path.exists():
+                with open(self.path, 'rb') as f:
+                    position = f.seek(0, os.SEEK_END)
+                    # One more newline than lines wanted: the file ends with one
+                    while position > 0 and newlines <= count:
+                        size = min(_BLOCK_SIZE, position)
+                        position -= size
+                        f.seek(position)
+                        chunk = f.read(size)
+                        newlines += chunk.count(b"\n")
+                        chunks.append(chunk)
+            data = b"".join(reversed(chunks))
+            lines = data.decode('utf-8', errors='replace').splitlines(keepends=True)[-count:]
+            archives = self.archives() if len(lines) < count else []
+        for archive in reversed(archives):
+            lines = self._read_archive(archive)[-(count - len(lines)):] + lines
+            if len(lines) >= count:
+                break
+        return lines
+
+    def _timestamp_at(self, f, offset):
+        """(timestamp, offset) of the first entry starting at or after ``offset``."""
+        f.seek(offset)
+        if offset:
+            f.readline()  # skip the rest of the line we landed in
+        while True:
+            position = f.tell()
+            line = f.readline()
+            if not line:
+                return None
+            match = _TIMESTAMP.match(line)
+            if match:
+                return match.group(1).decode(), position
+
+    def _build_index(self, f):
+        """Sample one entry every ``index_every`` bytes (a seek and a short read each)."""
+        index = []
+        size = f.seek(0, os.SEEK_END)
+        for offset in range(0, size, self.index_every):
+            sample = self._timestamp_at(f, offset)
+            if sample is None:
+                break
+            if not index or sample[1] > index[-1][1]:
+                index.append(sample)
+        return index
+
+    def between(self, start=None, end=None):
+        """
+        Get the entries logged in [start, end], archives included.
+
+        Args:
+            start (datetime or str, optional): "YYYY-MM-DD HH:MM:SS"; open-ended if None
+            end (datetime or str, optional): "YYYY-MM-DD HH:MM:SS"; open-ended if None
+
+        Returns:
+            list: Lines (with their newlines) in time order; the continuation
+                  lines of a multi-line entry come with it
+        """
+        start, end = _format_time(start), _format_time(end)
+        lines = []
+        with self._lock:
+            archives = self.archives()
+            # Each archive ends at its rotation time, the next one starts after it
+            previous_end = None
+            for archive in archives:
+                archive_end = datetime.strptime(archive.name[len(self.path.stem) + 1:][:15], "%Y%m%d-%H%M%S")
+                archive_end = archive_end.strftime(_TIMESTAMP_FORMAT)
+                if (start is None or archive_end >= start) and (end is None or previous_end is None or previous_end <= end):
+                    lines += self._filter(self._read_archive(archive), start, end)
+                previous_end = archive_end
+            if self.path.exists():
+                with open(self.path, 'rb') as f:
+                    if self._index is None:
+                        self._index = self._build_index(f)
+                    position = 0
+                    if start is not None:
+                        # Last sample before start; entries from there on are in order
+                        i = bisect.bisect_left(self._index, (start,)) - 1
+                        position = self._index[i][1] if i >= 0 else 0
+                    f.seek(position)
+                    lines += self._filter((line.decode('utf-8', errors='replace') for line in f), start, end)
+        return lines
+
+    @staticmethod
+    def _filter(lines, start, end):
+        selected = []
+        keep = False
+        for line in lines:
+            match = _TIMESTAMP_TEXT.match(line)
+            if match:
+                stamp = match.group(1)
+                if end is not None and stamp > end:
+                    break
+                keep = start is None or stamp >= start
+            if keep:
+                selected.append(line)
+        return selected
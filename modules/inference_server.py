@@ -0,0 +1,644 @@
+"""
+Project Evee - Local Inference Server
+Keeps a local code model (CodeLlama by default) loaded in one long-lived
+process and serves generation requests over a Unix socket (a named pipe on
+Windows), batching concurrent requests token by token.
+
+    python -m modules.inference_server [--model codellama/CodeLlama-7b-hf] [--max-batch 8]
+    python -m modules.inference_server --model tiny      # random tiny model, CPU only
+
+Real models need a CUDA GPU; without one they would be loaded in fp32 on
+the CPU (about 28 GB for a 7B model), which is refused unless --allow-cpu
+(or EVEE_CODEGEN_ALLOW_CPU=1) is given.
+"""
+
+import argparse
+import os
+import queue
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.connection import Client, Listener
+from .file_manager import get_file_manager
+
+DEFAULT_MODEL = "codellama/CodeLlama-7b-hf"
+TINY_MODEL = "tiny"
+
+
+def default_address():
+    """Socket path (named pipe on Windows) the server listens on."""
+    if sys.platform == "win32":
+        return r"\\.\pipe\project-evee-codegen"
+    user = os.getuid() if hasattr(os, "getuid") else os.getenv("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"project-evee-codegen-{user}.sock")
+
+
+def _address_family(address):
+    return "AF_PIPE" if address.startswith("\\\\") else "AF_UNIX"
+
+
+def address_in_use(address):
+    """
+    Whether a server is listening on ``address``.
+
+    A Unix socket file is left behind when a server dies, so its existence
+    says nothing; only a refused connection shows that it is stale. Named
+    pipes disappear with their server.
+    """
+    if _address_family(address) != "AF_UNIX":
+        return False
+    if not os.path.exists(address):
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.settimeout(2)
+        probe.connect(address)
+        return True
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    except OSError:
+        return True  # e.g. a full backlog: someone is there, leave it alone
+    finally:
+        probe.close()
+
+
+def load_authkey():
+    """
+    Shared secret for the socket, created on first use.
+
+    Requests are pickled, so only processes that can read this file (the
+    same user) may talk to the server.
+    """
+    path = get_file_manager().get_project_root() / "cache" / "inference_server.key"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(secrets.token_bytes(32))
+        try:
+            os.chmod(path, 0o600)
+        except OSError:
+            pass
+    return path.read_bytes()
+
+
+class ByteTokenizer:
+    """Tokenizer for the tiny test model: one token per UTF-8 byte."""
+
+    eos_token_id = 256
+    vocab_size = 257
+
+    def encode(self, text, add_special_tokens=True):
+        return list(text.encode("utf-8"))
+
+    def decode(self, ids, skip_special_tokens=True):
+        return bytes(i for i in ids if i < 256).decode("utf-8", errors="replace")
+
+
+def load_model(model_name, token=None, allow_cpu=None):
+    """
+    Load a causal LM and its tokenizer.
+
+    ``model_name`` "tiny" builds a randomly initialized two-layer Llama with
+    a byte tokenizer, so the full server path can run on CPU without
+    downloads (its output is noise). Any other name is loaded from the
+    Hugging Face hub, in 4-bit on GPU as CodeEngine always did.
+
+    Args:
+        model_name (str): Hugging Face model name or "tiny"
+        token (str, optional): Hugging Face token
+        allow_cpu (bool, optional): Load a real model in fp32 on the CPU when
+                                    there is no GPU; defaults to the
+                                    EVEE_CODEGEN_ALLOW_CPU environment variable
+
+    Returns:
+        tuple: (model, tokenizer with encode/decode/eos_token_id)
+
+    Raises:
+        RuntimeError: No GPU and CPU loading not allowed
+    """
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    if model_name == TINY_MODEL:
+        from transformers import LlamaConfig, LlamaForCausalLM
+        torch.manual_seed(0)
+        tokenizer = ByteTokenizer()
+        config = LlamaConfig(vocab_size=tokenizer.vocab_size, hidden_size=64, intermediate_size=128,
+                             num_hidden_layers=2, num_attention_heads=4, num_key_value_heads=4,
+                             max_position_embeddings=2048, eos_token_id=tokenizer.eos_token_id)
+        return LlamaForCausalLM(config).eval(), tokenizer
+
+    if allow_cpu is None:
+        allow_cpu = os.getenv("EVEE_CODEGEN_ALLOW_CPU", "").lower() in ("1", "true", "yes")
+    if not torch.cuda.is_available() and not allow_cpu:
+        raise RuntimeError(f"No CUDA GPU: {model_name} would be loaded in fp32 on the CPU "
+                           f"(4 bytes per parameter, about 28 GB for a 7B model). "
+                           f"Set EVEE_CODEGEN_ALLOW_CPU=1 (server: --allow-cpu) to do it anyway, "
+                           f"or use '{TINY_MODEL}' for testing")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, token=token)
+    if torch.cuda.is_available():
+        model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float16,
+                                                     device_map="auto", load_in_4bit=True, token=token)
+    else:
+        print(f"⚠️ No CUDA GPU: loading {model_name} in fp32 on the CPU. This needs about "
+              f"4 bytes of RAM per parameter (about 28 GB for a 7B model), and generation is slow")
+        model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32,
+                                                     low_cpu_mem_usage=True, token=token)
+    return model.eval(), tokenizer
+
+
+class _Sequence:
+    """One request being generated: its KV cache, tokens and reply slot."""
+
+    def __init__(self, request_id, prompt_ids, max_new_tokens, temperature, reply, prefix=None):
+        self.request_id = request_id
+        self.prompt_ids = prompt_ids
+        self.prefix = prefix               # shared _Prefix, or None
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.reply = reply                 # queue.Queue receiving the result dict
+        self.cache = None                  # legacy per-layer (key, value) tensors
+        self.generated = []
+        self.enqueued = time.perf_counter()
+        self.started = None
+        self.first_token = None
+
+    @property
+    def cache_len(self):
+        return self.cache[0][0].shape[2]
+
+
+class _Prefix:
+    """A prompt prefix (the system instruction) tokenized once, encoded once."""
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.cache = None                  # legacy KV cache, filled on first use
+        self.logits = None                 # logits after the last prefix token
+        self.uses = 0
+
+
+class BatchingGenerator:
+    """
+    Continuous batching over a causal LM.
+
+    A scheduler thread runs one decode step at a time for every active
+    sequence together. New requests are prefilled and join the batch at the
+    next step and finished ones leave immediately, so a long generation never
+    holds back a short one queued behind it. Sequences keep their own KV
+    caches; for each step they are left-padded to a common length.
+
+    Requests may pass a ``prefix`` (the fixed system instruction) separately
+    from the prompt. A prefix is tokenized and run through the model once;
+    its KV cache is then reused, so prefill only processes the user's tokens.
+    """
+
+    def __init__(self, model, tokenizer, max_batch=8, max_prefixes=4):
+        """
+        Args:
+            model: Hugging Face causal LM
+            tokenizer: Tokenizer with encode(), decode() and eos_token_id
+            max_batch (int): Maximum sequences decoded together
+            max_prefixes (int): Distinct prefixes whose KV caches are kept
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch = max_batch
+        self.device = next(model.parameters()).device
+        self.requests = queue.Queue()
+        self.active = []
+        self.steps = 0
+        self.completed = 0
+        self._ids = 0
+        self._ids_lock = threading.Lock()
+        self.max_prefixes = max_prefixes
+        self._prefixes = OrderedDict()     # prefix text -> _Prefix
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="evee-codegen-scheduler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.requests.put(None)
+        self._thread.join(timeout=5)
+
+    def submit(self, prompt, max_new_tokens=256, temperature=0.1, prefix=None):
+        """
+        Queue a prompt for generation.
+
+        Args:
+            prompt (str): Text to complete (after ``prefix``, if given)
+            max_new_tokens (int): Generation limit
+            temperature (float): Sampling temperature; 0 for greedy
+            prefix (str, optional): Fixed leading text whose KV cache is reused
+
+        Returns:
+            queue.Queue: Receives one result dict when the sequence finishes
+        """
+        reply = queue.Queue(maxsize=1)
+        with self._ids_lock:
+            self._ids += 1
+            request_id = self._ids
+            shared = self._prefix(prefix) if prefix else None
+        # Special tokens (BOS) belong at the very start, i.e. to the prefix
+        prompt_ids = list(self.tokenizer.encode(prompt, add_special_tokens=shared is None))
+        self.requests.put(_Sequence(request_id, prompt_ids, max_new_tokens, temperature, reply, shared))
+        return reply
+
+    def _prefix(self, text):
+        """Get (tokenizing on first use) the shared prefix entry; caller holds _ids_lock."""
+        entry = self._prefixes.get(text)
+        if entry is None:
+            entry = _Prefix(list(self.tokenizer.encode(text)))
+            self._prefixes[text] = entry
+            while len(self._prefixes) > self.max_prefixes:
+                self._prefixes.popitem(last=False)
+        self._prefixes.move_to_end(text)
+        return entry
+
+    def _run(self):
+        import torch
+        with torch.inference_mode():
+            while not self._stop.is_set():
+                # Block only when idle; otherwise just admit whatever is queued
+                self._admit(block=not self.active)
+                if self.active:
+                    try:
+                        self._decode_step()
+                    except Exception as e:
+                        for seq in self.active:
+                            seq.reply.put({"ok": False, "error": f"generation failed: {e}"})
+                        self.active = []
+
+    def _admit(self, block):
+        while len(self.active) < self.max_batch:
+            try:
+                seq = self.requests.get(block=block, timeout=0.5 if block else None)
+            except queue.Empty:
+                return
+            if seq is None:
+                return
+            try:
+                self._prefill(seq)
+            except Exception as e:
+                seq.reply.put({"ok": False, "error": f"prefill failed: {e}"})
+                continue
+            block = False
+            if not self._finished(seq):
+                self.active.append(seq)
+
+    def _prefill(self, seq):
+        """Run the prompt through the model and sample the first new token."""
+        import torch
+        seq.started = time.perf_counter()
+        past = None
+        logits = None
+        if seq.prefix is not None:
+            prefix = seq.prefix
+            if prefix.cache is None:
+                out = self.model(input_ids=torch.tensor([prefix.ids], device=self.device), use_cache=True)
+                prefix.cache = self._to_legacy(out.past_key_values)
+                prefix.logits = out.logits[:, -1, :]
+            prefix.uses += 1
+            # The model appends to a new cache object; the shared tensors stay intact
+            past = self._from_legacy(prefix.cache)
+            logits, seq.cache = prefix.logits, prefix.cache
+
+        if seq.prompt_ids:
+            input_ids = torch.tensor([seq.prompt_ids], device=self.device)
+            out = self.model(input_ids=input_ids, past_key_values=past, use_cache=True)
+            seq.cache = self._to_legacy(out.past_key_values)
+            logits = out.logits[:, -1, :]
+        seq.generated.append(self._sample(logits, [seq])[0])
+        seq.first_token = time.perf_counter()
+
+    def _decode_step(self):
+        """Advance every active sequence by one token in a single forward pass."""
+        import torch
+        batch = self.active
+        longest = max(seq.cache_len for seq in batch)
+        layers = len(batch[0].cache)
+
+        # Left-pad each cache to the longest one; padding is masked out
+        past = []
+        for layer in range(layers):
+            keys, values = [], []
+            for seq in batch:
+                key, value = seq.cache[layer]
+                pad = longest - key.shape[2]
+                if pad:
+                    key = torch.nn.functional.pad(key, (0, 0, pad, 0))
+                    value = torch.nn.functional.pad(value, (0, 0, pad, 0))
+                keys.append(key)
+                values.append(value)
+            past.append((torch.cat(keys), torch.cat(values)))
+
+        mask = torch.zeros(len(batch), longest + 1, dtype=torch.long, device=self.device)
+        for i, seq in enumerate(batch):
+            mask[i, longest - seq.cache_len:] = 1
+        positions = torch.tensor([[seq.cache_len] for seq in batch], device=self.device)
+        input_ids = torch.tensor([[seq.generated[-1]] for seq in batch], device=self.device)
+
+        out = self.model(input_ids=input_ids, attention_mask=mask, position_ids=positions,
+                         past_key_values=self._from_legacy(past), use_cache=True)
+        new_past = self._to_legacy(out.past_key_values)
+        tokens = self._sample(out.logits[:, -1, :], batch)
+        self.steps += 1
+
+        still_active = []
+        for i, seq in enumerate(batch):
+            start = longest - seq.cache_len
+            seq.cache = tuple((key[i:i + 1, :, start:], value[i:i + 1, :, start:])
+                              for key, value in new_past)
+            seq.generated.append(tokens[i])
+            if not self._finished(seq):
+                still_active.append(seq)
+        self.active = still_active
+
+    def _sample(self, logits, batch):
+        import torch
+        tokens = []
+        for row, seq in zip(logits, batch):
+            if seq.temperature and seq.temperature > 0:
+                probs = torch.softmax(row.float() / seq.temperature, dim=-1)
+                tokens.append(int(torch.multinomial(probs, 1)))
+            else:
+                tokens.append(int(torch.argmax(row)))
+        return tokens
+
+    def _finished(self, seq):
+        """Reply and return True if the sequence hit EOS or its token limit."""
+        eos = seq.generated and seq.generated[-1] == self.tokenizer.eos_token_id
+        if not eos and len(seq.generated) < seq.max_new_tokens:
+            return False
+        ids = seq.generated[:-1] if eos else seq.generated
+        now = time.perf_counter()
+        seq.reply.put({
+            "ok": True,
+            "text": self.tokenizer.decode(ids, skip_special_tokens=True),
+            "prompt_tokens": len(seq.prompt_ids),
+            "prefix_tokens": len(seq.prefix.ids) if seq.prefix else 0,
+            "prefix_reused": bool(seq.prefix and seq.prefix.uses > 1),
+            "new_tokens": len(ids),
+            "queue_seconds": round(seq.started - seq.enqueued, 4),
+            "ttft_seconds": round(seq.first_token - seq.enqueued, 4),
+            "seconds": round(now - seq.enqueued, 4),
+        })
+        seq.cache = None
+        self.completed += 1
+        return True
+
+    @staticmethod
+    def _to_legacy(past):
+        return past.to_legacy_cache() if hasattr(past, "to_legacy_cache") else tuple(past)
+
+    @staticmethod
+    def _from_legacy(past):
+        try:
+            from transformers import DynamicCache
+            return DynamicCache.from_legacy_cache(tuple(past))
+        except ImportError:
+            return tuple(past)
+
+
+class InferenceServer:
+    """
+    Serves a BatchingGenerator on a local socket.
+
+    Each client connection gets a thread that forwards its requests to the
+    shared generator's queue, so any number of callers (GUI, scripts,
+    testengine.py) share one loaded model.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL, address=None, max_batch=8, token=None, allow_cpu=None):
+        self.model_name = model_name
+        self.address = address or default_address()
+        self.max_batch = max_batch
+        self.token = token
+        self.allow_cpu = allow_cpu
+        self.generator = None
+        self.started_at = None
+
+    def serve_forever(self):
+        """
+        Load the model and serve until shut down.
+
+        Returns:
+            bool: False if another server already listens on the address or
+                  the model could not be loaded (otherwise it never returns)
+        """
+        # Checked before loading the model: a second server would take over
+        # (unlink) the live socket of the first one
+        family = _address_family(self.address)
+        if address_in_use(self.address):
+            print(f"❌ An inference server is already listening on {self.address}")
+            return False
+
+        print(f"🔄 Loading {self.model_name} for the inference server...")
+        start = time.perf_counter()
+        try:
+            model, tokenizer = load_model(self.model_name, token=self.token, allow_cpu=self.allow_cpu)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return False
+        print(f"✅ Model loaded in {time.perf_counter() - start:.1f}s")
+        self.generator = BatchingGenerator(model, tokenizer, max_batch=self.max_batch).start()
+        self.started_at = time.time()
+
+        if family == "AF_UNIX" and os.path.exists(self.address):
+            if address_in_use(self.address):
+                print(f"❌ An inference server started on {self.address} while the model loaded")
+                self.generator.stop()
+                return False
+            os.unlink(self.address)  # stale socket from a previous run
+        with Listener(self.address, family=family, authkey=load_authkey()) as listener:
+            print(f"✅ Inference server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"⚠️ Rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                op = message.get("op")
+                if op == "generate":
+                    reply = self.generator.submit(message["prompt"],
+                                                  max_new_tokens=int(message.get("max_new_tokens", 256)),
+                                                  temperature=float(message.get("temperature", 0.1)),
+                                                  prefix=message.get("prefix"))
+                    conn.send(reply.get())
+                elif op == "ping":
+                    conn.send({"ok": True, "model": self.model_name, "pid": os.getpid(),
+                               "uptime": round(time.time() - self.started_at, 1),
+                               "active": len(self.generator.active),
+                               "queued": self.generator.requests.qsize(),
+                               "completed": self.generator.completed,
+                               "steps": self.generator.steps})
+                elif op == "shutdown":
+                    conn.send({"ok": True})
+                    self.generator.stop()
+                    os._exit(0)
+                else:
+                    conn.send({"ok": False, "error": f"unknown op '{op}'"})
+
+
+class InferenceClient:
+    """
+    Client for the local inference server.
+
+    Keeps one connection open; use one client per thread (or per request)
+    to have several generations in flight at once.
+    """
+
+    def __init__(self, address=None, timeout=600):
+        """
+        Args:
+            address (str, optional): Server socket; defaults to default_address()
+            timeout (float): Seconds to wait for a generation
+        """
+        self.address = address or default_address()
+        self.timeout = timeout
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _request(self, message, timeout=None):
+        with self._lock:
+            if self._conn is None:
+                self._conn = Client(self.address, family=_address_family(self.address),
+                                    authkey=load_authkey())
+            try:
+                self._conn.send(message)
+                if not self._conn.poll(timeout or self.timeout):
+                    raise TimeoutError(f"No reply from inference server within {timeout or self.timeout}s")
+                return self._conn.recv()
+            except Exception:
+                self.close_locked()
+                raise
+
+    def close_locked(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+    def close(self):
+        with self._lock:
+            self.close_locked()
+
+    def ping(self, timeout=2):
+        """Return the server status dict, or None if no server is reachable."""
+        try:
+            return self._request({"op": "ping"}, timeout=timeout)
+        except (OSError, EOFError, TimeoutError):
+            return None
+
+    def generate(self, prompt, max_new_tokens=256, temperature=0.1, prefix=None):
+        """
+        Generate a completion for ``prefix + prompt``.
+
+        Args:
+            prompt (str): Per-request text
+            max_new_tokens (int): Generation limit
+            temperature (float): Sampling temperature; 0 for greedy
+            prefix (str, optional): Fixed leading text (system instruction);
+                                    encoded once by the server and reused
+
+        Returns:
+            dict: 'text' (new tokens only), 'prompt_tokens', 'prefix_tokens',
+                  'prefix_reused', 'new_tokens', 'queue_seconds', 'ttft_seconds'
+                  and 'seconds'; or 'ok': False with 'error'
+        """
+        return self._request({"op": "generate", "prompt": prompt, "prefix": prefix,
+                              "max_new_tokens": max_new_tokens, "temperature": temperature})
+
+    def shutdown(self):
+        try:
+            return self._request({"op": "shutdown"}, timeout=5)
+        except (OSError, EOFError, TimeoutError):
+            return None
+
+
+def ensure_server(model_name=DEFAULT_MODEL, address=None, max_batch=8, wait=600):
+    """
+    Connect to the inference server, starting it in the background if needed.
+
+    The server outlives the calling process, so the model is loaded once per
+    boot rather than once per command or per script run.
+
+    Args:
+        model_name (str): Model to load if a server has to be started
+        address (str, optional): Server socket
+        max_batch (int): Batch size for a newly started server
+        wait (float): Seconds to wait for a new server to finish loading
+
+    Returns:
+        InferenceClient: Connected client, or None if the server did not come up
+    """
+    client = InferenceClient(address)
+    status = client.ping()
+    if status:
+        if status.get("model") != model_name:
+            print(f"⚠️ Inference server is serving {status.get('model')}, not {model_name}")
+        return client
+
+    print(f"🔄 Starting inference server for {model_name}...")
+    project_root = get_file_manager().get_project_root()
+    log_path = project_root / "cache" / "inference_server.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    command = [sys.executable, "-m", "modules.inference_server", "--model", model_name,
+               "--address", client.address, "--max-batch", str(max_batch)]
+    options = {"cwd": str(project_root), "stdin": subprocess.DEVNULL}
+    if sys.platform == "win32":
+        options["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options["start_new_session"] = True
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, **options)
+
+    deadline = time.perf_counter() + wait
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            print(f"❌ Inference server exited (code {process.returncode}); see {log_path}")
+            return None
+        if client.ping():
+            print("✅ Inference server ready")
+            return client
+        time.sleep(0.5)
+    print(f"❌ Inference server did not start within {wait}s; see {log_path}")
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project Evee local inference server")
+    parser.add_argument("--model", default=os.getenv("EVEE_CODEGEN_MODEL", DEFAULT_MODEL),
+                        help=f"Hugging Face model name, or '{TINY_MODEL}' for a random CPU test model")
+    parser.add_argument("--address", default=None, help="socket path / named pipe")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--allow-cpu", action="store_true", default=None,
+                        help="load a real model in fp32 on the CPU when there is no GPU (~28 GB for 7B)")
+    args = parser.parse_args()
+    server = InferenceServer(args.model, address=args.address, max_batch=args.max_batch,
+                             token=os.getenv("HF_TOKEN"), allow_cpu=args.allow_cpu)
+    return 0 if server.serve_forever() else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+"""
+Project Evee - Language Prior
+Learns which language the user speaks from past Whisper detections, kept in
+cache/language_prior.json, so the detection pass can be skipped when it is
+predictable.
+"""
+
+import threading
+from collections import Counter
+from .file_manager import get_file_manager
+
+
+class LanguagePrior:
+    """
+    Per-user language prior built from recent detections.
+
+    The most recent ``window`` auto-detected languages are kept in their own
+    JSON file (the history log is for the user's commands). Once at least
+    ``min_samples`` detections exist and one language accounts for at least
+    ``confidence`` of them, that language is suggested and detection is
+    skipped. Every ``recheck_every``-th command still runs detection so the
+    prior keeps learning if the user switches language.
+    """
+
+    def __init__(self, min_samples=5, confidence=0.9, window=100, recheck_every=20):
+        """
+        Args:
+            min_samples (int): Detections needed before the prior is trusted
+            confidence (float): Share of detections the top language must have
+            window (int): Number of most recent detections considered
+            recheck_every (int): Run detection anyway on every Nth command
+        """
+        self.file_manager = get_file_manager()
+        self.file_manager.get_file_path('language_prior').parent.mkdir(parents=True, exist_ok=True)
+        self.min_samples = min_samples
+        self.confidence = confidence
+        self.window = window
+        self.recheck_every = recheck_every
+        self._detections = None
+        self._commands = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Read past detections (language codes, oldest first) once; caller holds the lock."""
+        if self._detections is None:
+            detections = self.file_manager.load_json('language_prior', default=[])
+            if not isinstance(detections, list):
+                detections = []
+            self._detections = [d for d in detections if isinstance(d, str) and d][-self.window:]
+        return self._detections
+
+    def observe(self, language):
+        """
+        Record a detected language in memory and in the samples file.
+
+        Args:
+            language (str): Detected language code
+        """
+        if not language or language == "unknown":
+            return
+        with self._lock:
+            detections = self._load()
+            detections.append(language)
+            del detections[:-self.window]
+            self.file_manager.save_json('language_prior', detections)
+
+    def distribution(self):
+        """
+        Get the share of each language among recent detections.
+
+        Returns:
+            dict: language -> fraction, plus the sample count under "_samples"
+        """
+        with self._lock:
+            detections = list(self._load())
+        counts = Counter(detections)
+        total = len(detections)
+        shares = {lang: count / total for lang, count in counts.most_common()} if total else {}
+        shares["_samples"] = total
+        return shares
+
+    def suggest(self, candidates=None):
+        """
+        Suggest a language to pin for the next command.
+
+        Args:
+            candidates (list, optional): Restrict the suggestion to these codes
+
+        Returns:
+            str: Language code when the prior is confident, otherwise None
+                 (meaning detection should run)
+        """
+        with self._lock:
+            self._commands += 1
+            if self.recheck_every and self._commands % self.recheck_every == 0:
+                return None
+            detections = list(self._load())
+        if candidates:
+            detections = [d for d in detections if d in candidates]
+        if len(detections) < self.min_samples:
+            return None
+        language, count = Counter(detections).most_common(1)[0]
+        if count / len(detections) >= self.confidence:
+            return language
+        return None
+
+
+# Global language prior instance
+_language_prior = None
+
+def get_language_prior() -> LanguagePrior:
+    """Get the global language prior, configured from settings."""
+    global _language_prior
+    if _language_prior is None:
+        settings = get_file_manager().load_settings()
+        _language_prior = LanguagePrior(
+            min_samples=int(settings.get("language_prior_min_samples", 5)),
+            confidence=float(settings.get("language_prior_confidence", 0.9))
+        )
+    return _language_prior
@@ -0,0 +1,182 @@
+"""
+Project Evee - Model Registry
+Process-wide cache of loaded Whisper models shared by every caller.
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from .file_manager import get_file_manager
+
+
+def default_device():
+    """Return "cuda" when a GPU is available, otherwise "cpu"."""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def model_nbytes(model):
+    """
+    Approximate memory held by a model's weights, in bytes.
+
+    Walks the state dict rather than parameters() so packed weights of
+    dynamically quantized layers (which are not parameters) are counted too.
+    """
+    def tensor_bytes(value):
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(v) for v in value)
+        if hasattr(value, "element_size") and hasattr(value, "numel"):
+            return value.numel() * value.element_size()
+        return 0
+
+    return sum(tensor_bytes(value) for value in model.state_dict().values())
+
+
+def _load_whisper(model_size, device, dtype):
+    import whisper
+    model = whisper.load_model(model_size, device=device)
+    if dtype == "float16":
+        model = model.half()
+    return model
+
+
+class ModelRegistry:
+    """
+    LRU cache of Whisper models keyed by (size, device, dtype).
+
+    Models stay resident until the total footprint exceeds ``max_bytes``, at
+    which point the least recently used ones are dropped. A model that was
+    evicted but is still referenced elsewhere (e.g. by a WhisperEngine) is
+    tracked through a weak reference and handed out again instead of being
+    reloaded, so the process never holds two copies of the same weights.
+    """
+
+    def __init__(self, max_bytes=1536 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Memory budget for cached models
+        """
+        self.max_bytes = max_bytes
+        self._models = OrderedDict()   # key -> (model, nbytes)
+        self._live = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_size, device, dtype):
+        return (model_size, device, dtype)
+
+    def get(self, model_size, device=None, dtype="float32", loader=None):
+        """
+        Return a loaded model, loading it only if no copy exists in the process.
+
+        Args:
+            model_size (str): Whisper model size, e.g. "base" or "small"
+            device (str, optional): "cpu" or "cuda"; auto-detected if None
+            dtype (str): Weight precision label, part of the cache key
+            loader (callable, optional): ``loader(model_size, device, dtype)``
+                returning a model; defaults to whisper.load_model
+
+        Returns:
+            The loaded model
+        """
+        device = device or default_device()
+        key = self.make_key(model_size, device, dtype)
+
+        with self._lock:
+            model = self._lookup(key)
+            if model is not None:
+                return model
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other sizes stay available, but
+        # serialize loads of the same key so it is never loaded twice
+        with key_lock:
+            with self._lock:
+                model = self._lookup(key)
+                if model is not None:
+                    return model
+                self.misses += 1
+
+            print(f"🔄 Loading model {key} into registry...")
+            start = time.perf_counter()
+            model = (loader or _load_whisper)(model_size, device, dtype)
+            nbytes = model_nbytes(model)
+            print(f"✅ Loaded {key} in {time.perf_counter() - start:.1f}s ({nbytes / 1024 ** 2:.0f} MB)")
+
+            with self._lock:
+                self._insert(key, model, nbytes)
+            return model
+
+    def _lookup(self, key):
+        """Find a cached or still-referenced model; caller holds the lock."""
+        if key in self._models:
+            self._models.move_to_end(key)
+            self.hits += 1
+            return self._models[key][0]
+
+        model = self._live.get(key)
+        if model is not None:
+            # Evicted from the LRU but still in use somewhere: re-adopt it
+            self.hits += 1
+            self._insert(key, model, model_nbytes(model))
+            return model
+        return None
+
+    def _insert(self, key, model, nbytes):
+        """Add a model and evict least recently used ones; caller holds the lock."""
+        self._models[key] = (model, nbytes)
+        self._models.move_to_end(key)
+        self._live[key] = model
+        while len(self._models) > 1 and self.memory_used() > self.max_bytes:
+            evicted, _ = self._models.popitem(last=False)
+            print(f"♻️ Evicted model {evicted} from registry")
+
+    def memory_used(self):
+        """Total bytes held by cached models."""
+        return sum(nbytes for _, nbytes in self._models.values())
+
+    def evict(self, model_size, device=None, dtype="float32"):
+        """Drop a model from the cache. Returns True if it was cached."""
+        key = self.make_key(model_size, device or default_device(), dtype)
+        with self._lock:
+            return self._models.pop(key, None) is not None
+
+    def clear(self):
+        """Drop every cached model."""
+        with self._lock:
+            self._models.clear()
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Cached keys (most recent last), memory use and hit/miss counts
+        """
+        with self._lock:
+            return {
+                "models": [list(key) for key in self._models],
+                "memory_mb": round(self.memory_used() / 1024 ** 2, 1),
+                "max_mb": round(self.max_bytes / 1024 ** 2, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Global model registry instance
+_model_registry = None
+_registry_lock = threading.Lock()
+
+def get_model_registry() -> ModelRegistry:
+    """Get the global model registry, sized by the model_cache_mb setting."""
+    global _model_registry
+    with _registry_lock:
+        if _model_registry is None:
+            settings = get_file_manager().load_settings()
+            max_mb = float(settings.get("model_cache_mb", 1536))
+            _model_registry = ModelRegistry(max_bytes=int(max_mb * 1024 * 1024))
+    return _model_registry
@@ -0,0 +1,319 @@
+"""
+Project Evee - Browser Network Policies
+Blocks requests a browser agent does not need (images, fonts, media,
+analytics and ad domains) in each page of a browser context, instead of the
+all-or-nothing Chromium flags used before. Policies are named and shared
+through settings.json, so browser_use_engine, limain and liengine all block
+the same things, and every interceptor counts the requests it blocked and
+estimates the bytes that were not downloaded.
+
+Blocking happens inside Chromium through the DevTools protocol: domains and
+URL patterns with Network.setBlockedURLs (no round trip at all), resource
+types with Fetch interception limited to those types. Playwright's
+context.route("**/*") is not used: it sends every request through Python and
+turns off the HTTP cache.
+"""
+
+import asyncio
+import fnmatch
+from urllib.parse import urlsplit
+from .file_manager import get_file_manager
+
+# Hosts (and their subdomains) that serve analytics, tag managers and ads
+TRACKER_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com",
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+    "facebook.net", "connect.facebook.net", "analytics.twitter.com", "ads.linkedin.com",
+    "px.ads.linkedin.com", "snap.licdn.com", "bat.bing.com", "clarity.ms",
+    "hotjar.com", "segment.io", "segment.com", "mixpanel.com", "amplitude.com",
+    "newrelic.com", "nr-data.net", "scorecardresearch.com", "quantserve.com",
+    "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "adnxs.com",
+    "amazon-adsystem.com", "moatads.com", "optimizely.com", "fullstory.com",
+)
+
+# Self-hosted tracking endpoints; file names, not path prefixes, so pages
+# like /pixel-art/ or /beacon-hill/ are not caught
+TRACKER_PATTERNS = (
+    "*/analytics.js", "*/gtag/js*", "*/pixel.gif*", "*/pixel.png*", "*/beacon.js*", "*/beacon.min.js*",
+)
+
+POLICY_PRESETS = {
+    # Nothing blocked
+    "off": {},
+    # What an agent reading the DOM never needs
+    "lean": {
+        "block_types": ["image", "media", "font"],
+        "block_domains": list(TRACKER_DOMAINS),
+        "block_patterns": list(TRACKER_PATTERNS),
+    },
+    # Also drop stylesheets; fastest, but some sites lay out or hide elements differently
+    "text": {
+        "block_types": ["image", "media", "font", "stylesheet"],
+        "block_domains": list(TRACKER_DOMAINS),
+        "block_patterns": list(TRACKER_PATTERNS),
+    },
+}
+
+# Playwright resource type -> DevTools protocol Network.ResourceType
+_CDP_RESOURCE_TYPES = {
+    "document": "Document", "stylesheet": "Stylesheet", "image": "Image", "media": "Media",
+    "font": "Font", "script": "Script", "texttrack": "TextTrack", "xhr": "XHR", "fetch": "Fetch",
+    "eventsource": "EventSource", "websocket": "WebSocket", "manifest": "Manifest", "ping": "Ping",
+    "other": "Other",
+}
+_CDP_TO_PLAYWRIGHT = {value: key for key, value in _CDP_RESOURCE_TYPES.items()}
+_BLOCKED_ERROR = "net::ERR_BLOCKED_BY_CLIENT"
+
+# Typical response sizes (bytes) used to estimate savings until this process
+# has seen real responses of a type
+DEFAULT_SIZE_ESTIMATES = {
+    "image": 40_000, "media": 500_000, "font": 30_000, "stylesheet": 20_000,
+    "script": 30_000, "xhr": 2_000, "fetch": 2_000, "ping": 100, "other": 5_000,
+}
+
+
+class NetworkPolicy:
+    """
+    What to block: resource types, domains and URL patterns.
+
+    A request is blocked if its resource type is in ``block_types``, its host
+    is (a subdomain of) one of ``block_domains`` or its URL matches one of the
+    ``block_patterns`` (shell-style wildcards), unless it matches one of
+    ``allow_patterns``. Top-level documents are never blocked.
+    """
+
+    def __init__(self, block_types=(), block_domains=(), block_patterns=(), allow_patterns=(),
+                 name="custom"):
+        self.name = name
+        self.block_types = frozenset(block_types)
+        self.block_domains = tuple(domain.lower().lstrip(".") for domain in block_domains)
+        self.block_patterns = tuple(block_patterns)
+        self.allow_patterns = tuple(allow_patterns)
+
+    @classmethod
+    def from_config(cls, config, name="custom"):
+        """Build a policy from a settings dict (keys as in POLICY_PRESETS)."""
+        return cls(config.get("block_types", ()), config.get("block_domains", ()),
+                   config.get("block_patterns", ()), config.get("allow_patterns", ()), name=name)
+
+    @property
+    def blocks_anything(self):
+        return bool(self.block_types or self.block_domains or self.block_patterns)
+
+    def url_patterns(self):
+        """
+        The domains and patterns as Chromium blocked-URL patterns ("*" wildcards).
+
+        Returns:
+            list: Patterns for Network.setBlockedURLs
+        """
+        patterns = []
+        for domain in self.block_domains:
+            patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+        return patterns + list(self.block_patterns)
+
+    def block_reason(self, url, resource_type):
+        """
+        Decide whether to block a request.
+
+        Args:
+            url (str): Request URL
+            resource_type (str): Playwright resource type ("image", "script", ...)
+
+        Returns:
+            str: Why the request is blocked ("type", "domain" or "pattern"), or None to allow it
+        """
+        if resource_type == "document" or not url.startswith(("http:", "https:")):
+            return None
+        if any(fnmatch.fnmatch(url, pattern) for pattern in self.allow_patterns):
+            return None
+        if resource_type in self.block_types:
+            return "type"
+        host = (urlsplit(url).hostname or "").lower()
+        if any(host == domain or host.endswith("." + domain) for domain in self.block_domains):
+            return "domain"
+        if any(fnmatch.fnmatch(url, pattern) for pattern in self.block_patterns):
+            return "pattern"
+        return None
+
+
+class NetworkInterceptor:
+    """
+    Applies a NetworkPolicy to the pages of a Playwright browser context and
+    counts the effect.
+
+    Each page (including ones opened later) gets a DevTools session. Blocked
+    domains and patterns are handed to Chromium with Network.setBlockedURLs,
+    so matching requests fail inside the browser without a round trip.
+    Blocked resource types are paused with Fetch.enable patterns for those
+    types only and failed from here; every other request goes through
+    untouched, HTTP cache included. When the policy has ``allow_patterns``
+    (which setBlockedURLs cannot express), domains and patterns are checked
+    the same way as types.
+
+    stats() reports requests allowed and blocked (by resource type and by
+    reason), bytes actually loaded, and an estimate of the bytes saved: each
+    blocked request counts the average size of loaded responses of its type,
+    or a typical size for types not seen yet.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type = {}
+        self.blocked_by_reason = {}
+        self.bytes_loaded = 0
+        self.bytes_saved_estimate = 0
+        self._sizes = {}  # resource type -> [total bytes, responses]
+        self._pending = set()
+        self._sessions = []  # DevTools sessions, one per page
+        self._context = None
+
+    async def attach(self, context):
+        """Start blocking in every page of ``context``, current and future."""
+        self._context = context
+        context.on("page", self._on_page)
+        context.on("requestfinished", self._on_finished)
+        context.on("requestfailed", self._on_failed)
+        for page in context.pages:
+            await self._attach_page(page)
+
+    async def detach(self):
+        """Stop blocking; waits for bookkeeping still in flight."""
+        if self._context is None:
+            return
+        context, self._context = self._context, None
+        for event, listener in (("page", self._on_page), ("requestfinished", self._on_finished),
+                                ("requestfailed", self._on_failed)):
+            try:
+                context.remove_listener(event, listener)
+            except Exception:
+                pass
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        sessions, self._sessions = self._sessions, []
+        for cdp in sessions:
+            try:
+                await cdp.detach()  # the session's blocking ends with it
+            except Exception:
+                pass  # page or context already closed
+
+    def _track(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _on_page(self, page):
+        self._track(self._attach_page(page))
+
+    async def _attach_page(self, page):
+        policy = self.policy
+        fetch_patterns = [{"urlPattern": "*", "resourceType": _CDP_RESOURCE_TYPES.get(kind, kind.capitalize()),
+                           "requestStage": "Request"}
+                          for kind in sorted(policy.block_types) if kind != "document"]
+        blocked_urls = policy.url_patterns()
+        if policy.allow_patterns:
+            # setBlockedURLs has no exceptions: pause these URLs too and decide here
+            fetch_patterns += [{"urlPattern": pattern, "requestStage": "Request"} for pattern in blocked_urls]
+            blocked_urls = []
+        try:
+            cdp = await self._context.new_cdp_session(page)
+            self._sessions.append(cdp)
+            if blocked_urls:
+                await cdp.send("Network.enable", {"maxTotalBufferSize": 0, "maxResourceBufferSize": 0})
+                await cdp.send("Network.setBlockedURLs", {"urls": blocked_urls})
+            if fetch_patterns:
+                cdp.on("Fetch.requestPaused", lambda event: self._track(self._on_paused(cdp, event)))
+                await cdp.send("Fetch.enable", {"patterns": fetch_patterns})
+        except Exception as e:
+            if not page.is_closed():
+                print(f"⚠️ Network policy '{policy.name}' not applied to a page: {e}")
+
+    async def _on_paused(self, cdp, event):
+        """A request of a blocked type (or a candidate URL) is waiting for a decision."""
+        kind = _CDP_TO_PLAYWRIGHT.get(event.get("resourceType"), "other")
+        try:
+            if self.policy.block_reason(event["request"]["url"], kind):
+                await cdp.send("Fetch.failRequest", {"requestId": event["requestId"],
+                                                     "errorReason": "BlockedByClient"})
+            else:
+                await cdp.send("Fetch.continueRequest", {"requestId": event["requestId"]})
+        except Exception:
+            pass  # page closed while the request was paused
+
+    def _on_failed(self, request):
+        """Count requests Chromium failed because of the policy."""
+        if request.failure != _BLOCKED_ERROR:
+            return
+        kind = request.resource_type
+        reason = self.policy.block_reason(request.url, kind)
+        if reason is None:
+            return  # blocked by something else (e.g. an extension)
+        self.blocked += 1
+        self.blocked_by_type[kind] = self.blocked_by_type.get(kind, 0) + 1
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        self.bytes_saved_estimate += self._estimated_size(kind)
+
+    def _estimated_size(self, resource_type):
+        total, count = self._sizes.get(resource_type, (0, 0))
+        if count:
+            return total // count
+        return DEFAULT_SIZE_ESTIMATES.get(resource_type, DEFAULT_SIZE_ESTIMATES["other"])
+
+    def _on_finished(self, request):
+        self.allowed += 1
+        self._track(self._record_size(request))
+
+    async def _record_size(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        size = sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+        self.bytes_loaded += size
+        entry = self._sizes.setdefault(request.resource_type, [0, 0])
+        entry[0] += size
+        entry[1] += 1
+
+    def stats(self):
+        """
+        Get interception statistics.
+
+        Returns:
+            dict: policy, allowed, blocked, blocked_by_type, blocked_by_reason,
+                  bytes_loaded and bytes_saved_estimate
+        """
+        return {
+            "policy": self.policy.name,
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "bytes_loaded": self.bytes_loaded,
+            "bytes_saved_estimate": self.bytes_saved_estimate,
+        }
+
+
+def load_network_policy(name=None):
+    """
+    Get a named network policy from settings.
+
+    Names are looked up in the ``network_policies`` setting first (custom
+    policies, or overrides of the presets), then in POLICY_PRESETS.
+
+    Args:
+        name (str, optional): Policy name; defaults to the ``network_policy`` setting
+
+    Returns:
+        NetworkPolicy: The policy ("off" if the name is unknown)
+    """
+    settings = get_file_manager().load_settings()
+    name = name or settings.get("network_policy", "lean")
+    custom = settings.get("network_policies") or {}
+    if name in custom:
+        return NetworkPolicy.from_config(custom[name], name=name)
+    if name not in POLICY_PRESETS:
+        print(f"⚠️ Unknown network policy '{name}', nothing will be blocked")
+        name = "off"
+    return NetworkPolicy.from_config(POLICY_PRESETS[name], name=name)
@@ -1,11 +1,155 @@
+import codeop
 import os
 import re
+import time
 from openai import OpenAI
 from dotenv import load_dotenv
-from .file_manager import get_file_manager
+from .code_engine import BaseCodeEngine
 
+FENCE = "```"
+
+
+def is_complete_program(code):
+    """Return True if ``code`` compiles as a whole Python module."""
+    try:
+        compile(code, "<generated>", "exec")
+        return True
+    except (SyntaxError, ValueError):
+        return False
+
+
+def _ends_program(source, line):
+    """
+    Whether ``line`` is text after a finished program rather than more code.
+
+    Checked at statement boundaries only (a non-blank line starting at column
+    0): true when ``source`` compiles on its own but not with ``line`` added.
+    A line that merely opens a multi-line statement is incomplete, not
+    invalid, so it does not count.
+    """
+    if not source.strip() or not line.strip() or line[0].isspace():
+        return False
+    try:
+        codeop.compile_command(source + line, "<generated>", "exec")
+        return False
+    except (SyntaxError, ValueError, OverflowError):
+        pass
+    try:
+        return codeop.compile_command(source, "<generated>", "exec") is not None
+    except (SyntaxError, ValueError, OverflowError):
+        return False
+
+
+class CodeFenceStripper:
+    """
+    Incremental version of clean_code() for streamed completions.
+
+    Feed tokens as they arrive and get back only the code text. Fenced
+    completions: a leading ```python line is dropped, and the stream is
+    marked closed at the closing fence so anything the model writes after it
+    is ignored; text that might be the start of a fence is held back until it
+    can be decided. Unfenced completions (what INSTRUCTION asks for) are
+    passed on a line at a time, and the stream is closed at the first
+    top-level line that turns a compiling program into one that does not,
+    i.e. where the model moved on to prose.
+    """
+
+    def __init__(self):
+        self.fenced = False
+        self.closed = False
+        self._started = False
+        self._pending = ""
+        self._chunks = []
+
+    def feed(self, text):
+        """
+        Add streamed text.
+
+        Args:
+            text (str): Next piece of the completion
+
+        Returns:
+            str: Newly available code (may be empty)
+        """
+        if self.closed or not text:
+            return ""
+        self._pending += text
+
+        if not self._started:
+            head = self._pending.lstrip()
+            if not head:
+                return ""
+            if head.startswith(FENCE) or FENCE.startswith(head):
+                newline = head.find("\n")
+                if newline == -1:
+                    return ""  # wait for the rest of the ```python line
+                head = head[newline + 1:]
+                self.fenced = True
+            self._started = True
+            self._pending = head
+
+        # Closing fence at the start of a line ends the code
+        end = self._pending.find("\n" + FENCE)
+        if end == -1 and self._pending.startswith(FENCE):
+            end = 0
+        if end != -1:
+            self.closed = True
+            return self._emit(self._pending[:end])
+
+        if not self.fenced:
+            return self._feed_lines()
+
+        # Hold back a trailing partial line that could still become a fence,
+        # and trailing backticks that clean_code() would strip at the end
+        newline = self._pending.rfind("\n")
+        tail = self._pending[newline:] if newline != -1 else self._pending
+        hold = tail if FENCE.startswith(tail.lstrip("\n")) else re.search(r'`*$', tail).group()
+        return self._emit(self._pending[:len(self._pending) - len(hold)], keep=hold)
+
+    def _feed_lines(self):
+        """Pass on the complete lines of unfenced code, up to the end of the program."""
+        newline = self._pending.rfind("\n")
+        if newline == -1:
+            return ""  # wait for the whole line
+        source = "".join(self._chunks)
+        code = ""
+        for line in self._pending[:newline + 1].splitlines(keepends=True):
+            if _ends_program(source + code, line):
+                self.closed = True
+                return self._emit(code)
+            code += line
+        return self._emit(code, keep=self._pending[newline + 1:])
+
+    def _emit(self, text, keep=""):
+        self._pending = keep
+        if text:
+            self._chunks.append(text)
+        return text
+
+    def finish(self):
+        """
+        Flush held-back text at the end of the stream.
+
+        Returns:
+            str: Remaining code (may be empty)
+        """
+        if self.closed:
+            return ""
+        self.closed = True
+        tail = re.sub(r'```\s*$', '', self._pending)
+        if not self.fenced and _ends_program("".join(self._chunks), tail):
+            tail = ""
+        return self._emit(tail)
+
+    @property
+    def code(self):
+        """All code received so far, with surrounding whitespace removed."""
+        return "".join(self._chunks).strip()
+
+
+class OpenAICodeEngine(BaseCodeEngine):
+    name = "openai"
 
-class OpenAICodeEngine:
     def __init__(self):
         """Initialize the OpenAI code generation engine."""
         print("Initializing OpenAI engine...")
@@ -13,57 +157,40 @@ class OpenAICodeEngine:
         # Load environment variables from .env file
         load_dotenv()
         
-        # Initialize file manager
-        self.file_manager = get_file_manager()
+        # File manager and code cache
+        super().__init__()
+        settings = self.file_manager.load_settings()
         
         # Get API key from environment variable or settings
         self.api_key = os.getenv('OPENAI_API_KEY')
         if not self.api_key:
-            settings = self.file_manager.load_settings()
             self.api_key = settings.get("openai_api_key", "")
         
         if not self.api_key:
             raise ValueError("Please set your OpenAI API key in settings or as environment variable 'OPENAI_API_KEY'")
         
-        self.client = OpenAI(api_key=self.api_key)
-        print("OpenAI engine initialized successfully!")
-
-    def clean_code(self, text):
-        """Clean the response to extract only Python code."""
-        # Remove markdown code block markers
-        text = re.sub(r'```python\s*', '', text)
-        text = re.sub(r'```\s*$', '', text)
-        
-        # Remove any leading/trailing whitespace
-        text = text.strip()
+        # An alternative base URL points the engine at a proxy or local server
+        self.base_url = os.getenv('OPENAI_BASE_URL') or settings.get("openai_base_url") or None
+        self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
         
-        return text
-
-    def generate_code(self):
-        """Generate code based on the user's request."""
-        # Instructions for the model
-        instruction = """You are a personal in-house POC assistant.
-        Your purpose is to receive text commands (e.g., "I want to watch some youtube videos")
-        and write python code using pyautogui, pywinauto, selenium to complete the task.
-        Return ONLY the Python code, no explanations, no markdown formatting, no comments, no text before or after the code."""
-
-        # Read the user command from the file manager
-        user_request = self.file_manager.load_transcription()
-        if not user_request:
-            print("Error: No transcription available. Please record audio first.")
-            return None
+        self.last_code = None
+        self.last_metrics = {}
+        print("OpenAI engine initialized successfully!")
 
-        # Create the prompt
-        prompt = f"{instruction}\n\nUser Command: {user_request}\n\nPython Code:"
+    def _build_messages(self, user_request):
+        """Build the chat messages for a user command."""
+        return [
+            {"role": "system", "content": self.INSTRUCTION},
+            {"role": "user", "content": user_request}
+        ]
 
+    def _generate(self, user_request):
+        """Ask the OpenAI chat API for code."""
         try:
             # Generate code using OpenAI
             response = self.client.chat.completions.create(
                 model="gpt-4",  # You can also use "gpt-3.5-turbo" for a cheaper option
-                messages=[
-                    {"role": "system", "content": instruction},
-                    {"role": "user", "content": user_request}
-                ],
+                messages=self._build_messages(user_request),
                 temperature=0.1,  # Lower temperature for more focused code generation
                 max_tokens=1000
             )
@@ -79,13 +206,97 @@ class OpenAICodeEngine:
             print(f"Error generating code: {str(e)}")
             return None
 
-    def save_code(self, code, filename="automation_code.py"):
-        """Save the generated code to a file."""
+    def generate_code_stream(self, user_request=None):
+        """
+        Stream generated code as the model produces it.
+
+        Yields code text (markdown fences already stripped) as tokens arrive.
+        The generator returns as soon as the program is complete, without
+        waiting for anything the model adds after it: at the closing code
+        fence, or, for unfenced code, at the first top-level line that no
+        longer compiles with the program before it (see CodeFenceStripper);
+        otherwise at the end of the stream. The full code is then available in
+        ``last_code`` and timings in ``last_metrics``:
+
+            ttft            seconds until the first token
+            code_ready      seconds until the complete code was available
+            total           seconds until the stream was closed
+            complete        whether the code compiles as a whole
+            stopped_early   whether the stream was closed before the model finished
+            cached          whether the code came from the code cache (no API call)
+
+        Args:
+            user_request (str, optional): Command text; defaults to the saved transcription
+
+        Yields:
+            str: Pieces of code
+        """
+        self.last_code = None
+        self.last_metrics = {}
+        user_request = self._resolve_request(user_request)
+        if not user_request:
+            return
+
+        cached = self.cached_code(user_request)
+        if cached:
+            self.last_code = cached
+            self.last_metrics = {"ttft": 0.0, "code_ready": 0.0, "total": 0.0, "chunks": 0,
+                                 "complete": is_complete_program(cached), "stopped_early": False,
+                                 "cached": True}
+            yield cached
+            return
+
+        start = time.perf_counter()
+        metrics = {"ttft": None, "code_ready": None, "total": None,
+                   "chunks": 0, "complete": False, "stopped_early": False, "cached": False}
+        self.last_metrics = metrics
+        stripper = CodeFenceStripper()
+        stream = None
+
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(code)
-            print(f"Code saved to {filename}")
-            return True
+            stream = self.client.chat.completions.create(
+                model="gpt-4",
+                messages=self._build_messages(user_request),
+                temperature=0.1,
+                max_tokens=1000,
+                stream=True
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if not token:
+                    continue
+                if metrics["ttft"] is None:
+                    metrics["ttft"] = time.perf_counter() - start
+                metrics["chunks"] += 1
+
+                piece = stripper.feed(token)
+                if piece:
+                    yield piece
+                if stripper.closed:
+                    # The program ended: anything after it is prose, so stop
+                    # paying for tokens and hand the code over right away
+                    metrics["stopped_early"] = True
+                    break
+            else:
+                piece = stripper.finish()
+                if piece:
+                    yield piece
+
+            self.last_code = stripper.code
+            metrics["code_ready"] = time.perf_counter() - start
+            metrics["complete"] = is_complete_program(self.last_code)
+            if not metrics["complete"]:
+                print("⚠️ Generated code is not a complete Python program")
+
         except Exception as e:
-            print(f"Error saving code: {str(e)}")
-            return False 
\ No newline at end of file
+            print(f"Error generating code: {str(e)}")
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                stream.close()
+            metrics["total"] = time.perf_counter() - start
+            if metrics["ttft"] is not None:
+                ready = metrics["code_ready"]
+                print(f"📊 First token {metrics['ttft'] * 1000:.0f} ms, code ready "
+                      f"{'n/a' if ready is None else f'{ready * 1000:.0f} ms'}")
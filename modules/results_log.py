@@ -0,0 +1,289 @@
+"""
+Project Evee - Results Log
+Keeps the results of every execution in an append-only, line-delimited JSON
+file instead of overwriting results.json each time. Saving a run appends one
+line; an in-memory index of byte offsets by run id and timestamp (built by
+scanning line headers, without decoding the results) lets "latest run",
+tail and time-range queries read only the lines they return. Old runs are
+dropped by periodic compaction.
+
+Several processes may share the log (the voice GUI and a batch run, say):
+appends, compaction and reads hold a lock file next to it, and the index
+catches up with lines other processes wrote (or is rebuilt after they
+compacted) whenever the file is not the size the index expects.
+"""
+
+import bisect
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from .file_manager import interprocess_lock
+
+# Every line starts with these fields, in this order, so the index can be
+# built without decoding the results that follow
+_HEADER = re.compile(rb'^\{"run_id": "([\w.:/-]+)", "timestamp": ([0-9.]+), "kind": "(\w+)"')
+# ASCII only, as in the bytes pattern above: json.dumps escapes anything else
+_RUN_ID_UNSAFE = re.compile(r"[^\w.:/-]", re.ASCII)
+_KIND_UNSAFE = re.compile(r"\W", re.ASCII)
+
+
+class ResultsLog:
+    """
+    Append-only log of execution results.
+
+    Each line is ``{"run_id", "timestamp", "kind", "results"}``. Run ids
+    are unique: generated ones end in a random suffix, and appending an id
+    that is already logged raises ValueError. The index maps every run id to
+    the byte offset and length of its line.
+    """
+
+    def __init__(self, path, max_runs=1000, compact_every=100, legacy_path=None):
+        """
+        Args:
+            path (Path): The .jsonl log file
+            max_runs (int): Runs kept by compaction; None keeps everything
+            compact_every (int): Appends between compaction checks
+            legacy_path (Path, optional): Old single-run results.json, imported
+                                          when the log is first created
+        """
+        self.path = path
+        self.max_runs = max_runs
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._file_lock = self.path.with_name(self.path.name + '.lock')
+        self._file_state = None  # (inode, size) of the log as indexed
+        self._offsets = {}      # run_id -> (offset, length)
+        self._timestamps = []   # sorted timestamps, parallel to _run_ids
+        self._run_ids = []
+        self._kinds = []
+        self._appends = 0
+        with interprocess_lock(self._file_lock):
+            if not self.path.exists() and legacy_path is not None and legacy_path.exists():
+                self._import_legacy(legacy_path)
+            self._build_index()
+
+    def _import_legacy(self, legacy_path):
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+        except Exception:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'wb') as f:
+            f.write(self._encode("legacy", os.path.getmtime(legacy_path), "command", results))
+
+    @staticmethod
+    def _encode(run_id, timestamp, kind, results):
+        header = json.dumps({"run_id": run_id, "timestamp": round(timestamp, 6), "kind": kind})
+        body = json.dumps(results, ensure_ascii=False, default=str)
+        return f'{header[:-1]}, "results": {body}}}\n'.encode('utf-8')
+
+    def _build_index(self, start=0):
+        """
+        Scan line headers from byte ``start`` (0 rebuilds the index); a torn
+        last line (crash mid-write) is cut off. Caller holds the file lock.
+        """
+        if not start:
+            self._offsets.clear()
+            self._timestamps, self._run_ids, self._kinds = [], [], []
+        if not self.path.exists():
+            self._file_state = None
+            return
+        offset = start
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                match = _HEADER.match(line)
+                if match:
+                    self._add_to_index(match.group(1).decode(), float(match.group(2)),
+                                       match.group(3).decode(), offset, len(line))
+                offset += len(line)
+        stat = self.path.stat()
+        if offset < stat.st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+        self._file_state = (stat.st_ino, offset)
+
+    def _refresh(self):
+        """
+        Bring the index up to date with the file (caller holds both locks).
+
+        Lines appended by other processes are indexed from where the index
+        ends; a file that was replaced (compacted) or shrank is re-indexed.
+        """
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            if self._file_state is not None:
+                self._build_index()
+            return
+        if self._file_state == (stat.st_ino, stat.st_size):
+            return
+        if self._file_state is not None and self._file_state[0] == stat.st_ino \
+                and stat.st_size > self._file_state[1]:
+            self._build_index(self._file_state[1])
+        else:
+            self._build_index()
+
+    def _add_to_index(self, run_id, timestamp, kind, offset, length):
+        self._offsets[run_id] = (offset, length)
+        # Timestamps are appended in order almost always; insort covers clock jumps
+        position = bisect.bisect_right(self._timestamps, timestamp)
+        self._timestamps.insert(position, timestamp)
+        self._run_ids.insert(position, run_id)
+        self._kinds.insert(position, kind)
+
+    def append(self, results, run_id=None, kind="command", timestamp=None):
+        """
+        Append one run.
+
+        Args:
+            results (dict): The run's results
+            run_id (str, optional): Identifier; generated (time plus a random
+                                    suffix) if not given. Characters other than
+                                    ASCII letters, digits and ``_.:/-`` become "_"
+            kind (str): "command", "batch", ...
+            timestamp (float, optional): Seconds since the epoch; defaults to now
+
+        Returns:
+            str: The run id
+
+        Raises:
+            ValueError: If ``run_id`` is already in the log
+        """
+        run_id = _RUN_ID_UNSAFE.sub("_", run_id) if run_id else new_run_id()
+        kind = _KIND_UNSAFE.sub("_", kind)
+        timestamp = time.time() if timestamp is None else timestamp
+        line = self._encode(run_id, timestamp, kind, results)
+        with self._lock, interprocess_lock(self._file_lock):
+            self._refresh()
+            if run_id in self._offsets:
+                raise ValueError(f"Run id {run_id!r} is already in the results log")
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line)
+                inode = os.fstat(f.fileno()).st_ino
+            self._add_to_index(run_id, timestamp, kind, offset, len(line))
+            self._file_state = (inode, offset + len(line))
+            self._appends += 1
+            if self.compact_every and self._appends % self.compact_every == 0:
+                self._maybe_compact()
+        return run_id
+
+    def _read(self, run_ids):
+        """Decode the lines of ``run_ids`` (caller holds the lock)."""
+        entries = []
+        if not run_ids:
+            return entries
+        with open(self.path, 'rb') as f:
+            for run_id in run_ids:
+                offset, length = self._offsets[run_id]
+                f.seek(offset)
+                entries.append(json.loads(f.read(length)))
+        return entries
+
+    def get(self, run_id):
+        """
+        Get one run.
+
+        Returns:
+            dict: The log entry (run_id, timestamp, kind, results), or None
+        """
+        with self._lock, interprocess_lock(self._file_lock):
+            self._refresh()
+            if run_id not in self._offsets:
+                return None
+            return self._read([run_id])[0]
+
+    def latest(self, kind=None):
+        """The most recent entry (of ``kind``, if given), or None."""
+        entries = self.tail(1, kind=kind)
+        return entries[0] if entries else None
+
+    def tail(self, count=10, kind=None):
+        """
+        Get the most recent runs.
+
+        Args:
+            count (int): Number of runs
+            kind (str, optional): Only runs of this kind
+
+        Returns:
+            list: Entries, oldest first
+        """
+        with self._lock, interprocess_lock(self._file_lock):
+            self._refresh()
+            run_ids = []
+            for position in range(len(self._run_ids) - 1, -1, -1):
+                if len(run_ids) >= count:
+                    break
+                if kind is None or self._kinds[position] == kind:
+                    run_ids.append(self._run_ids[position])
+            return self._read(run_ids[::-1])
+
+    def between(self, start=None, end=None, kind=None):
+        """
+        Get the runs whose timestamps fall in [start, end].
+
+        Args:
+            start (float, optional): Seconds since the epoch; open-ended if None
+            end (float, optional): Seconds since the epoch; open-ended if None
+            kind (str, optional): Only runs of this kind
+
+        Returns:
+            list: Entries, oldest first
+        """
+        with self._lock, interprocess_lock(self._file_lock):
+            self._refresh()
+            low = 0 if start is None else bisect.bisect_left(self._timestamps, start)
+            high = len(self._timestamps) if end is None else bisect.bisect_right(self._timestamps, end)
+            run_ids = [self._run_ids[i] for i in range(low, high)
+                       if kind is None or self._kinds[i] == kind]
+            return self._read(run_ids)
+
+    def __len__(self):
+        return len(self._run_ids)
+
+    def _maybe_compact(self):
+        if self.max_runs and len(self._run_ids) > self.max_runs * 1.25:
+            self._compact()
+
+    def compact(self):
+        """
+        Rewrite the log with only the newest ``max_runs`` runs.
+
+        Returns:
+            int: Runs dropped
+        """
+        with self._lock, interprocess_lock(self._file_lock):
+            self._refresh()
+            return self._compact()
+
+    def _compact(self):
+        """Rewrite from the index (caller holds both locks and has refreshed it)."""
+        keep = self._run_ids[-self.max_runs:] if self.max_runs else list(self._run_ids)
+        dropped = len(self._run_ids) - len(keep)
+        if not self.path.exists():
+            return 0
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            for run_id in keep:
+                offset, length = self._offsets[run_id]
+                src.seek(offset)
+                dst.write(src.read(length))
+        os.replace(tmp_path, self.path)
+        self._build_index()
+        if dropped:
+            print(f"🔄 Results log compacted: {dropped} old runs dropped, {len(keep)} kept")
+        return dropped
+
+
+def new_run_id(prefix=""):
+    """A unique run id: ``<prefix><YYYYmmdd-HHMMSS>-<random hex>``."""
+    return f"{prefix}{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
@@ -0,0 +1,144 @@
+"""
+Project Evee - Startup Pipeline
+Imports heavy dependencies and loads models in background workers so the GUI
+can be drawn before torch, whisper, openai and browser_use are imported.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StartupPipeline:
+    """
+    Runs named startup tasks in parallel and tracks when each becomes ready.
+
+    Tasks are plain callables; whatever a task returns is stored and can be
+    fetched with ``result(name)``. Callers that need a component (e.g. the
+    record button needs Whisper) block on ``wait_for(name)`` instead of
+    polling or showing a "still loading" error.
+    """
+
+    PENDING = "pending"
+    LOADING = "loading"
+    READY = "ready"
+    ERROR = "error"
+
+    def __init__(self, max_workers=4):
+        """
+        Args:
+            max_workers (int): Number of background worker threads
+        """
+        self.max_workers = max_workers
+        self._tasks = {}
+        self._events = {}
+        self._results = {}
+        self._states = {}
+        self._timings = {}
+        self.errors = {}
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._started_at = None
+
+    def add(self, name, func, required=True):
+        """
+        Register a startup task.
+
+        Args:
+            name (str): Component name, e.g. "whisper"
+            func (callable): Called with no arguments on a worker thread
+            required (bool): Whether overall readiness waits for this task.
+                             Optional tasks (pre-imports) may fail silently.
+        """
+        self._tasks[name] = (func, required)
+        self._events[name] = threading.Event()
+        self._states[name] = self.PENDING
+
+    def start(self, on_status=None, on_error=None, on_ready=None):
+        """
+        Start all tasks in the background and return immediately.
+
+        Args:
+            on_status (callable, optional): Called with a status message
+            on_error (callable, optional): Called with (name, exception)
+            on_ready (callable, optional): Called once every required task has
+                                           finished; check ``errors`` for failures
+        """
+        self._started_at = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="evee-startup")
+
+        def run(name, func, required):
+            with self._lock:
+                self._states[name] = self.LOADING
+            if on_status and required:
+                on_status(f"Loading {name}...")
+            start = time.perf_counter()
+            try:
+                result = func()
+                with self._lock:
+                    self._results[name] = result
+                    self._states[name] = self.READY
+            except Exception as e:
+                with self._lock:
+                    self._states[name] = self.ERROR
+                    self.errors[name] = e
+                if required and on_error:
+                    on_error(name, e)
+                elif not required:
+                    print(f"⚠️ Optional startup task '{name}' failed: {e}")
+            finally:
+                self._timings[name] = time.perf_counter() - start
+                self._events[name].set()
+                self._check_ready(on_ready)
+
+        for name, (func, required) in self._tasks.items():
+            executor.submit(run, name, func, required)
+        executor.shutdown(wait=False)
+
+    def _check_ready(self, on_ready):
+        with self._lock:
+            if self.ready.is_set():
+                return
+            required = [n for n, (_, req) in self._tasks.items() if req]
+            if all(self._events[n].is_set() for n in required):
+                self._timings["total"] = time.perf_counter() - self._started_at
+                self.ready.set()
+            else:
+                return
+        if on_ready:
+            on_ready()
+
+    def wait_for(self, *names, timeout=None):
+        """
+        Block until the named components have finished loading.
+
+        Args:
+            *names (str): Components to wait for; all required ones if empty
+            timeout (float, optional): Maximum seconds to wait
+
+        Returns:
+            bool: True if every component loaded successfully
+        """
+        names = names or [n for n, (_, req) in self._tasks.items() if req]
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for name in names:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not self._events[name].wait(remaining):
+                return False
+        return all(self._states[name] == self.READY for name in names)
+
+    def is_ready(self, name):
+        """Whether a component has loaded successfully."""
+        return self._states.get(name) == self.READY
+
+    def state(self, name):
+        """Loading state of a component: pending, loading, ready or error."""
+        return self._states.get(name, self.PENDING)
+
+    def result(self, name):
+        """Return what a finished task produced (None if not ready)."""
+        return self._results.get(name)
+
+    def timings(self):
+        """Seconds spent per task, plus "total" once all required tasks finished."""
+        return dict(self._timings)
@@ -0,0 +1,216 @@
+"""
+Project Evee - Transcription Cache
+Persistent, content-addressed cache of Whisper results so re-transcribing the
+same audio (GUI retries, re-runs of main_gui.py) skips inference entirely.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import wave
+from pathlib import Path
+from .file_manager import get_file_manager
+
+
+def hash_audio(audio):
+    """
+    Hash the PCM content of a WAV file or a float32 array.
+
+    Only the samples and their format are hashed, not file metadata, so the
+    in-memory recording and the same audio saved as a 16 kHz mono WAV map to
+    the same digest. Non-WAV files are hashed byte for byte.
+
+    Args:
+        audio (str or np.ndarray): Audio file path or 16 kHz mono float32 samples
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    if isinstance(audio, (str, Path)):
+        path = str(audio)
+        try:
+            with wave.open(path, 'rb') as wf:
+                digest.update(f"{wf.getframerate()}|{wf.getnchannels()}|{wf.getsampwidth()}|".encode())
+                while True:
+                    frames = wf.readframes(65536)
+                    if not frames:
+                        break
+                    digest.update(frames)
+        except (wave.Error, EOFError):
+            digest = hashlib.sha256(b"raw|")
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+    else:
+        import numpy as np
+        # Back to int16 so this matches the WAV written from the same capture
+        pcm = np.clip(np.round(np.asarray(audio, dtype=np.float32) * 32768.0), -32768, 32767).astype('<i2')
+        digest.update(b"16000|1|2|")
+        digest.update(pcm.tobytes())
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Size-bounded on-disk cache of transcription results.
+
+    Each entry is a small JSON file named after the hash of (PCM data, model
+    size, backend, language option). Entries are evicted least recently used
+    first (hits refresh the file's modification time) once either bound is
+    exceeded. Hit and miss counters are persisted alongside the entries.
+    """
+
+    def __init__(self, cache_dir=None, max_entries=1000, max_bytes=20 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (str, optional): Directory for entries; defaults to
+                                       <project root>/cache/transcriptions
+            max_entries (int): Maximum number of cached results
+            max_bytes (int): Maximum total size of cached results
+        """
+        self.file_manager = get_file_manager()
+        self.cache_dir = Path(cache_dir) if cache_dir else self.file_manager.get_project_root() / 'cache' / 'transcriptions'
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._stats_path = self.cache_dir / 'stats.json'
+        self._lock = threading.Lock()
+        self.hits, self.misses = self._load_counters()
+
+    @staticmethod
+    def make_key(audio_hash, model_size, backend, language):
+        raw = f"{audio_hash}|{model_size}|{backend}|{language or 'auto'}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def _load_counters(self):
+        try:
+            with open(self._stats_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return int(data.get("hits", 0)), int(data.get("misses", 0))
+        except (OSError, ValueError):
+            return 0, 0
+
+    def _save_counters(self):
+        try:
+            tmp = self._stats_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"hits": self.hits, "misses": self.misses}, f)
+            os.replace(tmp, self._stats_path)
+        except OSError as e:
+            print(f"⚠️ Could not save transcription cache stats: {e}")
+
+    def get(self, key):
+        """
+        Look up a cached result.
+
+        Args:
+            key (str): Key from make_key()
+
+        Returns:
+            dict: The cached result, or None on a miss
+        """
+        path = self._entry_path(key)
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+                os.utime(path)  # mark as recently used for LRU eviction
+                self.hits += 1
+            except (OSError, ValueError):
+                result = None
+                self.misses += 1
+            self._save_counters()
+        return result
+
+    def put(self, key, result):
+        """
+        Store a result and evict old entries if the cache is over its bounds.
+
+        Args:
+            key (str): Key from make_key()
+            result (dict): JSON-serializable transcription result
+
+        Returns:
+            bool: True if stored
+        """
+        path = self._entry_path(key)
+        with self._lock:
+            try:
+                tmp = path.with_suffix('.tmp')
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(result, f, ensure_ascii=False)
+                os.replace(tmp, path)
+            except (OSError, TypeError, ValueError) as e:
+                print(f"⚠️ Could not cache transcription: {e}")
+                return False
+            self._evict()
+        return True
+
+    def _entries(self):
+        entries = []
+        for path in self.cache_dir.glob('*.json'):
+            if path == self._stats_path:
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self):
+        """Remove least recently used entries until within bounds; caller holds the lock."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Delete every cached result (counters are kept)."""
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: hits, misses, hit_rate, entries and size_mb
+        """
+        with self._lock:
+            entries = self._entries()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "entries": len(entries),
+                "size_mb": round(sum(size for _, size, _ in entries) / 1024 ** 2, 2),
+            }
+
+
+# Global transcription cache instance
+_transcription_cache = None
+
+def get_transcription_cache() -> TranscriptionCache:
+    """Get the global transcription cache, sized by the transcription_cache_mb setting."""
+    global _transcription_cache
+    if _transcription_cache is None:
+        settings = get_file_manager().load_settings()
+        max_mb = float(settings.get("transcription_cache_mb", 20))
+        _transcription_cache = TranscriptionCache(max_bytes=int(max_mb * 1024 * 1024))
+    return _transcription_cache
@@ -0,0 +1,139 @@
+"""
+Project Evee - Voice Activity Detection
+Decides when a spoken command has ended so recording can stop promptly.
+"""
+
+import math
+import numpy as np
+from .file_manager import get_file_manager
+
+
+class EnergyVAD:
+    """
+    Energy-based voice activity detector with an adaptive noise floor.
+
+    The first ``calibration_ms`` of audio are used to measure the room's noise
+    floor. Speech starts once the block energy stays above ``onset_ratio`` times
+    that floor for ``onset_blocks`` consecutive blocks, and ends after
+    ``silence_timeout`` seconds below ``offset_ratio`` times the floor. The
+    lower offset threshold plus the timeout act as hangover smoothing, so short
+    pauses between words do not cut the command off.
+
+    Any object with ``reset()`` and ``process(samples) -> bool`` can be passed to
+    ``voice_input.record_audio`` in place of this class.
+    """
+
+    def __init__(self, rate=16000, silence_timeout=0.3, calibration_ms=300,
+                 onset_ratio=3.0, offset_ratio=2.0, onset_blocks=2,
+                 min_threshold=150.0, adapt_rate=0.05):
+        """
+        Args:
+            rate (int): Sample rate of the audio being analysed
+            silence_timeout (float): Seconds of silence after speech before stopping
+            calibration_ms (int): Length of the initial noise-floor calibration
+            onset_ratio (float): Floor multiple a block must exceed to count as speech
+            offset_ratio (float): Floor multiple below which speech counts as silence
+            onset_blocks (int): Consecutive loud blocks needed to start speech
+            min_threshold (float): Lower bound for thresholds (int16 RMS units)
+            adapt_rate (float): How fast the floor tracks background noise
+        """
+        self.rate = rate
+        self.silence_timeout = float(silence_timeout)
+        self.calibration_samples = int(rate * calibration_ms / 1000)
+        self.onset_ratio = onset_ratio
+        self.offset_ratio = offset_ratio
+        self.onset_blocks = onset_blocks
+        self.min_threshold = min_threshold
+        self.adapt_rate = adapt_rate
+        self.reset()
+
+    def reset(self):
+        """Clear all state before a new recording."""
+        self.noise_floor = None
+        self.speech_started = False
+        self.finished = False
+        self._calibration_energies = []
+        self._calibrated_samples = 0
+        self._onset_count = 0
+        self._silent_samples = 0
+
+    @property
+    def onset_threshold(self):
+        return max((self.noise_floor or 0.0) * self.onset_ratio, self.min_threshold)
+
+    @property
+    def offset_threshold(self):
+        return max((self.noise_floor or 0.0) * self.offset_ratio, self.min_threshold * 0.75)
+
+    @staticmethod
+    def block_energy(samples):
+        """RMS energy of an int16 block."""
+        if len(samples) == 0:
+            return 0.0
+        block = samples.astype(np.float32)
+        return math.sqrt(float(np.dot(block, block)) / len(block))
+
+    def process(self, samples):
+        """
+        Feed one block of int16 samples.
+
+        Args:
+            samples (np.ndarray): int16 audio block
+
+        Returns:
+            bool: True once the utterance has ended and recording should stop
+        """
+        if self.finished:
+            return True
+
+        energy = self.block_energy(samples)
+
+        # 1) calibrate the noise floor from the first few hundred milliseconds
+        if self._calibrated_samples < self.calibration_samples:
+            self._calibration_energies.append(energy)
+            self._calibrated_samples += len(samples)
+            if self._calibrated_samples >= self.calibration_samples:
+                self.noise_floor = float(np.median(self._calibration_energies))
+                self._calibration_energies = []
+            return False
+
+        # 2) wait for speech onset, tracking slow changes in background noise
+        if not self.speech_started:
+            if energy > self.onset_threshold:
+                self._onset_count += 1
+                if self._onset_count >= self.onset_blocks:
+                    self.speech_started = True
+                    self._silent_samples = 0
+            else:
+                self._onset_count = 0
+                self.noise_floor += self.adapt_rate * (energy - self.noise_floor)
+            return False
+
+        # 3) in speech: stop after silence_timeout seconds under the offset threshold
+        if energy > self.offset_threshold:
+            self._silent_samples = 0
+        else:
+            self._silent_samples += len(samples)
+            if self._silent_samples >= self.silence_timeout * self.rate:
+                self.finished = True
+                return True
+        return False
+
+
+def create_vad(rate=16000):
+    """
+    Build the default detector using the user's silence_timeout setting.
+
+    Args:
+        rate (int): Sample rate of the recording
+
+    Returns:
+        EnergyVAD: A detector ready for a new recording
+    """
+    settings = get_file_manager().load_settings()
+    try:
+        silence_timeout = float(settings.get("silence_timeout", 0.3))
+    except (TypeError, ValueError):
+        print(f"⚠️ Invalid silence_timeout setting: {settings.get('silence_timeout')!r}, using 0.3s")
+        silence_timeout = 0.3
+    return EnergyVAD(rate=rate, silence_timeout=silence_timeout)
@@ -1,58 +1,204 @@
 import pyaudio
 import wave
+import queue
+import threading
 import numpy as np
+from .vad import create_vad
 
-#recording audio
-def record_audio(filename, rate=16000, channels=1):
-    
-    silence_limit = 4  # 2 seconds of silence before stopping
-    # compute how many blocks constitute the max duration & silence limit
-    max_blocks     = int(rate / 1024 * 360)  # 120 seconds (2 minutes) maximum recording time
-    silent_blocks  = int(rate / 1024 * silence_limit)
+CHUNK_SIZE = 1024  # samples per stream.read() call
+
+
+class AudioRingBuffer:
+    """
+    Preallocated int16 ring buffer for microphone capture.
+
+    Blocks are copied straight into a fixed NumPy array, so a recording does not
+    grow a Python list of byte strings. When more audio arrives than the buffer
+    can hold, the oldest samples are overwritten.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Maximum number of samples kept in the buffer
+        """
+        self.capacity = int(capacity)
+        self._data = np.zeros(self.capacity, dtype=np.int16)
+        self._write_pos = 0
+        self._size = 0
+
+    def clear(self):
+        """Forget all buffered samples (the storage itself is reused)."""
+        self._write_pos = 0
+        self._size = 0
+
+    def write(self, samples):
+        """
+        Append int16 samples, overwriting the oldest audio once full.
+
+        Args:
+            samples (np.ndarray): 1-D int16 samples
+        """
+        n = len(samples)
+        if n >= self.capacity:
+            self._data[:] = samples[-self.capacity:]
+            self._write_pos = 0
+            self._size = self.capacity
+            return
+
+        end = self._write_pos + n
+        if end <= self.capacity:
+            self._data[self._write_pos:end] = samples
+        else:
+            first = self.capacity - self._write_pos
+            self._data[self._write_pos:] = samples[:first]
+            self._data[:n - first] = samples[first:]
+        self._write_pos = end % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def to_int16(self):
+        """Return the buffered samples in chronological order as int16."""
+        if self._size < self.capacity:
+            return self._data[:self._size].copy()
+        return np.concatenate((self._data[self._write_pos:], self._data[:self._write_pos]))
+
+    def to_float32(self):
+        """Return the buffered samples as float32 in [-1, 1], the format Whisper expects."""
+        if self._size < self.capacity:
+            audio = self._data[:self._size].astype(np.float32)
+        else:
+            audio = np.empty(self.capacity, dtype=np.float32)
+            tail = self.capacity - self._write_pos
+            audio[:tail] = self._data[self._write_pos:]
+            audio[tail:] = self._data[:self._write_pos]
+        audio /= 32768.0
+        return audio
+
+    def __len__(self):
+        return self._size
+
+
+# Reused between recordings so each command does not allocate a fresh buffer
+_shared_buffers = {}
+
+
+def _get_ring_buffer(capacity):
+    buffer = _shared_buffers.get(capacity)
+    if buffer is None:
+        buffer = AudioRingBuffer(capacity)
+        _shared_buffers[capacity] = buffer
+    buffer.clear()
+    return buffer
+
+
+def _capture(buffer, rate=16000, channels=1, vad=None, max_seconds=360):
+    """Read microphone blocks into ``buffer`` until the VAD reports the end of speech."""
+    if vad is None:
+        vad = create_vad(rate)
+    vad.reset()
+    # compute how many blocks constitute the max duration
+    max_blocks = int(rate / CHUNK_SIZE * max_seconds)
 
     p = pyaudio.PyAudio()
 
     #open the stream
-    stream = p.open(format=pyaudio.paInt16, channels=channels, rate=rate, input=True, frames_per_buffer=1024)
+    stream = p.open(format=pyaudio.paInt16, channels=channels, rate=rate, input=True, frames_per_buffer=CHUNK_SIZE)
     print("Recording... (Speak now, recording will stop after you finish talking)")
 
-    silence_counter = 0
-    speaking = False  # Track if we've started speaking
-
     #recording
-    frames = []
-    for i in range(max_blocks):
-        data = stream.read(1024, exception_on_overflow=False)
-        frames.append(data)
-
-        # 1) compute RMS or mean absolute amplitude
-        audio_block = np.frombuffer(data, dtype=np.int16)
-        amplitude = np.abs(audio_block).mean()
-
-        if amplitude < 300:  # Reduced threshold from 500 to 300
-            if speaking:  # Only count silence if we've started speaking
-                silence_counter += 1
-        else:
-            speaking = True  # We've detected speech
-            silence_counter = 0
+    try:
+        for i in range(max_blocks):
+            data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
+            audio_block = np.frombuffer(data, dtype=np.int16)
+            buffer.write(audio_block)
+
+            if vad.process(audio_block):
+                print("Silence detected → stopping")
+                break
+    finally:
+        #clean up
+        stream.stop_stream()
+        stream.close()
+        sample_width = p.get_sample_size(pyaudio.paInt16)
+        p.terminate()
+
+    return sample_width
+
+
+#recording audio straight into memory
+def record_audio_array(rate=16000, channels=1, max_seconds=360, vad=None):
+    """
+    Record a voice command into a preallocated ring buffer.
+
+    Args:
+        rate (int): Sample rate in Hz (Whisper expects 16000)
+        channels (int): Number of input channels
+        max_seconds (int): Capacity of the ring buffer in seconds
+        vad: Voice activity detector with reset()/process(); defaults to
+             vad.create_vad(), which honours the silence_timeout setting
+
+    Returns:
+        np.ndarray: float32 mono audio in [-1, 1], ready for Whisper's transcribe()
+    """
+    buffer = _get_ring_buffer(int(rate * channels * max_seconds))
+    _capture(buffer, rate=rate, channels=channels, vad=vad, max_seconds=max_seconds)
+    audio = buffer.to_float32()
+    if channels > 1:
+        audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+    print(f"Audio recorded in memory: {len(audio) / rate:.1f}s")
+    return audio
+
+
+#streaming audio block by block while the user is still speaking
+def stream_audio(rate=16000, max_seconds=360, vad=None):
+    """
+    Yield microphone audio as it is captured, stopping when the VAD detects silence.
 
-        # 2) if we've seen enough consecutive "quiet" frames, break
-        if silence_counter > silent_blocks:
-            print(f"Silence detected for {silence_limit}s → stopping")
+    Capture runs on its own thread so a slow consumer (e.g. a Whisper decode in
+    WhisperEngine.transcribe_stream) never causes the input stream to overflow.
+
+    Args:
+        rate (int): Sample rate in Hz (Whisper expects 16000)
+        max_seconds (int): Maximum recording length
+        vad: Voice activity detector with reset()/process(); defaults to vad.create_vad()
+
+    Yields:
+        np.ndarray: float32 mono blocks of CHUNK_SIZE samples in [-1, 1]
+    """
+    blocks = queue.Queue()
+    done = object()
+
+    class _QueueWriter:
+        def write(self, samples):
+            blocks.put(samples.astype(np.float32) / 32768.0)
+
+    def capture():
+        try:
+            _capture(_QueueWriter(), rate=rate, channels=1, vad=vad, max_seconds=max_seconds)
+        except Exception as e:
+            print(f"❌ Streaming capture error: {e}")
+        finally:
+            blocks.put(done)
+
+    threading.Thread(target=capture, daemon=True).start()
+    while True:
+        block = blocks.get()
+        if block is done:
             break
-    
-    #clean up
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
+        yield block
+
+
+#recording audio
+def record_audio(filename, rate=16000, channels=1, vad=None):
+    buffer = _get_ring_buffer(int(rate * channels * 360))
+    sample_width = _capture(buffer, rate=rate, channels=channels, vad=vad)
 
     #save the recording into the filename passed
     with wave.open(filename, 'wb') as wf:
         wf.setnchannels(channels)
-        wf.setsampwidth(p.get_sample_size(pyaudio.paInt16))
+        wf.setsampwidth(sample_width)
         wf.setframerate(rate)
-        wf.writeframes(b''.join(frames))
+        wf.writeframes(buffer.to_int16().tobytes())
     print(f"Audio recorded and saved as: {filename}")
 
     return filename
-
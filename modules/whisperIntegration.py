@@ -1,6 +1,4 @@
-import whisper
+from .model_registry import get_model_registry
 class whisper:
     def __init__(self):
-        self.model = whisper.load_model("turbo")
-
-    
\ No newline at end of file
+        self.model = get_model_registry().get("turbo")
@@ -0,0 +1,183 @@
+"""
+Project Evee - Whisper Inference Backends
+Interchangeable ways of loading and running a Whisper model, each reporting
+load time, real-time factor and memory footprint measured on this machine.
+"""
+
+import time
+from .model_registry import default_device, get_model_registry, model_nbytes
+
+SAMPLE_RATE = 16000
+
+
+class WhisperBackend:
+    """
+    Base class for Whisper inference backends.
+
+    Subclasses set ``name`` and ``dtype`` and may override ``_load`` to change
+    how weights are prepared. Models are loaded through the shared model
+    registry, keyed by (size, device, dtype), so backends never duplicate weights.
+    """
+
+    name = "base"
+    dtype = "float32"
+
+    def __init__(self, device=None, dtype=None):
+        """
+        Args:
+            device (str, optional): "cpu" or "cuda"; auto-detected if None
+            dtype (str, optional): Weight precision; defaults to the class dtype
+        """
+        self.device = device or default_device()
+        self.dtype = dtype or self.dtype
+        self.load_seconds = None
+        self.memory_bytes = None
+        self.audio_seconds = 0.0
+        self.compute_seconds = 0.0
+        self.last_rtf = None
+        self.runs = 0
+
+    def _load(self, model_size, device, dtype):
+        """Load a fresh model; called by the registry on a cache miss."""
+        import whisper
+        model = whisper.load_model(model_size, device=device)
+        if dtype == "float16":
+            model = model.half()
+        return model
+
+    def load(self, model_size):
+        """
+        Load (or fetch from the registry) the model for this backend.
+
+        Args:
+            model_size (str): Whisper model size
+
+        Returns:
+            The loaded model
+        """
+        start = time.perf_counter()
+        model = get_model_registry().get(model_size, device=self.device, dtype=self.dtype, loader=self._load)
+        self.load_seconds = time.perf_counter() - start
+        self.memory_bytes = model_nbytes(model)
+        return model
+
+    def transcribe(self, model, audio, record=True, **options):
+        """
+        Transcribe a file path or float32 array and record the real-time factor.
+
+        Args:
+            model: Model returned by load()
+            audio (str or np.ndarray): Audio file path or 16 kHz float32 samples
+            record (bool): Whether to include this run in the metrics
+            **options: Passed through to Whisper's transcribe()
+
+        Returns:
+            dict: Whisper's raw transcription result
+        """
+        import whisper
+        if isinstance(audio, str):
+            audio = whisper.load_audio(audio)
+        options.setdefault("fp16", self.device != "cpu" and self.dtype != "int8")
+
+        start = time.perf_counter()
+        result = model.transcribe(audio, **options)
+        elapsed = time.perf_counter() - start
+
+        duration = len(audio) / SAMPLE_RATE
+        if record and duration > 0:
+            self.runs += 1
+            self.audio_seconds += duration
+            self.compute_seconds += elapsed
+            self.last_rtf = elapsed / duration
+        return result
+
+    @property
+    def rtf(self):
+        """Average real-time factor (compute seconds per audio second)."""
+        if self.audio_seconds == 0:
+            return None
+        return self.compute_seconds / self.audio_seconds
+
+    def stats(self):
+        """
+        Get measured metrics for this backend.
+
+        Returns:
+            dict: name, device, dtype, load time, real-time factor and memory
+        """
+        return {
+            "name": self.name,
+            "device": self.device,
+            "dtype": self.dtype,
+            "load_seconds": None if self.load_seconds is None else round(self.load_seconds, 2),
+            "rtf": None if self.rtf is None else round(self.rtf, 3),
+            "last_rtf": None if self.last_rtf is None else round(self.last_rtf, 3),
+            "memory_mb": None if self.memory_bytes is None else round(self.memory_bytes / 1024 ** 2, 1),
+            "runs": self.runs,
+        }
+
+
+class ReferenceBackend(WhisperBackend):
+    """The reference openai-whisper model (fp32 on CPU, weights as loaded on GPU)."""
+
+    name = "reference"
+
+
+class Int8CPUBackend(WhisperBackend):
+    """
+    Dynamic int8 quantization of all Linear layers, for CPU-only machines.
+
+    Weights are stored as int8 and activations are quantized on the fly,
+    which roughly quarters the Linear weight memory and speeds up the matrix
+    multiplications that dominate Whisper's CPU time.
+    """
+
+    name = "int8"
+    dtype = "int8"
+
+    def __init__(self, device=None, dtype=None):
+        if device not in (None, "cpu"):
+            print(f"⚠️ The int8 backend only runs on CPU; ignoring device '{device}'")
+        super().__init__(device="cpu")
+
+    def _load(self, model_size, device, dtype):
+        import torch
+        from torch import nn
+
+        model = super()._load(model_size, "cpu", "float32")
+
+        # Whisper uses its own nn.Linear subclass; quantize_dynamic only
+        # swaps exact nn.Linear modules, so convert them first
+        for parent in list(model.modules()):
+            for child_name, child in list(parent.named_children()):
+                if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+                    plain = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                    plain.weight = child.weight
+                    plain.bias = child.bias
+                    setattr(parent, child_name, plain)
+
+        return torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+BACKENDS = {
+    ReferenceBackend.name: ReferenceBackend,
+    Int8CPUBackend.name: Int8CPUBackend,
+}
+
+
+def get_backend(name="reference", device=None, dtype=None):
+    """
+    Create a backend by name.
+
+    Args:
+        name (str): One of BACKENDS ("reference", "int8")
+        device (str, optional): "cpu" or "cuda"; auto-detected if None
+        dtype (str, optional): Weight precision for backends that support it
+
+    Returns:
+        WhisperBackend: A new backend instance
+    """
+    if name not in BACKENDS:
+        available = ", ".join(BACKENDS)
+        raise ValueError(f"Unknown Whisper backend '{name}'. Available: {available}")
+    return BACKENDS[name](device=device, dtype=dtype)
@@ -1,9 +1,18 @@
 import os
+import time
 import warnings
-import whisper
+from datetime import datetime
+import numpy as np
+from .file_manager import get_file_manager
+from .language_prior import get_language_prior
+from .model_registry import get_model_registry
+from .transcription_cache import get_transcription_cache, hash_audio
+from .whisper_backends import get_backend
 
 warnings.filterwarnings("ignore", message="FP16 is not supported on CPU")
 
+SAMPLE_RATE = 16000
+
 class WhisperEngine:
     """
     A class to handle speech transcription using OpenAI's Whisper model.
@@ -12,7 +21,7 @@ class WhisperEngine:
     with error handling and file management.
     """
     
-    def __init__(self, model_size="base"):
+    def __init__(self, model_size="base", device=None, dtype="float32", backend=None):
         """
         Initialize the WhisperEngine.
         
@@ -20,19 +29,36 @@ class WhisperEngine:
             model_size (str): Size of the Whisper model to use.
                             Options: "tiny", "base", "small", "medium", "large"
                             Default: "base" (good balance of speed vs accuracy)
+            device (str, optional): "cpu" or "cuda"; auto-detected if None
+            dtype (str): Weight precision, "float32" or "float16"
+            backend (str, optional): Inference backend, "reference" or "int8".
+                                     Defaults to the whisper_backend setting
         """
+        self.file_manager = get_file_manager()
         self.model_size = model_size
+        self.device = device
+        self.dtype = dtype
+        settings = self.file_manager.load_settings()
+        self.backend_name = backend or settings.get("whisper_backend", "reference")
+        self.use_cache = bool(settings.get("transcription_cache_enabled", True))
+        # None (auto-detect), a language code, or a list of candidate codes
+        self.language_setting = settings.get("whisper_language")
+        self.use_language_prior = bool(settings.get("language_prior_enabled", True))
+        self.backend = None
         self.model = None
         self.is_loaded = False
         
-        # Supported model sizes with their characteristics
+        # Supported model sizes with their characteristics. Speeds are measured
+        # on this machine (see _record_speed) and filled in as they become known
         self.model_info = {
-            "tiny": {"params": "39M", "speed": "~32x", "use_case": "Very fast, basic accuracy"},
-            "base": {"params": "74M", "speed": "~16x", "use_case": "Good balance (recommended)"},
-            "small": {"params": "244M", "speed": "~6x", "use_case": "Better accuracy, slower"},
-            "medium": {"params": "769M", "speed": "~2x", "use_case": "High accuracy, much slower"},
-            "large": {"params": "1550M", "speed": "1x", "use_case": "Best accuracy, slowest"}
+            "tiny": {"params": "39M", "speed": "not measured", "use_case": "Very fast, basic accuracy"},
+            "base": {"params": "74M", "speed": "not measured", "use_case": "Good balance (recommended)"},
+            "small": {"params": "244M", "speed": "not measured", "use_case": "Better accuracy, slower"},
+            "medium": {"params": "769M", "speed": "not measured", "use_case": "High accuracy, much slower"},
+            "large": {"params": "1550M", "speed": "not measured", "use_case": "Best accuracy, slowest"}
         }
+        self._speed_saved = None  # (speed key, backend runs) last written to whisper_speeds.json
+        self._apply_measured_speeds()
     
     def load_model(self):
         """
@@ -52,12 +78,19 @@ class WhisperEngine:
                 available = ", ".join(self.model_info.keys())
                 raise ValueError(f"Invalid model size '{self.model_size}'. Available: {available}")
             
-            self.model = whisper.load_model(self.model_size)
+            # Shared with every other engine in the process; a size that was
+            # used recently comes straight from the registry without reloading
+            if self.backend is None:
+                self.backend = get_backend(self.backend_name, device=self.device, dtype=self.dtype)
+                self.device = self.backend.device
+            self.model = self.backend.load(self.model_size)
             self.is_loaded = True
             
             info = self.model_info[self.model_size]
-            print(f"✅ Whisper model '{self.model_size}' loaded successfully!")
+            stats = self.backend.stats()
+            print(f"✅ Whisper model '{self.model_size}' loaded successfully! ({self.backend.name} backend)")
             print(f"   📊 Parameters: {info['params']}, Speed: {info['speed']}")
+            print(f"   ⏱️ Load time: {stats['load_seconds']}s, Memory: {stats['memory_mb']} MB")
             print(f"   💡 Use case: {info['use_case']}")
             
             return True
@@ -68,6 +101,31 @@ class WhisperEngine:
             self.is_loaded = False
             return False
     
+    def warm_up(self, seconds=1.0):
+        """
+        Run one dummy inference so the first real command does not pay for
+        kernel initialization and memory allocation.
+        
+        Args:
+            seconds (float): Length of the silent clip to decode
+            
+        Returns:
+            bool: True if the warm-up ran
+        """
+        if not self.is_loaded:
+            print("❌ Model not loaded. Call load_model() first.")
+            return False
+        
+        try:
+            start = time.perf_counter()
+            self.backend.transcribe(self.model, np.zeros(int(SAMPLE_RATE * seconds), dtype=np.float32),
+                                    record=False, language="en")
+            print(f"🔥 Whisper warm-up finished in {time.perf_counter() - start:.2f}s")
+            return True
+        except Exception as e:
+            print(f"⚠️ Whisper warm-up failed: {e}")
+            return False
+    
     def transcribe_file(self, audio_file_path, language=None, save_to_file=True):
         """
         Transcribe an audio file to text.
@@ -75,7 +133,9 @@ class WhisperEngine:
         Args:
             audio_file_path (str): Path to the audio file
             language (str, optional): Language code (e.g., "en", "es", "fr").
-                                    If None, Whisper will auto-detect
+                                    If None, the whisper_language setting or the
+                                    learned language prior is used, and Whisper
+                                    only auto-detects when neither is confident
             save_to_file (bool): Whether to save transcription to audiototext.txt
             
         Returns:
@@ -90,8 +150,267 @@ class WhisperEngine:
             print(f"❌ Audio file not found: {audio_file_path}")
             return None
         
+        print(f"🔄 Transcribing: {os.path.basename(audio_file_path)}")
+        language = self.pinned_language(language)
+        result = self._cached_transcription(audio_file_path, language, save_to_file)
+        if result is not None:
+            result["audio_file"] = audio_file_path
+        return result
+    
+    def transcribe_audio(self, audio, language=None, save_to_file=True):
+        """
+        Transcribe in-memory audio without a WAV file round-trip.
+        
+        Args:
+            audio (np.ndarray): float32 mono samples at 16 kHz in [-1, 1],
+                                e.g. from voice_input.record_audio_array()
+            language (str, optional): Language code. If None, it is resolved as in
+                                      transcribe_file()
+            save_to_file (bool): Whether to save transcription to audiototext.txt
+            
+        Returns:
+            dict: Transcription result with 'text', 'segments', and 'language'
+                 Returns None if transcription fails
+        """
+        if not self.is_loaded:
+            print("❌ Model not loaded. Call load_model() first.")
+            return None
+        
+        if audio is None or len(audio) == 0:
+            print("❌ No audio captured")
+            return None
+        
+        print(f"🔄 Transcribing {len(audio) / 16000:.1f}s of in-memory audio")
+        language = self.pinned_language(language)
+        result = self._cached_transcription(audio, language, save_to_file)
+        if result is not None:
+            result["audio_file"] = None
+        return result
+    
+    def transcribe_stream(self, chunks, language=None, save_to_file=True,
+                          step_seconds=1.0, overlap_seconds=1.0, max_window_seconds=25.0,
+                          on_partial=None):
+        """
+        Transcribe audio while it is still being recorded.
+        
+        Every ``step_seconds`` of new audio the uncommitted tail of the recording
+        is decoded again. Segments that end at least ``overlap_seconds`` before the
+        end of that window are considered stable: their text is committed and the
+        window start moves past them. Only the short unstable tail is left to
+        decode once the recorder stops, so most of the work is already done when
+        the VAD detects silence.
+        
+        Args:
+            chunks (iterable): float32 mono 16 kHz blocks, e.g. voice_input.stream_audio()
+            language (str, optional): Language code. If None and no language is
+                                      pinned (see transcribe_file), it is detected on
+                                      the first window and reused for the rest of the stream
+            save_to_file (bool): Whether to save the final text to audiototext.txt
+            step_seconds (float): New audio required before re-decoding the window
+            overlap_seconds (float): Trailing audio kept uncommitted between decodes
+            max_window_seconds (float): Window length that forces a commit (Whisper
+                                        decodes at most 30 s at a time)
+            on_partial (callable, optional): Called with each partial hypothesis (str)
+            
+        Returns:
+            dict: Transcription result with 'text', 'segments', 'language' and
+                 'partials' (number of partial hypotheses); None on failure
+        """
+        if not self.is_loaded:
+            print("❌ Model not loaded. Call load_model() first.")
+            return None
+        
+        language = self.pinned_language(language)
+        step_samples = int(step_seconds * SAMPLE_RATE)
+        audio = np.zeros(SAMPLE_RATE * 30, dtype=np.float32)
+        total = 0
+        committed = 0
+        last_decode = 0
+        committed_text = []
+        committed_segments = []
+        partials = 0
+        
+        def decode_window(final=False):
+            nonlocal language, committed
+            window = audio[committed:total]
+            options = {"initial_prompt": " ".join(committed_text)[-200:] or None}
+            if language:
+                options["language"] = language
+            result = self.backend.transcribe(self.model, window, **options)
+            if language is None:
+                language = result.get("language")
+                self._observe_language(language)
+            
+            window_end = len(window) / SAMPLE_RATE
+            segments = result.get("segments", [])
+            # Commit everything except the tail that may still change; force a
+            # commit when the window approaches Whisper's 30-second limit
+            horizon = window_end - overlap_seconds
+            if window_end >= max_window_seconds and segments:
+                horizon = max(horizon, segments[-1]["start"])
+            stable = segments if final else [seg for seg in segments if seg["end"] <= horizon]
+            pending = segments[len(stable):]
+            
+            if stable:
+                offset = committed / SAMPLE_RATE
+                for seg in stable:
+                    committed_text.append(seg["text"].strip())
+                    committed_segments.append({**seg, "start": seg["start"] + offset,
+                                               "end": seg["end"] + offset})
+                committed += int(stable[-1]["end"] * SAMPLE_RATE)
+            return [seg["text"].strip() for seg in pending]
+        
         try:
-            print(f"🔄 Transcribing: {os.path.basename(audio_file_path)}")
+            print("🔄 Streaming transcription started")
+            for chunk in chunks:
+                # Grow the buffer geometrically instead of concatenating per chunk
+                if total + len(chunk) > len(audio):
+                    audio = np.concatenate((audio, np.zeros(max(len(audio), len(chunk)), dtype=np.float32)))
+                audio[total:total + len(chunk)] = chunk
+                total += len(chunk)
+                
+                if total - last_decode >= step_samples:
+                    last_decode = total
+                    pending_text = decode_window()
+                    partials += 1
+                    if on_partial:
+                        on_partial(" ".join(committed_text + pending_text).strip())
+            
+            # Final pass over whatever has not been committed yet
+            if total - committed > SAMPLE_RATE // 10:
+                decode_window(final=True)
+            
+            transcription_text = " ".join(t for t in committed_text if t).strip()
+            print(f"✅ Streaming transcription completed ({partials} partial updates)")
+            print(f"   🌐 Language: {language or 'unknown'}")
+            
+            self._record_speed()
+            if save_to_file and transcription_text:
+                self.save_transcription(transcription_text)
+            
+            return {
+                "text": transcription_text,
+                "segments": committed_segments,
+                "language": language or "unknown",
+                "audio_file": None,
+                "partials": partials
+            }
+            
+        except Exception as e:
+            print(f"❌ Streaming transcription error: {e}")
+            return None
+    
+    def transcribe_batch(self, paths, output_path=None, language=None, batch_size=8, workers=1):
+        """
+        Transcribe many audio files with batched decoding.
+        
+        Args:
+            paths (list): Audio file paths
+            output_path (str, optional): JSONL file results are appended to as
+                                         each batch finishes (re-runs resume)
+            language (str, optional): Language code; auto-detected per file if None
+            batch_size (int): Files decoded together in one forward pass
+            workers (int): CPU worker processes; 1 reuses this engine's model
+            
+        Returns:
+            dict: Summary with counts and 'files_per_second', or None on failure
+        """
+        from .batch_transcribe import transcribe_batch
+        
+        if workers == 1 and not self.is_loaded:
+            print("❌ Model not loaded. Call load_model() first.")
+            return None
+        
+        try:
+            return transcribe_batch(paths, output_path=output_path, model_size=self.model_size,
+                                    language=language, batch_size=batch_size, workers=workers,
+                                    device=self.device, backend=self.backend_name, dtype=self.dtype,
+                                    model=self.model if workers == 1 else None)
+        except Exception as e:
+            print(f"❌ Batch transcription error: {e}")
+            return None
+    
+    def _language_candidates(self):
+        """Candidate languages from the whisper_language setting (list form)."""
+        if isinstance(self.language_setting, (list, tuple)):
+            return [lang for lang in self.language_setting if lang]
+        return []
+    
+    def pinned_language(self, language=None):
+        """
+        Decide the language to pass to Whisper without running detection.
+        
+        Order: explicit argument, a single language in the whisper_language
+        setting, then the learned language prior (restricted to the candidate
+        list if one is configured).
+        
+        Args:
+            language (str, optional): Language requested by the caller
+            
+        Returns:
+            str: Language code, or None if detection is needed
+        """
+        if language:
+            return language
+        if isinstance(self.language_setting, str) and self.language_setting:
+            return self.language_setting
+        candidates = self._language_candidates()
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.use_language_prior:
+            suggested = get_language_prior().suggest(candidates or None)
+            if suggested:
+                print(f"   🧠 Language prior: {suggested}")
+                return suggested
+        return None
+    
+    def _detect_among(self, audio_source, candidates):
+        """Run Whisper's language detection restricted to candidate codes."""
+        import whisper
+        audio = whisper.load_audio(audio_source) if isinstance(audio_source, str) else audio_source
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=self.model.dims.n_mels)
+        mel = mel.to(self.model.device)
+        if self.dtype == "float16" and self.backend.name == "reference":
+            mel = mel.half()
+        _, probs = self.model.detect_language(mel)
+        return max(candidates, key=lambda lang: probs.get(lang, 0.0))
+    
+    def _observe_language(self, language):
+        """Feed an actual detection into the language prior."""
+        if self.use_language_prior:
+            get_language_prior().observe(language)
+    
+    def _cached_transcription(self, audio_source, language, save_to_file):
+        """Return a cached result for identical audio, or transcribe and cache it."""
+        if not self.use_cache:
+            return self._run_transcription(audio_source, language, save_to_file)
+        
+        cache = get_transcription_cache()
+        key = cache.make_key(hash_audio(audio_source), self.model_size, self.backend_name, language)
+        cached = cache.get(key)
+        if cached is not None:
+            print("⚡ Transcription cache hit - skipping inference")
+            if save_to_file and cached["text"]:
+                self.save_transcription(cached["text"])
+            return cached
+        
+        result = self._run_transcription(audio_source, language, save_to_file)
+        if result is not None:
+            cache.put(key, result)
+        return result
+    
+    def _run_transcription(self, audio_source, language, save_to_file):
+        """Run Whisper on a file path or float32 array and normalize the result."""
+        try:
+            # Only a short candidate list configured: pick among those instead
+            # of letting Whisper choose from all ~100 languages
+            candidates = self._language_candidates()
+            detected_here = False
+            if not language and len(candidates) > 1:
+                language = self._detect_among(audio_source, candidates)
+                self._observe_language(language)
+            elif not language:
+                detected_here = True
             
             # Prepare transcription options
             options = {}
@@ -102,11 +421,14 @@ class WhisperEngine:
                 print("   🔍 Auto-detecting language...")
             
             # Perform transcription
-            result = self.model.transcribe(audio_file_path, **options)
+            result = self.backend.transcribe(self.model, audio_source, **options)
+            self._record_speed()
             
             # Extract information
             transcription_text = result["text"].strip()
             detected_language = result.get("language", "unknown")
+            if detected_here:
+                self._observe_language(detected_language)
             
             print(f"✅ Transcription completed!")
             print(f"   🌐 Detected language: {detected_language}")
@@ -119,14 +441,57 @@ class WhisperEngine:
             return {
                 "text": transcription_text,
                 "segments": result.get("segments", []),
-                "language": detected_language,
-                "audio_file": audio_file_path
+                "language": detected_language
             }
             
         except Exception as e:
             print(f"❌ Transcription error: {e}")
             return None
     
+    def _speed_key(self, model_size=None):
+        return f"{model_size or self.model_size}/{self.backend_name}"
+    
+    def _apply_measured_speeds(self):
+        """Fill the model_info speed column from measurements on this machine."""
+        measured = self.file_manager.load_json('whisper_speeds', default={})
+        for size, info in self.model_info.items():
+            entry = measured.get(self._speed_key(size))
+            if entry:
+                info["speed"] = entry["speed"]
+                info["measured"] = entry
+    
+    def _record_speed(self):
+        """
+        Update the measured real-time speed of the current model.
+        
+        model_info is updated after every transcription, but
+        whisper_speeds.json is only rewritten for the first measurement of a
+        model/backend and then each time the run count has doubled, so
+        transcriptions do not wait on disk writes.
+        """
+        if not self.backend or self.backend.rtf is None:
+            return
+        stats = self.backend.stats()
+        entry = {
+            "speed": f"~{1 / self.backend.rtf:.1f}x (measured)",
+            "rtf": stats["rtf"],
+            "load_seconds": stats["load_seconds"],
+            "memory_mb": stats["memory_mb"],
+            "device": stats["device"],
+            "runs": stats["runs"],
+            "measured_at": datetime.now().isoformat(timespec="seconds")
+        }
+        if self.model_size in self.model_info:
+            self.model_info[self.model_size]["speed"] = entry["speed"]
+            self.model_info[self.model_size]["measured"] = entry
+        key = self._speed_key()
+        if self._speed_saved and self._speed_saved[0] == key and stats["runs"] < 2 * self._speed_saved[1]:
+            return
+        measured = self.file_manager.load_json('whisper_speeds', default={})
+        measured[key] = entry
+        self.file_manager.save_json('whisper_speeds', measured)
+        self._speed_saved = (key, stats["runs"])
+    
     def save_transcription(self, text, filename="audiototext.txt"):
         """
         Save transcription text to a file.
@@ -157,7 +522,10 @@ class WhisperEngine:
         return {
             "current_model": self.model_size,
             "is_loaded": self.is_loaded,
-            "available_models": self.model_info
+            "backend": self.backend.stats() if self.backend else {"name": self.backend_name},
+            "available_models": self.model_info,
+            "registry": get_model_registry().stats(),
+            "transcription_cache": get_transcription_cache().stats() if self.use_cache else None
         }
     
     def change_model(self, new_model_size):
@@ -176,7 +544,8 @@ class WhisperEngine:
         
         print(f"🔄 Changing from '{self.model_size}' to '{new_model_size}'...")
         
-        # Reset current model
+        # Release our reference; the registry keeps the old weights cached
+        # (within its memory budget) so switching back is instant
         self.model = None
         self.is_loaded = False
         self.model_size = new_model_size
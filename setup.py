@@ -39,6 +39,7 @@ setup(
     entry_points={
         "console_scripts": [
             "project-evee=main_gui:main",
+            "project-evee-transcribe=modules.batch_transcribe:main",
         ],
         "gui_scripts": [
             "project-evee-gui=main_gui:main",
@@ -1,11 +1,17 @@
 # Test the browser engine
+# (the persistent browser keeps running afterwards: python -m modules.browser_launcher --stop)
 import asyncio
 from modules.browser_use_engine import Engine
+from modules.browser_runtime import prepare_browser_runtimes
 
 async def main():
     engine = Engine()
-    result = await engine.executeCommand()
+    try:
+        result = await engine.executeCommand()
+    finally:
+        await engine.close()
     print("Results: ",result)
     engine.save_results(result)
 
+prepare_browser_runtimes()
 asyncio.run(main())
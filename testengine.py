@@ -1,15 +1,11 @@
-from transformers import AutoTokenizer, AutoModelForCasualLM
-import torch
+from modules.inference_server import ensure_server
 
-# Load the model and tokenizer
+# The model stays loaded in the local inference server between runs; the
+# first run starts the server, later runs only send the prompt
 model_name = "zuozishi/wizardcoder-7b-instruct"
-
-tok = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForCasualLM.from_pretrained(
-    model_name,
-    load_in_4bit=True,
-    device_map="auto"
-)
+client = ensure_server(model_name)
+if client is None:
+    raise SystemExit("Could not start the inference server")
 
 # Instructions for the model
 instruction_prefix = """
@@ -22,17 +18,19 @@ and write python code using pyautogui, pywinauto, selenium to complete the task
 # Read the user command from the text file
 user_request = open("audiototext.txt", "r").read()
 
-#creation of the prompt
-prompt = instruction_prefix + "### User Command:\n" + user_request + "\n\n### Assistant Response (Python Code): \n"
+#creation of the prompt; the instruction goes as a prefix whose KV cache the
+#server keeps, so only the command is encoded per run
+prompt = "### User Command:\n" + user_request + "\n\n### Assistant Response (Python Code): \n"
 
 # generate the code
-inputs = tok(prompt, return_tensors="pt").to(model.device)
-out = model.generate(**inputs, max_new_tokens=256, temperature=0.1)
-code = tok.decode(out[0], skip_special_tokens=True)
+result = client.generate(prompt, max_new_tokens=256, temperature=0.1, prefix=instruction_prefix)
+if not result.get("ok"):
+    raise SystemExit(f"Generation failed: {result.get('error')}")
+code = result["text"]
 
 # Save the code to a file
 filename = "GUI.py"
 with open(filename, "w", encoding="utf-8") as f:
     f.write(code)
 
-print("Python code generated and saved to codeGen.py")
+print(f"Python code generated and saved to {filename}")
@@ -0,0 +1,31 @@
+"""Recorded browser traces never keep values typed into sensitive fields."""
+
+import pytest
+
+from modules.action_traces import _types_secrets
+
+
+def step(action, attributes):
+    return {"model_output": {"action": [action]},
+            "state": {"interacted_element": [{"tag_name": "input", "attributes": attributes}]}}
+
+
+@pytest.mark.parametrize("attributes", [
+    {"type": "password", "name": "p"},
+    {"type": "text", "autocomplete": "one-time-code"},
+    {"type": "text", "autocomplete": "cc-number"},
+    {"type": "tel", "name": "card_number"},
+    {"type": "text", "id": "login-pin"},
+    {"type": "text", "aria-label": "Security code"},
+])
+def test_typing_into_sensitive_fields_is_detected(attributes):
+    assert _types_secrets([step({"input_text": {"index": 3, "text": "hunter2"}}, attributes)])
+
+
+def test_ordinary_input_and_clicks_are_recorded():
+    steps = [
+        step({"input_text": {"index": 1, "text": "usb cable"}}, {"type": "search", "name": "q"}),
+        step({"click_element_by_index": {"index": 2}}, {"type": "password"}),
+        step({"input_text": {"index": 4, "text": "spinach"}}, {"type": "text", "name": "spin-search"}),
+    ]
+    assert not _types_secrets(steps)
@@ -0,0 +1,46 @@
+"""Resuming batch transcription from an existing JSONL output."""
+
+import json
+
+from modules.batch_transcribe import _completed_paths, _drop_torn_line
+
+
+def record(path, model="base", backend="reference", language=None, **extra):
+    return {"path": path, "text": "...", "model": model, "backend": backend,
+            "requested_language": language, **extra}
+
+
+def test_resume_is_keyed_on_path_model_backend_and_language(tmp_path):
+    output = tmp_path / "transcripts.jsonl"
+    records = [
+        record("a.wav"),
+        record("b.wav", model="small"),
+        record("c.wav", error="load failed"),
+        record("e.wav", backend="int8"),
+        record("f.wav", language="en"),
+    ]
+    output.write_text("".join(json.dumps(r) + "\n" for r in records) + '{"path": "d.wav", "te',
+                      encoding="utf-8")
+    assert _completed_paths(output, "base") == {"a.wav"}
+    assert _completed_paths(output, "small") == {"b.wav"}
+    assert _completed_paths(output, "large") == set()
+    assert _completed_paths(output, "base", backend="int8") == {"e.wav"}
+    assert _completed_paths(output, "base", language="en") == {"f.wav"}
+    assert _completed_paths(tmp_path / "missing.jsonl", "base") == set()
+
+
+def test_torn_last_line_is_cut_before_appending(tmp_path):
+    output = tmp_path / "transcripts.jsonl"
+    output.write_text(json.dumps(record("a.wav")) + "\n" + '{"path": "d.wav", "te', encoding="utf-8")
+    _drop_torn_line(output)
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record("d.wav")) + "\n")
+    assert _completed_paths(output, "base") == {"a.wav", "d.wav"}
+
+    whole = output.read_bytes()
+    _drop_torn_line(output)
+    assert output.read_bytes() == whole
+
+    output.write_text('{"path": "x.wav"', encoding="utf-8")
+    _drop_torn_line(output)
+    assert output.read_bytes() == b""
@@ -0,0 +1,94 @@
+"""Persistent browser launcher, with a fake Chromium that only serves /json/version."""
+
+import os
+import stat
+import sys
+import textwrap
+import time
+
+import pytest
+
+from modules import browser_launcher
+
+FAKE_CHROMIUM = textwrap.dedent('''\
+    #!{python}
+    import json, os, sys
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    profile = next(a.split("=", 1)[1] for a in sys.argv if a.startswith("--user-data-dir="))
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps({{"Browser": "FakeChromium/1.0", "pid": os.getpid()}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    with open(os.path.join(profile, "DevToolsActivePort"), "w") as f:
+        f.write(f"{{server.server_address[1]}}\\n/devtools/browser/fake\\n")
+    server.serve_forever()
+''')
+
+
+@pytest.fixture
+def chromium(tmp_path, monkeypatch):
+    if sys.platform == "win32":
+        pytest.skip("fake browser is a POSIX script")
+    monkeypatch.setattr(browser_launcher, "_browsers_dir", lambda: tmp_path / "browsers")
+    path = tmp_path / "chromium"
+    path.write_text(FAKE_CHROMIUM.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    yield str(path)
+    browser_launcher.stop_browsers()
+
+
+def test_browser_is_started_once_and_reused(chromium):
+    cdp_url = browser_launcher.ensure_browser("headless-1280x800", chromium, headless=True)
+    assert cdp_url and cdp_url.startswith("http://127.0.0.1:")
+    pid = browser_launcher.cdp_version(cdp_url)["pid"]
+
+    # A later caller (another event loop or process) attaches to the same browser
+    assert browser_launcher.ensure_browser("headless-1280x800", chromium, headless=True) == cdp_url
+    browsers = browser_launcher.list_browsers()
+    assert browsers["headless-1280x800"]["pid"] == pid
+    assert browsers["headless-1280x800"]["running"]
+    assert "--headless=new" in browsers["headless-1280x800"]["args"]
+
+
+def test_dead_browser_is_replaced(chromium):
+    cdp_url = browser_launcher.ensure_browser("headless-1280x800", chromium)
+    pid = browser_launcher.cdp_version(cdp_url)["pid"]
+    os.kill(pid, 9)
+    deadline = time.time() + 5
+    while browser_launcher.cdp_version(cdp_url) and time.time() < deadline:
+        time.sleep(0.05)
+
+    new_url = browser_launcher.ensure_browser("headless-1280x800", chromium)
+    assert new_url and browser_launcher.cdp_version(new_url)["pid"] != pid
+
+
+def test_stop_browsers(chromium):
+    cdp_url = browser_launcher.ensure_browser("headed-1280x800", chromium, headless=False)
+    assert browser_launcher.stop_browsers(["headed-1280x800"]) == 1
+    deadline = time.time() + 5
+    while browser_launcher.cdp_version(cdp_url) and time.time() < deadline:
+        time.sleep(0.05)
+    assert browser_launcher.cdp_version(cdp_url) is None
+    assert browser_launcher.list_browsers() == {}
+
+
+def test_old_browser_is_restarted(chromium):
+    cdp_url = browser_launcher.ensure_browser("headless-1280x800", chromium, max_age=3600)
+    pid = browser_launcher.cdp_version(cdp_url)["pid"]
+    assert browser_launcher.needs_recycle("headless-1280x800", max_age=3600) is None
+
+    time.sleep(0.2)
+    assert browser_launcher.needs_recycle("headless-1280x800", max_age=0.1)
+    new_url = browser_launcher.ensure_browser("headless-1280x800", chromium, max_age=0.1)
+    assert new_url and browser_launcher.cdp_version(new_url)["pid"] != pid
+    assert browser_launcher.cdp_version(cdp_url) is None or cdp_url == new_url
@@ -0,0 +1,42 @@
+"""BrowserRuntime mode resolution: once per process, against the start-up display."""
+
+import pytest
+
+from modules import browser_runtime
+from modules.browser_runtime import BrowserRuntime
+
+
+@pytest.fixture(autouse=True)
+def fresh_process(monkeypatch):
+    monkeypatch.setattr(browser_runtime.sys, "platform", "linux")
+    monkeypatch.setattr(browser_runtime, "_host_display", None)
+    monkeypatch.setattr(browser_runtime, "_resolved_modes", {})
+    monkeypatch.delenv("DISPLAY", raising=False)
+    monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+
+
+def test_auto_keeps_its_key_after_display_changes(monkeypatch):
+    started = []
+
+    def start_virtual_display(runtime):
+        started.append(runtime.mode)
+        monkeypatch.setenv("DISPLAY", ":99")  # what VirtualDisplay.start() does
+        return True
+
+    monkeypatch.setattr(BrowserRuntime, "_start_virtual_display", start_virtual_display)
+    first = BrowserRuntime(mode="auto")
+    assert first.prepare() == "virtual"
+    # DISPLAY is set now; a later auto runtime must still share the first one's browser
+    assert BrowserRuntime(mode="auto").key == first.key
+    assert BrowserRuntime(mode="headed").prepare() == "virtual"
+    assert started == ["auto", "headed"]
+
+
+def test_modes_are_resolved_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(BrowserRuntime, "_start_virtual_display", lambda runtime: calls.append(1) or False)
+    assert BrowserRuntime(mode="auto").prepare() == "headless"
+    assert BrowserRuntime(mode="auto", viewport={"width": 800, "height": 600}).prepare() == "headless"
+    assert len(calls) == 1
+    assert BrowserRuntime(mode="headless").prepare() == "headless"
+    assert len(calls) == 1
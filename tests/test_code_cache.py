@@ -0,0 +1,58 @@
+"""Near-duplicate matching of cached commands."""
+
+import pytest
+
+from modules.code_cache import CodeCache, commands_match, normalize_command
+from modules.file_manager import get_file_manager
+
+
+def match(a, b):
+    return commands_match(normalize_command(a), normalize_command(b))
+
+
+@pytest.mark.parametrize("a, b", [
+    ("open youtube", "Please, open YouTube."),
+    ("open you tube", "open youtube"),
+    ("open the calculator", "open calculator"),
+    ("play some music", "play music"),
+    ("open a new tab", "open the new tab"),
+    ("show me the weather", "show weather"),
+])
+def test_formatting_and_neutral_words_match(a, b):
+    assert match(a, b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("send email to john", "send email to joan"),
+    ("buy a usb cable", "buy a usb charger"),
+    ("move a.txt to b", "move b to a.txt"),
+    ("open report 2023", "open report 2024"),
+    ("open youtube", "close youtube"),
+    ("open downloads folder", "open documents folder"),
+    ("move a file to b", "move a file from b"),
+    ("click ok", "click"),
+    ("press okay", "press"),
+])
+def test_different_tasks_never_match(a, b):
+    assert not match(a, b)
+
+
+@pytest.fixture
+def make_cache(tmp_path, monkeypatch):
+    monkeypatch.setitem(get_file_manager().files, "code_cache", tmp_path / "code_cache.json")
+    return lambda **options: CodeCache(**options)
+
+
+def test_near_duplicates_hit_when_fuzzy(make_cache):
+    cache = make_cache(fuzzy=True)
+    cache.put("open the calculator", "calc()", "prompt")
+    assert cache.lookup("Please open calculator", "prompt") == "calc()"
+    assert cache.lookup("open the calendar", "prompt") is None
+
+
+def test_exact_commands_only_unless_fuzzy(make_cache):
+    cache = make_cache(fuzzy=False)
+    cache.put("buy a usb cable", "trace", "prompt")
+    assert cache.lookup("Buy a USB cable.", "prompt") == "trace"
+    assert cache.lookup("buy the usb cable", "prompt") is None
+    assert cache.lookup("buy a usb charger", "prompt") is None
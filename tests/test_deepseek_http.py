@@ -0,0 +1,162 @@
+"""DeepSeekAPIEngine against the local chat-completions stub: pooling, retries, timeouts."""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("httpx")
+
+from benchmarks._stub_api import DEFAULT_CODE, StubChatServer
+from modules import deepseek_api_engine
+from modules.deepseek_api_engine import DeepSeekAPIEngine
+
+
+@pytest.fixture
+def stub():
+    with StubChatServer(latency=0.0, trailer="") as server:
+        yield server
+
+
+@pytest.fixture
+def engine(stub, monkeypatch):
+    # Fresh shared session per test, so each one sees its own retry settings
+    monkeypatch.setattr(deepseek_api_engine, "_session", None)
+    engine = DeepSeekAPIEngine()
+    engine.code_cache = None
+    engine.validator = None
+    engine.api_url = stub.url
+    engine.headers = {"Authorization": "Bearer test-key", "Content-Type": "application/json"}
+    engine.timeout = (1.0, 2.0)
+    engine.max_retries = 3
+    engine.retry_backoff = 0.05
+    deepseek_api_engine._session = None  # the constructor built one with the settings' backoff
+    engine.session = deepseek_api_engine.get_http_session(engine.max_retries, engine.retry_backoff)
+    return engine
+
+
+def test_sync_requests_reuse_one_connection(engine, stub):
+    for _ in range(3):
+        assert engine._generate("open youtube") == DEFAULT_CODE
+    assert stub.requests == 3
+    assert stub.connections == 1
+
+
+def test_sync_retries_server_errors(engine, stub):
+    stub.reset(fail_first=2, fail_status=503)
+    assert engine._generate("open youtube") == DEFAULT_CODE
+    assert stub.requests == 3
+
+
+def test_sync_gives_up_after_max_retries(engine, stub):
+    stub.reset(fail_first=10, fail_status=503)
+    assert engine._generate("open youtube") is None
+    assert stub.requests == engine.max_retries + 1
+
+
+def test_sync_read_timeout(engine, stub):
+    stub.reset(latency=1.0)
+    engine.timeout = (1.0, 0.2)
+    start = time.perf_counter()
+    assert engine._generate("open youtube") is None
+    # Every attempt is cut off at the read timeout instead of waiting for the server
+    assert time.perf_counter() - start < (engine.max_retries + 1) * 1.0
+
+
+def test_async_requests_share_the_client(engine, stub):
+    async def run():
+        return await asyncio.gather(*(engine.generate_code_async(f"open site {i}") for i in range(4)))
+
+    assert asyncio.run(run()) == [DEFAULT_CODE] * 4
+    assert stub.requests == 4
+    assert stub.connections <= 4  # pool size
+
+
+def test_async_backs_off_between_retries(engine, stub):
+    stub.reset(fail_first=2, fail_status=503)
+    start = time.perf_counter()
+    assert asyncio.run(engine.generate_code_async("open youtube")) == DEFAULT_CODE
+    elapsed = time.perf_counter() - start
+    assert stub.requests == 3
+    # backoff * 2**attempt for attempts 0 and 1, plus jitter
+    assert elapsed >= engine.retry_backoff * (1 + 2)
+
+
+def test_async_honours_retry_after(engine, stub):
+    stub.reset(fail_first=1, fail_status=429)  # the stub sends Retry-After: 0
+    engine.retry_backoff = 5.0
+    start = time.perf_counter()
+    assert asyncio.run(engine.generate_code_async("open youtube")) == DEFAULT_CODE
+    assert time.perf_counter() - start < 2.0
+
+
+def test_async_read_timeout(engine, stub):
+    stub.reset(latency=1.0)
+    engine.timeout = (1.0, 0.2)
+    engine.max_retries = 1
+    start = time.perf_counter()
+    assert asyncio.run(engine.generate_code_async("open youtube")) is None
+    assert time.perf_counter() - start < 1.5
+
+
+def test_connect_timeout(engine):
+    # Nothing listens on a closed port: the connection fails fast and is not retried forever
+    engine.api_url = "http://127.0.0.1:9/v1/chat/completions"
+    engine.timeout = (0.2, 1.0)
+    start = time.perf_counter()
+    assert engine._generate("open youtube") is None
+    assert asyncio.run(engine.generate_code_async("open youtube")) is None
+    assert time.perf_counter() - start < 5.0
+
+
+class RejectingValidator:
+    """Rejects the first ``reject`` validations, then accepts."""
+
+    allowed_imports = {"webbrowser"}
+
+    def __init__(self, reject):
+        self.reject = reject
+        self.calls = 0
+
+    def validate(self, source):
+        self.calls += 1
+        if self.calls <= self.reject:
+            return {"ok": False, "error": "import of 'os' is not allowed"}
+        return {"ok": True, "error": None}
+
+
+class FakeCache:
+    def __init__(self, code):
+        self.code = code
+        self.invalidated = []
+
+    def lookup(self, user_request, prompt, namespace=None):
+        return self.code
+
+    def invalidate(self, user_request, namespace=None):
+        self.invalidated.append(user_request)
+        self.code = None
+        return True
+
+
+def test_async_regenerates_invalid_code(engine, stub):
+    engine.validator = RejectingValidator(reject=1)
+    assert asyncio.run(engine.generate_code_async("open youtube")) == DEFAULT_CODE
+    # One request for the command, one asking to repair the rejected code
+    assert stub.requests == 2
+
+
+def test_async_gives_up_on_code_that_stays_invalid(engine, stub):
+    engine.validator = RejectingValidator(reject=100)
+    engine.validation_retries = 2
+    assert asyncio.run(engine.generate_code_async("open youtube")) is None
+    assert stub.requests == 3
+
+
+def test_async_drops_invalid_cached_code(engine, stub):
+    engine.validator = RejectingValidator(reject=1)
+    engine.code_cache = FakeCache("import os\nos.system('rm -rf ~')")
+    assert asyncio.run(engine.generate_code_async("open youtube")) == DEFAULT_CODE
+    assert engine.code_cache.invalidated == ["open youtube"]
+    assert stub.requests == 1
@@ -0,0 +1,110 @@
+"""HedgedEngineRouter with fake providers and injected latency."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from modules.engine_router import HedgedEngineRouter
+
+
+class FakeEngine:
+    """Answers after ``latency`` seconds (per command, if a dict), or fails."""
+
+    def __init__(self, name, latency, fail=False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self.approved = []
+        self.rejected = []
+        self._lock = threading.Lock()
+
+    def generate_code(self, user_request=None):
+        with self._lock:
+            self.calls += 1
+        latency = self.latency.get(user_request, 0.0) if isinstance(self.latency, dict) else self.latency
+        time.sleep(latency)
+        return None if self.fail else f"print({self.name!r})"
+
+    def approve_code(self, user_request, code):
+        self.approved.append((user_request, code))
+        return True
+
+    def reject_code(self, user_request):
+        self.rejected.append(user_request)
+        return True
+
+
+@pytest.fixture
+def make_router():
+    routers = []
+
+    def make(engines, **options):
+        options.setdefault("default_deadline", 0.1)
+        options.setdefault("min_deadline", 0.0)
+        router = HedgedEngineRouter(engines, **options)
+        routers.append(router)
+        return router
+
+    yield make
+    for router in routers:
+        router.close()
+
+
+def test_fast_primary_is_not_hedged(make_router):
+    primary, backup = FakeEngine("primary", 0.01), FakeEngine("backup", 0.01)
+    router = make_router([primary, backup])
+    assert router.generate_code("open youtube") == "print('primary')"
+    assert backup.calls == 0
+    assert router.hedged == 0
+
+
+def test_slow_primary_is_hedged_at_the_deadline(make_router):
+    primary, backup = FakeEngine("primary", 1.0), FakeEngine("backup", 0.05)
+    router = make_router([primary, backup])
+    start = time.perf_counter()
+    assert router.generate_code("open youtube") == "print('backup')"
+    elapsed = time.perf_counter() - start
+    assert 0.15 <= elapsed < 0.5
+    assert router.hedged == 1
+
+
+def test_failed_primary_falls_over_without_waiting(make_router):
+    primary, backup = FakeEngine("primary", 0.01, fail=True), FakeEngine("backup", 0.01)
+    router = make_router([primary, backup], default_deadline=5.0)
+    start = time.perf_counter()
+    assert router.generate_code("open youtube") == "print('backup')"
+    assert time.perf_counter() - start < 1.0
+    assert router.stats()["engines"]["primary"]["failures"] == 1
+
+
+def test_deadline_follows_observed_latency(make_router):
+    primary = FakeEngine("primary", 0.02)
+    router = make_router([primary, FakeEngine("backup", 0.02)], min_samples=5, default_deadline=5.0)
+    for _ in range(5):
+        router.generate_code("open youtube")
+    assert 0.02 <= router.deadline(primary) < 0.5
+
+
+def test_overlapping_commands_approve_their_own_engine(make_router):
+    # "slow" is slow on the primary and gets hedged to the backup; "fast" is
+    # answered by the primary and finishes in between
+    primary = FakeEngine("primary", {"slow": 1.0, "fast": 0.0})
+    backup = FakeEngine("backup", 0.05)
+    router = make_router([primary, backup])
+    with ThreadPoolExecutor(2) as pool:
+        slow = pool.submit(router.generate_code, "slow")
+        time.sleep(0.12)
+        fast = pool.submit(router.generate_code, "fast")
+        assert fast.result() == "print('primary')"
+        assert slow.result() == "print('backup')"
+
+    assert router.approve_code("fast", fast.result())
+    assert router.reject_code("slow")
+    assert primary.approved == [("fast", "print('primary')")]
+    assert backup.rejected == ["slow"]
+    assert not primary.rejected and not backup.approved
+    # Each command's winner is forgotten once it has been reported
+    assert not router.approve_code("fast", fast.result())
@@ -0,0 +1,60 @@
+"""ExecutorPool: timeouts, and cleanup of the processes a killed script started."""
+
+import sys
+import time
+
+import pytest
+
+from modules.executor_pool import ExecutorPool
+
+psutil = pytest.importorskip("psutil")
+
+
+@pytest.fixture
+def pool():
+    pool = ExecutorPool(size=1, timeout=30, warm_imports=()).start(wait=True)
+    yield pool
+    pool.close()
+
+
+def test_script_output_is_captured(pool):
+    result = pool.run("print('hello')")
+    assert result["ok"]
+    assert result["stdout"].strip() == "hello"
+
+
+def test_timeout_kills_the_scripts_child_processes(pool, tmp_path):
+    pid_file = tmp_path / "children.txt"
+    script = f"""
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c",
+                          "import subprocess, sys, time; "
+                          "g = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+                          "print(g.pid, flush=True); time.sleep(60)"],
+                         stdout=subprocess.PIPE, text=True)
+grandchild = child.stdout.readline().strip()
+open({str(pid_file)!r}, "w").write(f"{{child.pid}} {{grandchild}}")
+time.sleep(60)
+"""
+    result = pool.run(script, timeout=3)
+    assert not result["ok"]
+    assert "Timed out" in result["error"]
+
+    pids = [int(pid) for pid in pid_file.read_text().split()]
+    assert len(pids) == 2
+    deadline = time.time() + 5
+    while time.time() < deadline and any(psutil.pid_exists(pid) and
+                                         psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+                                         for pid in pids):
+        time.sleep(0.1)
+    for pid in pids:
+        assert not psutil.pid_exists(pid) or psutil.Process(pid).status() == psutil.STATUS_ZOMBIE
+
+
+def test_memory_limit_without_psutil_warns_once(monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "psutil", None)  # import psutil -> ImportError
+    pool = ExecutorPool(size=0, memory_limit_mb=512, warm_imports=())
+    pool.start()
+    pool.start()
+    assert capsys.readouterr().out.count("memory limit of 512 MB is not enforced") == 1
+    pool.close()
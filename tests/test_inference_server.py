@@ -0,0 +1,99 @@
+"""Local inference server: socket handling, and the tiny CPU model end to end."""
+
+import os
+import socket
+
+import pytest
+
+from modules.inference_server import InferenceServer, address_in_use
+
+unix_only = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets only")
+
+
+@pytest.fixture
+def address(tmp_path):
+    # Unix socket paths are limited to ~100 characters
+    path = tmp_path / "codegen.sock"
+    if len(str(path)) > 100:
+        pytest.skip("temporary directory path too long for a Unix socket")
+    return str(path)
+
+
+@unix_only
+def test_missing_and_stale_sockets_are_free(address):
+    assert not address_in_use(address)
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(address)
+    stale.close()  # the file stays, nobody listens: a crashed server
+    assert os.path.exists(address)
+    assert not address_in_use(address)
+
+
+@unix_only
+def test_second_server_leaves_a_live_socket_alone(address):
+    live = socket.socket(socket.AF_UNIX)
+    live.bind(address)
+    live.listen()
+    try:
+        assert address_in_use(address)
+        # Returns before loading the model, and the socket is not unlinked
+        assert InferenceServer("tiny", address=address).serve_forever() is False
+        assert os.path.exists(address)
+        client = socket.socket(socket.AF_UNIX)
+        client.connect(address)
+        client.close()
+    finally:
+        live.close()
+
+
+@pytest.fixture
+def tiny_model():
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from modules.inference_server import load_model
+    return load_model("tiny")
+
+
+def test_tiny_model_batches_concurrent_requests(tiny_model):
+    from modules.inference_server import BatchingGenerator
+    model, tokenizer = tiny_model
+    generator = BatchingGenerator(model, tokenizer, max_batch=4).start()
+    try:
+        replies = [generator.submit(f"command {i}", max_new_tokens=8 + i, temperature=0,
+                                    prefix="You write Python code.\n") for i in range(4)]
+        results = [reply.get(timeout=60) for reply in replies]
+    finally:
+        generator.stop()
+    assert all(result["ok"] for result in results)
+    assert [result["new_tokens"] for result in results] == [8, 9, 10, 11]
+    # The instruction is encoded once; later requests reuse its KV cache
+    assert sum(result["prefix_reused"] for result in results) >= 3
+    assert generator.steps < sum(result["new_tokens"] for result in results)
+
+
+@unix_only
+def test_tiny_model_server_round_trip(tiny_model, address):
+    from modules.inference_server import ensure_server
+    client = ensure_server("tiny", address=address, max_batch=2, wait=120)
+    assert client is not None
+    try:
+        status = client.ping()
+        assert status["model"] == "tiny"
+        result = client.generate("open youtube", max_new_tokens=5, temperature=0, prefix="Write code.\n")
+        assert result["ok"] and result["new_tokens"] == 5
+        # A second server must not take over the running one's socket
+        assert InferenceServer("tiny", address=address).serve_forever() is False
+        assert client.ping()["pid"] == status["pid"]
+    finally:
+        client.shutdown()
+
+
+def test_real_model_is_refused_on_cpu_without_opt_in(monkeypatch):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    if torch.cuda.is_available():
+        pytest.skip("has a GPU")
+    from modules.inference_server import load_model
+    monkeypatch.delenv("EVEE_CODEGEN_ALLOW_CPU", raising=False)
+    with pytest.raises(RuntimeError, match="28 GB"):
+        load_model("codellama/CodeLlama-7b-hf")
@@ -0,0 +1,133 @@
+"""NetworkInterceptor against a fake Playwright context and DevTools session."""
+
+import asyncio
+
+from modules.network_policy import POLICY_PRESETS, NetworkInterceptor, NetworkPolicy
+
+
+class FakeEmitter:
+    def __init__(self):
+        self.listeners = {}
+
+    def on(self, event, listener):
+        self.listeners.setdefault(event, []).append(listener)
+
+    def remove_listener(self, event, listener):
+        self.listeners[event].remove(listener)
+
+    def emit(self, event, payload):
+        for listener in list(self.listeners.get(event, [])):
+            listener(payload)
+
+
+class FakeCDPSession(FakeEmitter):
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+        self.detached = False
+
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+
+    async def detach(self):
+        self.detached = True
+
+
+class FakePage:
+    def is_closed(self):
+        return False
+
+
+class FakeContext(FakeEmitter):
+    def __init__(self):
+        super().__init__()
+        self.pages = [FakePage()]
+        self.sessions = []
+        self.routed = False
+
+    async def new_cdp_session(self, page):
+        self.sessions.append(FakeCDPSession())
+        return self.sessions[-1]
+
+    async def route(self, *args):
+        self.routed = True
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type, failure=None):
+        self.url = url
+        self.resource_type = resource_type
+        self.failure = failure
+
+    async def sizes(self):
+        return {"responseBodySize": 1000, "responseHeadersSize": 24}
+
+
+def lean():
+    return NetworkPolicy.from_config(POLICY_PRESETS["lean"], name="lean")
+
+
+def test_blocking_is_done_by_chromium_without_routing():
+    async def run():
+        context = FakeContext()
+        interceptor = NetworkInterceptor(lean())
+        await interceptor.attach(context)
+        assert not context.routed
+        methods = dict(context.sessions[0].sent)
+        assert "*://*.doubleclick.net/*" in methods["Network.setBlockedURLs"]["urls"]
+        # Only the blocked types are paused
+        types = {pattern["resourceType"] for pattern in methods["Fetch.enable"]["patterns"]}
+        assert types == {"Image", "Media", "Font"}
+
+        # Pages opened later get their own session
+        context.emit("page", FakePage())
+        await asyncio.sleep(0)
+        assert len(context.sessions) == 2
+
+        cdp = context.sessions[0]
+        cdp.emit("Fetch.requestPaused", {"requestId": "1", "resourceType": "Image",
+                                         "request": {"url": "https://example.com/a.png"}})
+        await asyncio.sleep(0)
+        assert cdp.sent[-1] == ("Fetch.failRequest", {"requestId": "1", "errorReason": "BlockedByClient"})
+
+        context.emit("requestfailed", FakeRequest("https://example.com/a.png", "image", "net::ERR_BLOCKED_BY_CLIENT"))
+        context.emit("requestfailed", FakeRequest("https://www.doubleclick.net/x.js", "script",
+                                                  "net::ERR_BLOCKED_BY_CLIENT"))
+        context.emit("requestfailed", FakeRequest("https://example.com/app.js", "script", "net::ERR_FAILED"))
+        context.emit("requestfinished", FakeRequest("https://example.com/", "document"))
+        await interceptor.detach()
+        return context, interceptor
+
+    context, interceptor = asyncio.run(run())
+    stats = interceptor.stats()
+    assert stats["allowed"] == 1 and stats["blocked"] == 2
+    assert stats["blocked_by_reason"] == {"type": 1, "domain": 1}
+    assert stats["bytes_loaded"] == 1024
+    assert all(cdp.detached for cdp in context.sessions)
+    assert not any(context.listeners.values())
+
+
+def test_allow_patterns_move_url_blocking_to_fetch():
+    async def run():
+        context = FakeContext()
+        policy = NetworkPolicy(block_domains=["doubleclick.net"], allow_patterns=["*/keep/*"])
+        await NetworkInterceptor(policy).attach(context)
+        cdp = context.sessions[0]
+        cdp.emit("Fetch.requestPaused", {"requestId": "2", "resourceType": "Script",
+                                         "request": {"url": "https://doubleclick.net/keep/x.js"}})
+        await asyncio.sleep(0)
+        return cdp
+
+    cdp = asyncio.run(run())
+    methods = [method for method, _ in cdp.sent]
+    assert "Network.setBlockedURLs" not in methods
+    assert cdp.sent[-1] == ("Fetch.continueRequest", {"requestId": "2"})
+
+
+def test_tracker_patterns_do_not_catch_ordinary_pages():
+    policy = lean()
+    for url in ("https://example.com/pixel-art/gallery", "https://example.com/beacon-hill/",
+                "https://example.com/blog/pixels-and-beacons.html"):
+        assert policy.block_reason(url, "script") is None
+    assert policy.block_reason("https://example.com/t/pixel.gif?id=1", "xhr") == "pattern"
+    assert policy.block_reason("https://example.com/gtag/js?id=G-1", "script") == "pattern"
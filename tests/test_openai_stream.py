@@ -0,0 +1,95 @@
+"""OpenAICodeEngine.generate_code_stream() against the local SSE chat-completions stub."""
+
+import pytest
+
+pytest.importorskip("openai")
+
+from benchmarks._stub_api import DEFAULT_CODE, DEFAULT_TRAILER, StubChatServer
+from modules.openai_engine import CodeFenceStripper, OpenAICodeEngine
+
+COMMAND = "I want to watch some youtube videos"
+LONG_TRAILER = "\n\n" + "\n".join(["This line explains the script in more detail."] * 20)
+MULTILINE_CODE = (
+    "import webbrowser\n"
+    "\n"
+    "def watch(url):\n"
+    "    webbrowser.open(\n"
+    "        url)\n"
+    "\n"
+    "watch('https://www.youtube.com')"
+)
+
+
+@pytest.fixture
+def stub():
+    with StubChatServer(latency=0.0, token_delay=0.0) as server:
+        yield server
+
+
+@pytest.fixture
+def engine(stub, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", stub.base_url)
+    engine = OpenAICodeEngine()
+    engine.code_cache = None
+    engine.validator = None
+    return engine
+
+
+def stream(engine):
+    return "".join(engine.generate_code_stream(COMMAND))
+
+
+@pytest.mark.parametrize("fenced", [True, False])
+def test_stream_returns_the_code_without_the_trailer(engine, stub, fenced):
+    stub.reset(fenced=fenced, trailer=DEFAULT_TRAILER)
+    streamed = stream(engine)
+    assert engine.last_code == DEFAULT_CODE
+    assert streamed.strip() == DEFAULT_CODE
+    assert engine.last_metrics["complete"]
+    # Unfenced, a one-line trailer is only known to be prose once it ends
+    assert engine.last_metrics["stopped_early"] == fenced
+    assert 0 < engine.last_metrics["ttft"] <= engine.last_metrics["code_ready"]
+
+
+@pytest.mark.parametrize("fenced", [True, False])
+def test_stream_stops_before_a_long_trailer(engine, stub, fenced):
+    stub.reset(fenced=fenced, trailer=LONG_TRAILER, token_delay=0.005)
+    stream(engine)
+    assert engine.last_code == DEFAULT_CODE
+    assert engine.last_metrics["stopped_early"]
+    # Stopping at the end of the program skips most of the trailer's tokens
+    assert engine.last_metrics["chunks"] < len(stub.completion_text()) / 4
+
+
+def test_stream_without_trailer_runs_to_the_end(engine, stub):
+    stub.reset(fenced=False, trailer="", code=MULTILINE_CODE)
+    stream(engine)
+    assert engine.last_code == MULTILINE_CODE
+    assert engine.last_metrics["complete"]
+    assert not engine.last_metrics["stopped_early"]
+
+
+def test_unfenced_multiline_statements_are_not_cut(engine, stub):
+    stub.reset(fenced=False, trailer="\n\nThis opens YouTube.\nIt uses the default browser.", code=MULTILINE_CODE)
+    stream(engine)
+    assert engine.last_code == MULTILINE_CODE
+    assert engine.last_metrics["stopped_early"]
+
+
+@pytest.mark.parametrize("text", [
+    f"```python\n{MULTILINE_CODE}\n```\nDone.",
+    f"{MULTILINE_CODE}\n\nThis script opens YouTube.",
+    f"{MULTILINE_CODE}\nThis script opens YouTube.",
+    MULTILINE_CODE,
+])
+def test_stripper_one_character_at_a_time(text):
+    stripper = CodeFenceStripper()
+    received = ""
+    for character in text:
+        received += stripper.feed(character)
+        if stripper.closed:
+            break
+    received += stripper.finish()
+    assert stripper.code == MULTILINE_CODE
+    assert received.strip() == MULTILINE_CODE
@@ -0,0 +1,75 @@
+"""ResultsLog shared by several writers (separate instances stand in for processes)."""
+
+import pytest
+
+from modules.results_log import ResultsLog, new_run_id
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "results.jsonl"
+
+
+def test_generated_ids_are_unique(path):
+    log = ResultsLog(path, max_runs=None)
+    ids = {log.append({"n": n}) for n in range(200)}
+    assert len(ids) == 200
+    assert new_run_id("batch-") != new_run_id("batch-")
+
+
+def test_duplicate_explicit_id_is_an_error(path):
+    log = ResultsLog(path, max_runs=None)
+    log.append({"n": 1}, run_id="batch-1")
+    with pytest.raises(ValueError):
+        log.append({"n": 2}, run_id="batch-1")
+    # Also when the first one was written by another process
+    with pytest.raises(ValueError):
+        ResultsLog(path, max_runs=None).append({"n": 3}, run_id="batch-1")
+    assert log.get("batch-1")["results"] == {"n": 1}
+
+
+def test_readers_see_runs_of_other_writers(path):
+    first, second = ResultsLog(path, max_runs=None), ResultsLog(path, max_runs=None)
+    first.append({"n": 1}, run_id="a")
+    assert second.latest()["run_id"] == "a"
+    second.append({"n": 2}, run_id="b")
+    assert [entry["run_id"] for entry in first.tail(5)] == ["a", "b"]
+    assert first.get("b")["results"] == {"n": 2}
+
+
+def test_compaction_keeps_runs_of_other_writers(path):
+    first = ResultsLog(path, max_runs=3, compact_every=0)
+    second = ResultsLog(path, max_runs=3, compact_every=0)
+    for n in range(3):
+        first.append({"n": n}, run_id=f"first-{n}")
+    for n in range(2):
+        second.append({"n": n}, run_id=f"second-{n}")
+    assert first.compact() == 2
+    # The log was replaced under the second writer; it re-indexes before appending
+    second.append({"n": 2}, run_id="second-2")
+    assert [entry["run_id"] for entry in first.tail(10)] == ["first-2", "second-0", "second-1", "second-2"]
+    assert ResultsLog(path, max_runs=None).get("first-2")["results"] == {"n": 2}
+
+
+def test_non_ascii_ids_stay_indexed(path):
+    log = ResultsLog(path, max_runs=None)
+    run_id = log.append({"a": 1}, run_id="café", kind="tâche")
+    assert run_id == "caf_"
+    reopened = ResultsLog(path, max_runs=None)
+    assert len(reopened) == 1
+    assert reopened.get(run_id)["results"] == {"a": 1}
+    with pytest.raises(ValueError):
+        reopened.append({"a": 2}, run_id="café")
+
+
+def test_save_results_logs_every_dict_without_changing_it(path):
+    from modules.file_manager import FileManager
+
+    manager = FileManager()
+    manager._results_log = ResultsLog(path, max_runs=None)
+    results = {"success": True, "run_id": "upstream-7"}
+    first = manager.save_results(results)
+    second = manager.save_results(results)
+    assert first and second and first != second
+    assert results == {"success": True, "run_id": "upstream-7"}
+    assert manager.load_results(first) == results
@@ -0,0 +1,32 @@
+"""WhisperEngine._record_speed: measured speeds are written to disk rarely."""
+
+from modules.whisper_engine import WhisperEngine
+
+
+class FakeBackend:
+    rtf = 0.25
+
+    def __init__(self):
+        self.runs = 0
+
+    def stats(self):
+        return {"rtf": self.rtf, "load_seconds": 1.0, "memory_mb": 10.0, "device": "cpu", "runs": self.runs}
+
+
+def test_speeds_are_saved_once_per_model_then_at_doubled_run_counts(monkeypatch):
+    engine = WhisperEngine("base")
+    engine.backend = FakeBackend()
+    saved = []
+    monkeypatch.setattr(engine.file_manager, "load_json", lambda name, default=None: {})
+    monkeypatch.setattr(engine.file_manager, "save_json", lambda name, data: saved.append(dict(data)))
+
+    for _ in range(20):
+        engine.backend.runs += 1
+        engine._record_speed()
+    assert [entry["base/" + engine.backend_name]["runs"] for entry in saved] == [1, 2, 4, 8, 16]
+    assert engine.model_info["base"]["measured"]["runs"] == 20
+
+    engine.model_size = "tiny"  # what change_model() does
+    engine.backend.runs += 1
+    engine._record_speed()
+    assert "tiny/" + engine.backend_name in saved[-1]